@@ -5,5 +5,6 @@
 """
 
 from .path_planner import PathPlanner
+from .compiled_graph import CompiledGraph
 
-__all__ = ['PathPlanner']
\ No newline at end of file
+__all__ = ['PathPlanner', 'CompiledGraph']
\ No newline at end of file
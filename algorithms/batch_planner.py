@@ -0,0 +1,297 @@
+"""
+批量路径规划模块
+用少量搜索回答多起点到多终点的距离矩阵，以及"最近起点/最近终点"查询
+"""
+
+import heapq
+from array import array
+
+import numpy as np
+
+
+class BatchResult:
+    """
+    批量规划结果
+
+    distances[i, j] 为 sources[i] 到 targets[j] 计入占用惩罚的成本（不可达为inf），
+    路径在首次访问时才从搜索树（或距离表）中重建
+    """
+
+    def __init__(self, graph, sources, targets, distances, trees=None, backward=False,
+                 oracle=None):
+        """
+        Args:
+            graph: 编译图
+            sources: 起点ID列表
+            targets: 终点ID列表
+            distances: 距离矩阵 (len(sources)×len(targets) float64)
+            trees: 每次搜索的前驱数组；正向搜索按起点存放前驱，反向搜索按终点存放后继
+            backward: 搜索树是否来自反向搜索
+            oracle: 距离表，不为None时直接沿下一跳提取路径
+        """
+        self.graph = graph
+        self.sources = list(sources)
+        self.targets = list(targets)
+        self.distances = distances
+        self._trees = trees
+        self._backward = backward
+        self._oracle = oracle
+        self._source_pos = {node_id: i for i, node_id in reversed(list(enumerate(self.sources)))}
+        self._target_pos = {node_id: j for j, node_id in reversed(list(enumerate(self.targets)))}
+        self._paths = {}
+
+    def distance(self, source_id, target_id):
+        """
+        查询起点到终点的成本
+
+        Returns:
+            float: 成本，不可达时为inf
+        """
+        return float(self.distances[self._source_pos[source_id], self._target_pos[target_id]])
+
+    def path(self, source_id, target_id):
+        """
+        获取起点到终点的路径
+
+        Returns:
+            list: 路径节点ID列表，不可达时返回空列表
+        """
+        i = self._source_pos[source_id]
+        j = self._target_pos[target_id]
+        key = (i, j)
+        if key not in self._paths:
+            self._paths[key] = self._reconstruct(i, j)
+        return list(self._paths[key])
+
+    def _reconstruct(self, i, j):
+        """从搜索树或距离表中重建第i个起点到第j个终点的路径"""
+        if self.distances[i, j] == float('inf'):
+            return []
+
+        graph = self.graph
+        start = graph.index_of[self.sources[i]]
+        end = graph.index_of[self.targets[j]]
+        if self._oracle is not None:
+            return graph.to_ids(self._oracle.route(start, end))
+
+        if not self._backward:
+            return graph.to_ids(graph.reconstruct(self._trees[i], start, end))
+
+        following = self._trees[j]
+        path = [start]
+        current = start
+        while current != end:
+            current = following[current]
+            path.append(current)
+        return graph.to_ids(path)
+
+    def nearest_source(self, target_id):
+        """
+        查询离终点最近的起点
+
+        Returns:
+            tuple: (起点ID, 成本)，全部不可达时返回 (None, inf)
+        """
+        column = self.distances[:, self._target_pos[target_id]]
+        if not len(column):
+            return None, float('inf')
+        i = int(np.argmin(column))
+        if column[i] == float('inf'):
+            return None, float('inf')
+        return self.sources[i], float(column[i])
+
+    def nearest_target(self, source_id):
+        """
+        查询离起点最近的终点
+
+        Returns:
+            tuple: (终点ID, 成本)，全部不可达时返回 (None, inf)
+        """
+        row = self.distances[self._source_pos[source_id], :]
+        if not len(row):
+            return None, float('inf')
+        j = int(np.argmin(row))
+        if row[j] == float('inf'):
+            return None, float('inf')
+        return self.targets[j], float(row[j])
+
+
+class BatchPlanner:
+    """
+    批量规划器
+
+    占用惩罚只作用于进入被占用节点的边，而最短路径不会再次进入自己的起点，
+    因此所有起点可以共用同一个占用集合（包含各AGV自身所在节点）
+    """
+
+    @classmethod
+    def plan(cls, graph, sources, targets, occupied=None, penalty=1, oracle=None):
+        """
+        计算多起点到多终点的成本矩阵
+
+        只对起点和终点中数量较少的一侧逐个搜索：起点较少时沿出边正向搜索，
+        终点较少时沿入边反向搜索；每次搜索在所有待求节点确定后立即停止
+
+        Args:
+            graph: 编译图
+            sources: 起点ID列表
+            targets: 终点ID列表
+            occupied: 被占用节点索引集合，为None时不计占用惩罚
+            penalty: 进入被占用节点的成本倍数
+            oracle: 距离表，没有被占用节点时直接查表
+
+        Returns:
+            tuple: (BatchResult, 扩展节点数, 入堆次数)
+        """
+        index_of = graph.index_of
+        source_indices = [index_of.get(node_id, -1) for node_id in sources]
+        target_indices = [index_of.get(node_id, -1) for node_id in targets]
+        distances = np.full((len(sources), len(targets)), np.inf)
+
+        if oracle is not None and not occupied:
+            rows = [i for i, v in enumerate(source_indices) if v >= 0]
+            cols = [j for j, v in enumerate(target_indices) if v >= 0]
+            if rows and cols:
+                distances[np.ix_(rows, cols)] = oracle.distances[
+                    np.ix_([source_indices[i] for i in rows], [target_indices[j] for j in cols])]
+            return BatchResult(graph, sources, targets, distances, oracle=oracle), 0, 0
+
+        backward = len(targets) < len(sources)
+        roots, goals = (target_indices, source_indices) if backward else (source_indices,
+                                                                          target_indices)
+        goal_set = {v for v in goals if v >= 0}
+        trees = []
+        expanded = 0
+        pushes = 0
+
+        for k, root in enumerate(roots):
+            if root < 0:
+                trees.append(None)
+                continue
+            dist, pred, _, sweep_expanded, sweep_pushes = cls._sweep(
+                graph, [root], goal_set, occupied, penalty, backward)
+            trees.append(pred)
+            expanded += sweep_expanded
+            pushes += sweep_pushes
+
+            row = [dist[v] if v >= 0 else float('inf') for v in goals]
+            if backward:
+                distances[:, k] = row
+            else:
+                distances[k, :] = row
+
+        return BatchResult(graph, sources, targets, distances, trees, backward), expanded, pushes
+
+    @classmethod
+    def nearest(cls, graph, roots, goals, occupied=None, penalty=1, backward=False):
+        """
+        一次多源搜索，为每个待求节点找到最近的根节点
+
+        正向时根节点为起点（如空闲AGV位置），求每个终点最近的起点；
+        反向时根节点为终点（如空闲卸货点），求每个起点最近的终点
+
+        Args:
+            graph: 编译图
+            roots: 根节点ID列表
+            goals: 待求节点ID列表
+            occupied: 被占用节点索引集合，为None时不计占用惩罚
+            penalty: 进入被占用节点的成本倍数
+            backward: 是否沿入边反向搜索
+
+        Returns:
+            tuple: ({待求节点ID: (最近根节点ID, 成本, 路径)}, 扩展节点数, 入堆次数)，
+                不可达的待求节点对应 (None, inf, [])
+        """
+        index_of = graph.index_of
+        root_indices = [index_of[node_id] for node_id in roots if node_id in index_of]
+        goal_set = {index_of[node_id] for node_id in goals if node_id in index_of}
+        dist, pred, origin, expanded, pushes = cls._sweep(
+            graph, root_indices, goal_set, occupied, penalty, backward)
+
+        result = {}
+        for node_id in goals:
+            v = index_of.get(node_id, -1)
+            if v < 0 or origin[v] < 0:
+                result[node_id] = (None, float('inf'), [])
+                continue
+
+            chain = [v]
+            while pred[chain[-1]] != -1:
+                chain.append(pred[chain[-1]])
+            # 正向搜索的链从终点回溯到起点，反向搜索的链本身就是行驶方向
+            if not backward:
+                chain.reverse()
+            result[node_id] = (graph.node_ids[origin[v]], dist[v], graph.to_ids(chain))
+        return result, expanded, pushes
+
+    @staticmethod
+    def _sweep(graph, roots, goals, occupied, penalty, backward):
+        """
+        从若干根节点同时出发的Dijkstra搜索
+
+        Args:
+            graph: 编译图
+            roots: 根节点索引列表
+            goals: 待确定的节点索引集合，全部确定后提前停止
+            occupied: 被占用节点索引集合
+            penalty: 进入被占用节点的成本倍数
+            backward: 是否沿入边反向搜索
+
+        Returns:
+            tuple: (距离数组, 前驱数组, 所属根节点数组, 扩展节点数, 入堆次数)；
+                反向搜索时前驱数组存放的是沿行驶方向的后继
+        """
+        n = graph.node_count
+        inf = float('inf')
+        dist = array('d', [inf]) * n
+        pred = array('i', [-1]) * n
+        origin = array('i', [-1]) * n
+        settled = bytearray(n)
+        factor = 1
+        if backward:
+            offsets, neighbors, weights = graph.r_offsets, graph.r_sources, graph.r_weights
+        else:
+            offsets, neighbors, weights = graph.offsets, graph.targets, graph.weights
+
+        heap = []
+        for root in roots:
+            if dist[root] != 0.0:
+                dist[root] = 0.0
+                origin[root] = root
+                heap.append((0.0, root))
+        heapq.heapify(heap)
+        remaining = len(goals)
+        expanded = 0
+        pushes = len(heap)
+
+        while heap and remaining:
+            d, u = heapq.heappop(heap)
+            if settled[u]:
+                continue
+            settled[u] = 1
+            expanded += 1
+            if u in goals:
+                remaining -= 1
+
+            # 反向搜索时进入u的边成本由u的占用状态决定
+            if backward:
+                factor = penalty if occupied and u in occupied else 1
+            for e in range(offsets[u], offsets[u + 1]):
+                v = neighbors[e]
+                if settled[v]:
+                    continue
+                if backward:
+                    cost = weights[e] * factor
+                elif occupied and v in occupied:
+                    cost = weights[e] * penalty
+                else:
+                    cost = weights[e]
+                new_distance = d + cost
+                if new_distance < dist[v]:
+                    dist[v] = new_distance
+                    pred[v] = u
+                    origin[v] = origin[u]
+                    heapq.heappush(heap, (new_distance, v))
+                    pushes += 1
+
+        return dist, pred, origin, expanded, pushes
\ No newline at end of file
@@ -0,0 +1,261 @@
+"""
+基于冲突的多AGV联合规划模块
+高层在约束树上逐个消解AGV之间的时空冲突，底层复用安全时间窗规划
+"""
+
+import heapq
+import time
+
+from .space_time_planner import SpaceTimePlanner
+
+
+class AgentTask:
+    """联合规划中单个AGV的任务"""
+
+    __slots__ = ('agv_id', 'start', 'goal', 'speed', 'heading', 'radius')
+
+    def __init__(self, agv_id, start, goal, speed, heading=0.0, radius=0):
+        """
+        Args:
+            agv_id: AGV编号
+            start: 起始节点索引
+            goal: 目标节点索引
+            speed: AGV每帧移动的距离
+            heading: 当前车头角度
+            radius: 碰撞检测半径
+        """
+        self.agv_id = agv_id
+        self.start = start
+        self.goal = goal
+        self.speed = speed
+        self.heading = heading
+        self.radius = radius
+
+
+class ConflictBasedSearch:
+    """
+    冲突搜索(CBS)及其有界次优变体(ECBS)
+
+    约束树的每个结点为每个AGV保存一组"某时段不得占用某节点"的约束和满足约束的路线。
+    取出结点后找到最早的冲突，分别向冲突双方加约束得到两个子结点。
+    suboptimality大于1时，在总代价不超过下界该倍数的结点中优先扩展冲突最少的结点，
+    以解的质量换取更少的扩展次数。预算耗尽时退回按顺序的优先级规划
+    """
+
+    # 约束在预约表中使用的占用者编号，不与任何AGV编号相同
+    CONSTRAINT_OWNER = -1
+
+    DEFAULT_MAX_EXPANSIONS = 200
+
+    # 秒
+    DEFAULT_TIME_BUDGET = 0.5
+
+    @classmethod
+    def solve(cls, graph, tasks, table, now, suboptimality=1.0,
+              max_expansions=DEFAULT_MAX_EXPANSIONS, time_budget=DEFAULT_TIME_BUDGET):
+        """
+        为一组AGV规划互不冲突的时刻表
+
+        Args:
+            graph: 编译图
+            tasks: AgentTask列表
+            table: 预约表，只包含组外AGV的预约，不会被修改
+            now: 当前时刻
+            suboptimality: 次优界，1.0为最优CBS
+            max_expansions: 约束树最多扩展的结点数
+            time_budget: 最长求解时间（秒）
+
+        Returns:
+            tuple: ({AGV编号: (路径, 出发时刻, 抵达时刻)}, 统计信息字典)；
+                无可行时刻表的AGV不出现在结果中
+        """
+        deadline = time.perf_counter() + time_budget
+        margin = SpaceTimePlanner.SAFETY_TICKS
+        stats = {'expanded': 0, 'fallback': False, 'conflicts': 0}
+
+        # 单独规划都不可行的AGV不参与联合规划，留在原地
+        routes, table = cls._plan_each(graph, tasks, table, now, False)
+        tasks = [task for task in tasks if task.agv_id in routes]
+        by_id = {task.agv_id: task for task in tasks}
+
+        root_conflicts = cls._find_conflicts(graph, tasks, routes, now, margin)
+        root = (cls._cost(routes, now), len(root_conflicts), 0, {}, routes, root_conflicts)
+        open_list = [root]
+        counter = 1
+
+        while open_list:
+            if (stats['expanded'] >= max_expansions or
+                    time.perf_counter() > deadline):
+                break
+
+            node = cls._pop_focal(open_list, suboptimality)
+            cost, _, _, constraints, routes, conflicts = node
+            stats['expanded'] += 1
+            if not conflicts:
+                return routes, stats
+
+            stats['conflicts'] += 1
+            first = min(conflicts)
+            _, agent_a, node_a, begin_a, end_a, agent_b, node_b, begin_b, end_b = first
+
+            # 分支：a避开b占用的时段，或b避开a占用的时段
+            for agent, constraint in ((agent_a, (node_b, begin_b, end_b)),
+                                      (agent_b, (node_a, begin_a, end_a))):
+                agent_constraints = constraints.get(agent, ()) + (constraint,)
+                route = cls._plan_agent(graph, by_id[agent], table, now, agent_constraints)
+                if route is None:
+                    continue
+
+                child_constraints = dict(constraints)
+                child_constraints[agent] = agent_constraints
+                child_routes = dict(routes)
+                child_routes[agent] = route
+                child_conflicts = cls._find_conflicts(graph, tasks, child_routes, now,
+                                                       margin)
+                heapq.heappush(open_list, (cls._cost(child_routes, now), len(child_conflicts),
+                                           counter, child_constraints, child_routes,
+                                           child_conflicts))
+                counter += 1
+
+        stats['fallback'] = True
+        return cls.prioritized(graph, tasks, table, now), stats
+
+    @classmethod
+    def prioritized(cls, graph, tasks, table, now):
+        """
+        优先级规划：按给定顺序逐个规划，后规划的AGV避开先规划的AGV的时刻表
+
+        Args:
+            graph: 编译图
+            tasks: 按优先级排好序的AgentTask列表
+            table: 预约表，不会被修改
+            now: 当前时刻
+
+        Returns:
+            dict: {AGV编号: (路径, 出发时刻, 抵达时刻)}
+        """
+        return cls._plan_each(graph, tasks, table, now, True)[0]
+
+    @classmethod
+    def _plan_each(cls, graph, tasks, table, now, sequential):
+        """
+        逐个规划各AGV，规划失败的AGV留在原地
+
+        先规划的AGV看不到留在原地的AGV，因此出现失败时把失败的AGV长期预约在起点，
+        其余AGV重新规划，直到不再出现新的失败
+
+        Args:
+            graph: 编译图
+            tasks: AgentTask列表
+            table: 预约表，不会被修改
+            now: 当前时刻
+            sequential: 为True时后规划的AGV避开先规划的AGV的时刻表
+
+        Returns:
+            tuple: ({AGV编号: (路径, 出发时刻, 抵达时刻)}, 含留在原地的AGV预约的预约表)
+        """
+        while True:
+            working = table.copy() if sequential else table
+            routes = {}
+            parked = []
+            for task in tasks:
+                route = cls._plan_agent(graph, task, working, now, ())
+                if route is None:
+                    parked.append(task)
+                    continue
+                routes[task.agv_id] = route
+                if sequential:
+                    working.reserve_route(task.agv_id, route[0], route[1], route[2],
+                                          SpaceTimePlanner.SAFETY_TICKS)
+            if not parked:
+                return routes, table
+
+            table = table.copy()
+            for task in parked:
+                table.reserve_node(task.start, now, float('inf'), task.agv_id)
+            tasks = [task for task in tasks if task.agv_id in routes]
+
+    @classmethod
+    def _plan_agent(cls, graph, task, table, now, constraints):
+        """
+        在预约表加上约束的条件下为单个AGV规划时刻表
+
+        Returns:
+            tuple: (路径, 出发时刻, 抵达时刻)，不可行时返回None
+        """
+        if constraints:
+            table = table.copy()
+            for v, begin, end in constraints:
+                table.reserve_node(v, begin, end, cls.CONSTRAINT_OWNER)
+
+        result = SpaceTimePlanner.plan(graph, task.start, task.goal, now, table, task.agv_id,
+                                       task.speed, task.heading, task.radius)
+        if result is None:
+            return None
+        path, departures, arrivals, _ = result
+        return path, departures, arrivals
+
+    @staticmethod
+    def _cost(routes, now):
+        """总代价：各AGV抵达终点的时间之和"""
+        return sum(route[2][-1] - now for route in routes.values())
+
+    @staticmethod
+    def _pop_focal(open_list, suboptimality):
+        """
+        取出下一个扩展的结点
+
+        suboptimality为1时即最小代价结点；否则在代价不超过下界倍数的结点中取冲突最少的
+        """
+        if suboptimality <= 1.0:
+            return heapq.heappop(open_list)
+
+        bound = open_list[0][0] * suboptimality
+        best_index = 0
+        for index, node in enumerate(open_list):
+            if node[0] <= bound and node[1] < open_list[best_index][1]:
+                best_index = index
+        node = open_list[best_index]
+        open_list[best_index] = open_list[-1]
+        open_list.pop()
+        heapq.heapify(open_list)
+        return node
+
+    @staticmethod
+    def _find_conflicts(graph, tasks, routes, now, margin):
+        """
+        找出所有AGV两两之间的节点占用冲突
+
+        AGV在节点上停留到抵达下一节点为止（终点长期停留），
+        两个AGV在同一节点或距离过近的两个节点上的占用时段重叠即为冲突。
+        对穿同一条边时双方必然在对方的节点上重叠，因此无需单独检查边冲突。
+        两个AGV当前已经停在相邻节点上不算冲突，与单独规划时起点只避让之后到来的AGV一致
+
+        Returns:
+            list: (开始时刻, AGV a, a的节点, a的开始, a的结束,
+                   AGV b, b的节点, b的开始, b的结束) 列表
+        """
+        inf = float('inf')
+        occupancy = {}
+        for task in tasks:
+            path, _, arrivals = routes[task.agv_id]
+            for i, v in enumerate(path):
+                end = arrivals[i + 1] + margin if i + 1 < len(path) else inf
+                occupancy.setdefault(v, []).append((arrivals[i], end, task.agv_id))
+
+        radius = max((task.radius for task in tasks), default=0)
+        nearby = graph.nearby_nodes(radius)
+        conflicts = []
+        for v, intervals in occupancy.items():
+            for u in [v] + [u for u in nearby[v] if u > v]:
+                others = intervals if u == v else occupancy.get(u, ())
+                for index_a, (begin_a, end_a, agent_a) in enumerate(intervals):
+                    candidates = others[index_a + 1:] if u == v else others
+                    for begin_b, end_b, agent_b in candidates:
+                        if agent_a == agent_b or begin_a > end_b or begin_b > end_a:
+                            continue
+                        if u != v and begin_a == begin_b == now:
+                            continue
+                        conflicts.append((max(begin_a, begin_b), agent_a, v, begin_a, end_a,
+                                          agent_b, u, begin_b, end_b))
+        return conflicts
\ No newline at end of file
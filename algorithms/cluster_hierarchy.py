@@ -0,0 +1,341 @@
+"""
+分层规划模块
+以管控区和区域为簇构建HPA*风格的两层图：抽象层只包含簇的入口节点，
+簇内入口之间的距离预先算好，查询时先在抽象层规划，再随AGV前进逐段细化为原图路径
+"""
+
+import heapq
+import math
+
+
+class ClusterHierarchy:
+    """
+    簇层次
+
+    每个节点属于唯一的簇：按给定顺序归入第一个包含它的分组（管控区、T_Area区域），
+    不属于任何分组的节点按广度优先划分为不超过MAX_CLUSTER_SIZE个节点的簇。
+    有边跨越两个簇的节点是入口；抽象图的边包括跨簇的原始边和同一簇内入口之间的最短距离。
+    抽象层不计占用惩罚，细化时在簇内搜索才计入
+    """
+
+    # 未分组节点划分出的簇的最大节点数
+    MAX_CLUSTER_SIZE = 32
+
+    def __init__(self, graph, cluster_of, members, entrances, abstract):
+        """
+        Args:
+            graph: 编译图
+            cluster_of: 节点索引 -> 簇编号
+            members: 各簇的节点索引集合
+            entrances: 各簇的入口节点索引列表
+            abstract: 入口节点索引 -> [(相邻入口节点索引, 成本)]
+        """
+        self.graph = graph
+        self.cluster_of = cluster_of
+        self.members = members
+        self.entrances = entrances
+        self.abstract = abstract
+
+        # 最近一次查询或细化的统计信息
+        self.expanded = 0
+        self.pushes = 0
+
+    @property
+    def cluster_count(self):
+        """簇的数量"""
+        return len(self.members)
+
+    @property
+    def entrance_count(self):
+        """抽象图的节点数"""
+        return len(self.abstract)
+
+    @classmethod
+    def build(cls, graph, groups):
+        """
+        由节点分组构建簇层次
+
+        Args:
+            graph: 编译图
+            groups: 节点ID列表的列表，靠前的分组优先
+
+        Returns:
+            ClusterHierarchy: 簇层次
+        """
+        n = graph.node_count
+        cluster_of = [-1] * n
+        members = []
+        for group in groups:
+            cluster = [graph.index_of[node_id] for node_id in group
+                       if node_id in graph.index_of]
+            cluster = [v for v in dict.fromkeys(cluster) if cluster_of[v] < 0]
+            if not cluster:
+                continue
+            for v in cluster:
+                cluster_of[v] = len(members)
+            members.append(set(cluster))
+
+        for v in range(n):
+            if cluster_of[v] < 0:
+                members.append(cls._grow_cluster(graph, v, cluster_of, len(members)))
+
+        entrances = [[] for _ in members]
+        abstract = {}
+        for u in range(n):
+            for e in range(graph.offsets[u], graph.offsets[u + 1]):
+                v = graph.targets[e]
+                if cluster_of[u] == cluster_of[v]:
+                    continue
+                for w in (u, v):
+                    if w not in abstract:
+                        abstract[w] = []
+                        entrances[cluster_of[w]].append(w)
+                abstract[u].append((v, graph.weights[e]))
+
+        # 簇内入口之间的最短距离
+        hierarchy = cls(graph, cluster_of, members, entrances, abstract)
+        for cluster, gates in enumerate(entrances):
+            for a in gates:
+                dist, _ = hierarchy._search_cluster(a, cluster, False)
+                for b in gates:
+                    if b != a and b in dist:
+                        abstract[a].append((b, dist[b]))
+        return hierarchy
+
+    @classmethod
+    def _grow_cluster(cls, graph, seed, cluster_of, cluster):
+        """从seed出发沿出边和入边广度优先收集未分组的节点，不超过MAX_CLUSTER_SIZE个"""
+        cluster_of[seed] = cluster
+        collected = {seed}
+        queue = [seed]
+        for u in queue:
+            neighbors = [graph.targets[e] for e in range(graph.offsets[u], graph.offsets[u + 1])]
+            neighbors += [graph.r_sources[e]
+                          for e in range(graph.r_offsets[u], graph.r_offsets[u + 1])]
+            for v in neighbors:
+                if len(collected) >= cls.MAX_CLUSTER_SIZE:
+                    return collected
+                if cluster_of[v] < 0:
+                    cluster_of[v] = cluster
+                    collected.add(v)
+                    queue.append(v)
+        return collected
+
+    # =============================================================================
+    # 查询
+    # =============================================================================
+
+    def plan(self, start, end):
+        """
+        在抽象层规划从start到end的航点序列
+
+        起点和终点临时接入抽象图：起点到所在簇各入口、所在簇各入口到终点的距离
+        由簇内搜索得到，两者同簇时还加入簇内直达的距离。抽象层用A*搜索，
+        启发函数为按换算系数缩放的欧氏距离
+
+        Args:
+            start: 起始节点索引
+            end: 目标节点索引
+
+        Returns:
+            list: 航点节点索引序列（首尾为起点和终点），不可达时返回空列表
+        """
+        self.expanded = 0
+        self.pushes = 0
+        if start == end:
+            return [start]
+
+        graph = self.graph
+        xs = graph.xs
+        ys = graph.ys
+        scale = graph.heuristic_scale
+        end_x = xs[end]
+        end_y = ys[end]
+        inf = float('inf')
+
+        start_cluster = self.cluster_of[start]
+        end_cluster = self.cluster_of[end]
+        from_start, _ = self._search_cluster(start, start_cluster, False)
+        to_end, _ = self._search_cluster(end, end_cluster, True)
+
+        def h(v):
+            return math.hypot(xs[v] - end_x, ys[v] - end_y) * scale
+
+        def neighbors(u):
+            if u == start:
+                edges = [(b, from_start[b]) for b in self.entrances[start_cluster]
+                         if b in from_start and b != start]
+                if start_cluster == end_cluster and end in from_start:
+                    edges.append((end, from_start[end]))
+                edges.extend(self.abstract.get(start, ()))
+                return edges
+            edges = self.abstract.get(u, ())
+            if self.cluster_of[u] == end_cluster and u in to_end:
+                edges = list(edges) + [(end, to_end[u])]
+            return edges
+
+        g_score = {start: 0.0}
+        came_from = {start: -1}
+        closed = set()
+        open_set = [(h(start), 0.0, start)]
+        self.pushes += 1
+        while open_set:
+            _, current_g, current = heapq.heappop(open_set)
+            if current in closed:
+                continue
+            closed.add(current)
+            self.expanded += 1
+
+            if current == end:
+                waypoints = [end]
+                while came_from[waypoints[-1]] != -1:
+                    waypoints.append(came_from[waypoints[-1]])
+                waypoints.reverse()
+                return waypoints
+
+            for v, w in neighbors(current):
+                if v in closed:
+                    continue
+                tentative_g = current_g + w
+                if tentative_g < g_score.get(v, inf):
+                    g_score[v] = tentative_g
+                    came_from[v] = current
+                    heapq.heappush(open_set, (tentative_g + h(v), tentative_g, v))
+                    self.pushes += 1
+        return []
+
+    def refine(self, u, v, occupied=None, penalty=1):
+        """
+        把相邻两个航点细化为原图路径
+
+        不同簇的航点之间是一条原始边；同一簇的航点之间在簇内搜索，
+        驶入被占用节点的边乘以惩罚倍数
+
+        Args:
+            u: 航点节点索引
+            v: 下一个航点节点索引
+            occupied: 被占用节点索引集合（不含起点）
+            penalty: 成本倍数
+
+        Returns:
+            list: 从u到v的节点索引路径，簇内不可达时返回空列表
+        """
+        cluster = self.cluster_of[u]
+        if cluster != self.cluster_of[v]:
+            return [u, v]
+        _, prev = self._search_cluster(u, cluster, False, v, occupied, penalty)
+        if v not in prev:
+            return []
+        path = [v]
+        while path[-1] != u:
+            path.append(prev[path[-1]])
+        path.reverse()
+        return path
+
+    def _search_cluster(self, source, cluster, backward, target=None, occupied=None, penalty=1):
+        """
+        限制在簇内的Dijkstra
+
+        Args:
+            source: 起始节点索引
+            cluster: 簇编号
+            backward: 为True时沿入边搜索（得到各节点到source的距离）
+            target: 目标节点索引，出队后提前结束
+            occupied: 被占用节点索引集合，驶入这些节点的边乘以penalty
+            penalty: 成本倍数
+
+        Returns:
+            tuple: (节点索引 -> 距离, 节点索引 -> 前驱)
+        """
+        graph = self.graph
+        if backward:
+            offsets, targets, weights = graph.r_offsets, graph.r_sources, graph.r_weights
+        else:
+            offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+        members = self.members[cluster]
+
+        dist = {source: 0.0}
+        prev = {source: -1}
+        done = set()
+        heap = [(0.0, source)]
+        self.pushes += 1
+        while heap:
+            d, u = heapq.heappop(heap)
+            if u in done:
+                continue
+            done.add(u)
+            self.expanded += 1
+            if u == target:
+                break
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                if v not in members or v in done:
+                    continue
+                # 反向搜索时边为 v->u，惩罚取决于u是否被占用
+                entered = u if backward else v
+                w = weights[e]
+                if occupied and entered in occupied:
+                    w *= penalty
+                nd = d + w
+                if nd < dist.get(v, float('inf')):
+                    dist[v] = nd
+                    prev[v] = u
+                    heapq.heappush(heap, (nd, v))
+                    self.pushes += 1
+        return dist, prev
+
+
+class HierarchicalRoute:
+    """
+    一条逐段细化的分层路线
+
+    waypoints为抽象层给出的航点序列，refined为已细化到的航点下标，
+    之前的航点已经展开为原图路径交给AGV
+    """
+
+    __slots__ = ('waypoints', 'refined')
+
+    def __init__(self, waypoints):
+        """
+        Args:
+            waypoints: 航点节点索引序列
+        """
+        self.waypoints = waypoints
+        self.refined = 0
+
+    @property
+    def finished(self):
+        """是否已全部细化"""
+        return self.refined >= len(self.waypoints) - 1
+
+    @property
+    def tail(self):
+        """已细化部分的最后一个节点索引"""
+        return self.waypoints[self.refined]
+
+    def advance(self, hierarchy, clusters, occupied=None, penalty=1):
+        """
+        继续细化，直到展开了clusters段簇内路线或全部细化
+
+        Args:
+            hierarchy: 簇层次
+            clusters: 本次细化的簇内路段数
+            occupied: 被占用节点索引集合（不含起点）
+            penalty: 成本倍数
+
+        Returns:
+            list: 新展开的节点索引序列（不含当前的tail），簇内不可达时返回None
+        """
+        extension = []
+        cluster_of = hierarchy.cluster_of
+        while not self.finished and clusters > 0:
+            u = self.waypoints[self.refined]
+            v = self.waypoints[self.refined + 1]
+            segment = hierarchy.refine(u, v, occupied, penalty)
+            if not segment:
+                return None
+            extension.extend(segment[1:])
+            self.refined += 1
+            if cluster_of[u] == cluster_of[v]:
+                clusters -= 1
+        return extension
@@ -0,0 +1,293 @@
+"""
+编译图模块
+将节点字典编译为基于数组的CSR（压缩稀疏行）图结构，供路径规划算法复用
+"""
+
+import math
+from array import array
+
+
+class SearchBuffers:
+    """
+    可复用的搜索缓冲区
+
+    按节点索引预分配距离、前驱和标记数组，每次搜索只递增代数(generation)，
+    标记值不等于当前代数的槽位视为未访问，因此重置成本为O(1)。
+    closed数组以同样方式标记已出队扩展的节点
+    """
+
+    # 标记数组使用32位无符号整数，接近上限时整体清零
+    MAX_GENERATION = 0xFFFFFFFF
+
+    def __init__(self, size):
+        self.size = size
+        self.dist = array('d', [0.0]) * size
+        self.prev = array('i', [-1]) * size
+        self.stamp = array('I', [0]) * size
+        self.closed = array('I', [0]) * size
+        self.generation = 0
+
+    def begin(self):
+        """
+        开始一次新的搜索
+
+        Returns:
+            int: 本次搜索使用的代数标记
+        """
+        if self.generation >= self.MAX_GENERATION:
+            self.stamp = array('I', [0]) * self.size
+            self.closed = array('I', [0]) * self.size
+            self.generation = 0
+        self.generation += 1
+        return self.generation
+
+
+class CompiledGraph:
+    """
+    CSR格式的有向图
+
+    节点以整数索引表示，第u个节点的出边位于
+    targets[offsets[u]:offsets[u + 1]]，对应权重在weights的相同位置；
+    反向图（入边）以相同方式存放在 r_offsets/r_sources/r_weights 中
+    """
+
+    def __init__(self, node_ids, offsets, targets, weights, xs, ys, reverse=None):
+        """
+        Args:
+            node_ids: 索引到节点ID的列表
+            offsets: 出边偏移数组，长度为节点数+1
+            targets: 出边目标节点索引数组
+            weights: 出边权重数组
+            xs: 节点x坐标数组
+            ys: 节点y坐标数组
+            reverse: 反向CSR (r_offsets, r_sources, r_weights)，为None时由出边转置得到
+        """
+        self.node_ids = node_ids
+        self.index_of = {node_id: i for i, node_id in enumerate(node_ids)}
+        self.node_count = len(node_ids)
+        self.edge_count = len(targets)
+
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.xs = xs
+        self.ys = ys
+
+        if reverse is None:
+            reverse = self._build_reverse()
+        self.r_offsets, self.r_sources, self.r_weights = reverse
+
+        self.buffers = SearchBuffers(self.node_count)
+        self.backward_buffers = SearchBuffers(self.node_count)
+        self.heuristic_scale = self._compute_heuristic_scale()
+
+        # 编译来源（节点字典），用于判断缓存的编译结果是否仍然有效
+        self.source = None
+
+        # 按半径缓存的邻近节点列表
+        self._nearby = {}
+
+    @classmethod
+    def from_nodes(cls, nodes):
+        """
+        从节点字典编译图
+
+        节点带有反向邻接（Node.predecessors，由MapLoader加载时建立）时直接用于构建反向CSR，
+        否则由出边转置得到
+
+        Args:
+            nodes: 节点字典（MapLoader输出）
+
+        Returns:
+            CompiledGraph: 编译后的图
+        """
+        node_ids = list(nodes.keys())
+        index_of = {node_id: i for i, node_id in enumerate(node_ids)}
+
+        offsets = array('i', [0])
+        targets = array('i')
+        weights = array('d')
+        xs = array('d')
+        ys = array('d')
+
+        for node_id in node_ids:
+            node = nodes[node_id]
+            xs.append(node.x)
+            ys.append(node.y)
+
+            for neighbor_id in node.connections:
+                if neighbor_id in index_of:
+                    targets.append(index_of[neighbor_id])
+                    weights.append(node.neighbors.get(neighbor_id, 100))
+            offsets.append(len(targets))
+
+        reverse = None
+        if any(nodes[node_id].predecessors for node_id in node_ids):
+            reverse = cls._reverse_from_predecessors(nodes, node_ids, index_of)
+
+        graph = cls(node_ids, offsets, targets, weights, xs, ys, reverse)
+        graph.source = nodes
+        return graph
+
+    @staticmethod
+    def _reverse_from_predecessors(nodes, node_ids, index_of):
+        """
+        由节点的反向邻接构建反向CSR
+
+        Returns:
+            tuple: (r_offsets, r_sources, r_weights)
+        """
+        r_offsets = array('i', [0])
+        r_sources = array('i')
+        r_weights = array('d')
+        for node_id in node_ids:
+            for source_id, weight in nodes[node_id].predecessors.items():
+                if source_id in index_of:
+                    r_sources.append(index_of[source_id])
+                    r_weights.append(weight)
+            r_offsets.append(len(r_sources))
+        return r_offsets, r_sources, r_weights
+
+    def _build_reverse(self):
+        """
+        转置出边数组，构建反向CSR
+
+        Returns:
+            tuple: (r_offsets, r_sources, r_weights)
+        """
+        n = self.node_count
+        counts = [0] * (n + 1)
+        for v in self.targets:
+            counts[v + 1] += 1
+        for i in range(n):
+            counts[i + 1] += counts[i]
+
+        r_offsets = array('i', counts)
+        r_sources = array('i', [0]) * self.edge_count
+        r_weights = array('d', [0.0]) * self.edge_count
+        fill = counts[:n]
+        for u in range(n):
+            for e in range(self.offsets[u], self.offsets[u + 1]):
+                v = self.targets[e]
+                slot = fill[v]
+                r_sources[slot] = u
+                r_weights[slot] = self.weights[e]
+                fill[v] = slot + 1
+        return r_offsets, r_sources, r_weights
+
+    def _compute_heuristic_scale(self):
+        """
+        计算坐标距离到边权重的换算系数
+
+        地图坐标经过缩放，边权重来自数据库，直接使用坐标欧氏距离可能高估剩余成本。
+        取所有边 权重/坐标距离 的最小值，保证 系数×欧氏距离 不超过真实路径成本
+
+        Returns:
+            float: 换算系数
+        """
+        scale = None
+        offsets, targets, weights, xs, ys = (self.offsets, self.targets, self.weights,
+                                             self.xs, self.ys)
+        for u in range(self.node_count):
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                length = math.hypot(xs[u] - xs[v], ys[u] - ys[v])
+                if length > 0:
+                    ratio = weights[e] / length
+                    if scale is None or ratio < scale:
+                        scale = ratio
+        return scale if scale is not None else 1.0
+
+    def is_compiled_from(self, nodes):
+        """检查图是否由给定的节点字典编译而来"""
+        return self.source is nodes and self.node_count == len(nodes)
+
+    def out_edges(self, u):
+        """
+        获取节点的出边
+
+        Args:
+            u: 节点索引
+
+        Returns:
+            list: (目标节点索引, 权重) 列表
+        """
+        return [(self.targets[e], self.weights[e])
+                for e in range(self.offsets[u], self.offsets[u + 1])]
+
+    def in_edges(self, v):
+        """
+        获取节点的入边
+
+        Args:
+            v: 节点索引
+
+        Returns:
+            list: (来源节点索引, 权重) 列表
+        """
+        return [(self.r_sources[e], self.r_weights[e])
+                for e in range(self.r_offsets[v], self.r_offsets[v + 1])]
+
+    def edge_weight(self, u, v):
+        """获取边u->v的权重，不存在时返回None"""
+        for e in range(self.offsets[u], self.offsets[u + 1]):
+            if self.targets[e] == v:
+                return self.weights[e]
+        return None
+
+    def nearby_nodes(self, radius):
+        """
+        获取每个节点在给定半径内的其他节点（按网格分桶计算，结果按半径缓存）
+
+        Args:
+            radius: 半径
+
+        Returns:
+            list: 第i项为与节点i距离小于radius的节点索引列表
+        """
+        if radius in self._nearby:
+            return self._nearby[radius]
+
+        nearby = [[] for _ in range(self.node_count)]
+        if radius > 0:
+            buckets = {}
+            for v in range(self.node_count):
+                key = (int(self.xs[v] // radius), int(self.ys[v] // radius))
+                buckets.setdefault(key, []).append(v)
+
+            for (bx, by), members in buckets.items():
+                for dx in (-1, 0, 1):
+                    for dy in (-1, 0, 1):
+                        for u in buckets.get((bx + dx, by + dy), ()):
+                            for v in members:
+                                if u != v and math.hypot(self.xs[u] - self.xs[v],
+                                                         self.ys[u] - self.ys[v]) < radius:
+                                    nearby[v].append(u)
+
+        self._nearby[radius] = nearby
+        return nearby
+
+    def to_ids(self, indices):
+        """将节点索引列表转换为节点ID列表"""
+        node_ids = self.node_ids
+        return [node_ids[i] for i in indices]
+
+    def reconstruct(self, prev, start, end):
+        """
+        根据前驱数组重构索引路径
+
+        Args:
+            prev: 前驱数组
+            start: 起始节点索引
+            end: 目标节点索引
+
+        Returns:
+            list: 节点索引路径
+        """
+        path = [end]
+        current = end
+        while current != start:
+            current = prev[current]
+            path.append(current)
+        path.reverse()
+        return path
\ No newline at end of file
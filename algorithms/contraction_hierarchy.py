@@ -0,0 +1,402 @@
+"""
+收缩层次(Contraction Hierarchies)模块
+离线按重要度逐个收缩节点并添加捷径边，在线查询时只沿层级向上做双向搜索
+"""
+
+import heapq
+import os
+from array import array
+
+import numpy as np
+
+
+class ContractionHierarchy:
+    """
+    有向图上的收缩层次
+
+    rank[v] 为节点的收缩顺序。前向搜索图只保留 rank 升高的出边，
+    后向搜索图只保留 rank 升高的入边；捷径边记录被跳过的中间节点以便展开
+    """
+
+    # 见证搜索最多确定的节点数，超过后直接添加捷径（只影响捷径数量，不影响正确性）
+    WITNESS_SETTLE_LIMIT = 200
+
+    FILE_SUFFIX = "ch.npz"
+
+    def __init__(self, graph, rank, forward, backward, shortcut_mids):
+        """
+        Args:
+            graph: 编译图
+            rank: 节点收缩顺序数组
+            forward: 前向上行图 (offsets, targets, weights)
+            backward: 后向上行图 (offsets, targets, weights)
+            shortcut_mids: 捷径边中间节点字典 {(u, v): mid}
+        """
+        self.graph = graph
+        self.rank = rank
+        self.forward = forward
+        self.backward = backward
+        self.shortcut_mids = shortcut_mids
+
+    # =============================================================================
+    # 预处理
+    # =============================================================================
+
+    @classmethod
+    def build(cls, graph):
+        """
+        对编译图执行收缩预处理
+
+        Args:
+            graph: 编译图
+
+        Returns:
+            ContractionHierarchy: 收缩层次
+        """
+        n = graph.node_count
+        out_edges = [{} for _ in range(n)]
+        in_edges = [{} for _ in range(n)]
+        for u in range(n):
+            for e in range(graph.offsets[u], graph.offsets[u + 1]):
+                v = graph.targets[e]
+                w = graph.weights[e]
+                if u == v:
+                    continue
+                if v not in out_edges[u] or w < out_edges[u][v]:
+                    out_edges[u][v] = w
+                    in_edges[v][u] = w
+
+        # 所有边（含捷径）按原始方向记录，收缩后仍然保留
+        all_edges = {}
+        for u in range(n):
+            for v, w in out_edges[u].items():
+                all_edges[(u, v)] = w
+        shortcut_mids = {}
+
+        contracted = bytearray(n)
+        contracted_neighbors = [0] * n
+        rank = array('i', [0]) * n
+
+        heap = [(cls._priority(v, out_edges, in_edges, contracted_neighbors), v) for v in range(n)]
+        heapq.heapify(heap)
+
+        order = 0
+        while heap:
+            _, v = heapq.heappop(heap)
+            if contracted[v]:
+                continue
+
+            # 惰性更新：重新计算优先级，不再是最小值时放回堆中
+            priority = cls._priority(v, out_edges, in_edges, contracted_neighbors)
+            if heap and priority > heap[0][0]:
+                heapq.heappush(heap, (priority, v))
+                continue
+
+            for u, w, weight in cls._needed_shortcuts(v, out_edges, in_edges):
+                if weight < out_edges[u].get(w, float('inf')):
+                    out_edges[u][w] = weight
+                    in_edges[w][u] = weight
+                if weight < all_edges.get((u, w), float('inf')):
+                    all_edges[(u, w)] = weight
+                    shortcut_mids[(u, w)] = v
+
+            for u in in_edges[v]:
+                del out_edges[u][v]
+                contracted_neighbors[u] += 1
+            for w in out_edges[v]:
+                del in_edges[w][v]
+                contracted_neighbors[w] += 1
+            out_edges[v] = {}
+            in_edges[v] = {}
+
+            contracted[v] = 1
+            rank[v] = order
+            order += 1
+
+        forward_lists = [[] for _ in range(n)]
+        backward_lists = [[] for _ in range(n)]
+        for (u, v), w in all_edges.items():
+            if rank[u] < rank[v]:
+                forward_lists[u].append((v, w))
+            else:
+                backward_lists[v].append((u, w))
+
+        return cls(graph, rank, cls._to_csr(forward_lists), cls._to_csr(backward_lists),
+                   shortcut_mids)
+
+    @classmethod
+    def _priority(cls, v, out_edges, in_edges, contracted_neighbors):
+        """节点收缩优先级：边差（新增捷径数减去删除边数）加已收缩邻居数"""
+        shortcuts = len(cls._needed_shortcuts(v, out_edges, in_edges))
+        removed = len(out_edges[v]) + len(in_edges[v])
+        return shortcuts - removed + contracted_neighbors[v]
+
+    @classmethod
+    def _needed_shortcuts(cls, v, out_edges, in_edges):
+        """
+        计算收缩节点v所需的捷径
+
+        对每个入邻居u做一次见证搜索（不经过v），
+        找不到不长于 u->v->w 的路径时需要添加捷径u->w
+
+        Returns:
+            list: (u, w, 捷径权重) 列表
+        """
+        shortcuts = []
+        outgoing = out_edges[v]
+        if not outgoing:
+            return shortcuts
+
+        for u, weight_uv in in_edges[v].items():
+            limits = {w: weight_uv + weight_vw for w, weight_vw in outgoing.items() if w != u}
+            if not limits:
+                continue
+            witness = cls._witness_search(u, v, limits, max(limits.values()), out_edges)
+            for w, limit in limits.items():
+                if witness.get(w, float('inf')) > limit:
+                    shortcuts.append((u, w, limit))
+        return shortcuts
+
+    @classmethod
+    def _witness_search(cls, source, excluded, targets, max_cost, out_edges):
+        """
+        受限的见证Dijkstra搜索
+
+        提前终止时未确定的距离仍是真实存在的路径长度，可以作为见证
+
+        Returns:
+            dict: 搜索到的 {节点: 距离上界}
+        """
+        dist = {source: 0.0}
+        remaining = len(targets)
+        heap = [(0.0, source)]
+        settled = 0
+
+        while heap and remaining and settled < cls.WITNESS_SETTLE_LIMIT:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            if d > max_cost:
+                break
+            settled += 1
+            if u in targets:
+                remaining -= 1
+
+            for w, weight in out_edges[u].items():
+                if w == excluded:
+                    continue
+                new_distance = d + weight
+                if new_distance < dist.get(w, float('inf')):
+                    dist[w] = new_distance
+                    heapq.heappush(heap, (new_distance, w))
+        return dist
+
+    @staticmethod
+    def _to_csr(adjacency):
+        """将邻接列表转换为CSR数组"""
+        offsets = array('i', [0])
+        targets = array('i')
+        weights = array('d')
+        for edges in adjacency:
+            for v, w in edges:
+                targets.append(v)
+                weights.append(w)
+            offsets.append(len(targets))
+        return offsets, targets, weights
+
+    # =============================================================================
+    # 序列化
+    # =============================================================================
+
+    @classmethod
+    def load_or_build(cls, graph, db_path, map_hash):
+        """
+        加载与地图内容哈希匹配的收缩层次，不存在时构建并保存
+
+        Args:
+            graph: 编译图
+            db_path: 地图数据库路径，预处理文件保存在其旁边
+            map_hash: 地图数据库内容哈希
+
+        Returns:
+            ContractionHierarchy: 收缩层次
+        """
+        hierarchy = cls.load_cached(graph, db_path, map_hash)
+        if hierarchy is not None:
+            return hierarchy
+
+        hierarchy = cls.build(graph)
+        hierarchy.save(cls._cache_path(db_path, map_hash))
+        return hierarchy
+
+    @classmethod
+    def load_cached(cls, graph, db_path, map_hash):
+        """
+        只加载已保存的收缩层次，不预处理
+
+        Args:
+            graph: 编译图
+            db_path: 地图数据库路径
+            map_hash: 地图数据库内容哈希
+
+        Returns:
+            ContractionHierarchy: 收缩层次，文件不存在或与编译图不匹配时返回None
+        """
+        path = cls._cache_path(db_path, map_hash)
+        if not os.path.exists(path):
+            return None
+        return cls.load(graph, path)
+
+    @classmethod
+    def _cache_path(cls, db_path, map_hash):
+        """获取预处理文件路径"""
+        return f"{db_path}.{map_hash[:16]}.{cls.FILE_SUFFIX}"
+
+    def save(self, path):
+        """
+        保存到npz文件（先写临时文件再重命名）
+
+        Args:
+            path: 文件路径
+        """
+        mids = np.array([(u, v, m) for (u, v), m in self.shortcut_mids.items()],
+                        dtype=np.int32).reshape(-1, 3)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                rank=np.frombuffer(self.rank, dtype=np.int32),
+                forward_offsets=np.frombuffer(self.forward[0], dtype=np.int32),
+                forward_targets=np.frombuffer(self.forward[1], dtype=np.int32),
+                forward_weights=np.frombuffer(self.forward[2], dtype=np.float64),
+                backward_offsets=np.frombuffer(self.backward[0], dtype=np.int32),
+                backward_targets=np.frombuffer(self.backward[1], dtype=np.int32),
+                backward_weights=np.frombuffer(self.backward[2], dtype=np.float64),
+                shortcut_mids=mids,
+                node_ids=np.array([str(node_id) for node_id in self.graph.node_ids])
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, graph, path):
+        """
+        从npz文件加载
+
+        Args:
+            graph: 编译图
+            path: 文件路径
+
+        Returns:
+            ContractionHierarchy: 收缩层次，文件与图的节点ID顺序不一致时返回None
+        """
+        with np.load(path) as data:
+            if len(data['rank']) != graph.node_count or 'node_ids' not in data:
+                return None
+            if data['node_ids'].tolist() != [str(node_id) for node_id in graph.node_ids]:
+                return None
+
+            def to_array(name, typecode):
+                return array(typecode, data[name].tobytes())
+
+            rank = to_array('rank', 'i')
+            forward = (to_array('forward_offsets', 'i'), to_array('forward_targets', 'i'),
+                       to_array('forward_weights', 'd'))
+            backward = (to_array('backward_offsets', 'i'), to_array('backward_targets', 'i'),
+                        to_array('backward_weights', 'd'))
+            shortcut_mids = {(int(u), int(v)): int(m) for u, v, m in data['shortcut_mids']}
+        return cls(graph, rank, forward, backward, shortcut_mids)
+
+    # =============================================================================
+    # 查询
+    # =============================================================================
+
+    def query(self, start, end):
+        """
+        双向上行搜索并展开捷径
+
+        Args:
+            start: 起始节点索引
+            end: 目标节点索引
+
+        Returns:
+            tuple: (节点索引路径, 距离)，不可达时返回 ([], inf)
+        """
+        inf = float('inf')
+        if start == end:
+            return [start], 0.0
+
+        f_offsets, f_targets, f_weights = self.forward
+        b_offsets, b_targets, b_weights = self.backward
+
+        dist = ({start: 0.0}, {end: 0.0})
+        prev = ({start: -1}, {end: -1})
+        heaps = ([(0.0, start)], [(0.0, end)])
+        graphs = ((f_offsets, f_targets, f_weights), (b_offsets, b_targets, b_weights))
+        best = inf
+        meeting = -1
+
+        while heaps[0] or heaps[1]:
+            # 两个方向的最小键都不小于当前最优值时停止
+            top_forward = heaps[0][0][0] if heaps[0] else inf
+            top_backward = heaps[1][0][0] if heaps[1] else inf
+            if min(top_forward, top_backward) >= best:
+                break
+
+            side = 0 if top_forward <= top_backward else 1
+            d, u = heapq.heappop(heaps[side])
+            own_dist = dist[side]
+            if d > own_dist[u]:
+                continue
+
+            other = dist[1 - side].get(u)
+            if other is not None and d + other < best:
+                best = d + other
+                meeting = u
+
+            offsets, targets, weights = graphs[side]
+            own_prev = prev[side]
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                new_distance = d + weights[e]
+                if new_distance < own_dist.get(v, inf):
+                    own_dist[v] = new_distance
+                    own_prev[v] = u
+                    heapq.heappush(heaps[side], (new_distance, v))
+
+        if meeting < 0:
+            return [], inf
+
+        # 前向部分：start -> meeting
+        up_path = [meeting]
+        current = meeting
+        while prev[0][current] != -1:
+            current = prev[0][current]
+            up_path.append(current)
+        up_path.reverse()
+
+        # 后向部分：meeting -> end
+        down_path = []
+        current = meeting
+        while prev[1][current] != -1:
+            current = prev[1][current]
+            down_path.append(current)
+
+        packed = up_path + down_path
+        path = [packed[0]]
+        for u, v in zip(packed, packed[1:]):
+            self._unpack_edge(u, v, path)
+        return path, best
+
+    def _unpack_edge(self, u, v, path):
+        """将边u->v展开为原图路径并追加到path（不含u）"""
+        stack = [(u, v)]
+        shortcut_mids = self.shortcut_mids
+        while stack:
+            a, b = stack.pop()
+            mid = shortcut_mids.get((a, b))
+            if mid is None:
+                path.append(b)
+            else:
+                # 先展开前半段，后入栈的先处理
+                stack.append((mid, b))
+                stack.append((a, mid))
\ No newline at end of file
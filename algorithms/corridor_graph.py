@@ -0,0 +1,427 @@
+"""
+走廊折叠模块
+把只有一进一出（或双向通行、只连接两个邻居）的节点组成的走廊折叠为一条超边，
+在折叠后的核心图上搜索，再按超边保存的节点序列展开为原图路径
+"""
+
+import copy
+from array import array
+
+from .compiled_graph import CompiledGraph
+
+
+class CorridorGraph:
+    """
+    折叠走廊后的核心图
+
+    核心节点是原图中不属于走廊的节点，核心图的每条边对应原图中一条链
+    chains[e] = [u, 走廊节点..., v]，chain_weights[e] 为链上各原始边的权重。
+    折叠时保证核心图没有自环和平行边（否则保留链上第一个走廊节点为核心节点），
+    因此核心路径中相邻两个节点唯一确定一条超边。
+
+    起点或终点在走廊内部时，以核心图末尾的两个虚拟节点代替它们接入搜索：
+    每个核心节点预留一条驶向虚拟终点的出边和一条来自虚拟起点的入边，
+    虚拟起点预留两条出边、虚拟终点预留两条入边（走廊节点最多位于两条链上）。
+    未使用的预留边是权重为0的自环，搜索不会经由它们松弛任何节点，
+    因此接入和撤销都只改写几个数组元素，每次查询只需一次搜索
+    """
+
+    # 虚拟起点/终点预留的边数
+    SPLICE_SLOTS = 2
+
+    def __init__(self, graph, core, core_of, original, chains, chain_weights, positions,
+                 edge_slots, reverse_slots, splice_slots, splice_reverse_slots):
+        """
+        Args:
+            graph: 原编译图
+            core: 核心图（CompiledGraph），最后两个节点为虚拟起点和虚拟终点
+            core_of: 原图节点索引 -> 核心节点索引，走廊节点为-1
+            original: 核心节点索引 -> 原图节点索引，虚拟节点在接入时填写
+            chains: 各核心边对应的原图节点索引链
+            chain_weights: 各核心边对应的原始边权重列表
+            positions: 原图节点索引 -> [(核心边, 在链中的下标)]，只包含链上除起点外的节点
+            edge_slots: 核心边 -> 正向CSR中的位置
+            reverse_slots: 核心边 -> 反向CSR中的位置
+            splice_slots: 核心节点 -> 驶向虚拟终点的预留出边位置
+            splice_reverse_slots: 核心节点 -> 来自虚拟起点的预留入边位置
+        """
+        self.graph = graph
+        self.core = core
+        self.core_of = core_of
+        self.original = original
+        self.chains = chains
+        self.chain_weights = chain_weights
+        self.positions = positions
+        self.virtual_start = core.node_count - 2
+        self.virtual_end = core.node_count - 1
+
+        self._edge_slots = edge_slots
+        self._reverse_slots = reverse_slots
+        self._splice_slots = splice_slots
+        self._splice_reverse_slots = splice_reverse_slots
+
+        # (核心起点, 核心终点) -> 核心边
+        self._edge_of = {(core_of[chain[0]], core_of[chain[-1]]): e
+                         for e, chain in enumerate(chains)}
+
+        # 最近一次计入占用惩罚的视图 (被占用节点集合, 惩罚倍数, 视图)
+        self._view = None
+
+    @property
+    def reduction(self):
+        """折叠掉的节点比例"""
+        if not self.graph.node_count:
+            return 0.0
+        return 1.0 - (self.core.node_count - 2) / self.graph.node_count
+
+    @classmethod
+    def build(cls, graph):
+        """
+        折叠编译图中的走廊
+
+        Args:
+            graph: 编译图
+
+        Returns:
+            CorridorGraph: 折叠结果
+        """
+        n = graph.node_count
+        kept = [not cls._is_corridor(graph, v) for v in range(n)]
+
+        while True:
+            promoted = cls._collect_chains(graph, kept)
+            if isinstance(promoted, int):
+                # 出现自环、平行边或纯走廊环时保留该走廊节点，重新折叠
+                kept[promoted] = True
+                continue
+            chains, chain_weights = promoted
+            break
+
+        original = [v for v in range(n) if kept[v]]
+        k = len(original)
+        core_of = array('i', [-1]) * n
+        for c, v in enumerate(original):
+            core_of[v] = c
+        virtual_start, virtual_end = k, k + 1
+
+        outgoing = [[] for _ in range(k)]
+        incoming = [[] for _ in range(k)]
+        for e, chain in enumerate(chains):
+            outgoing[core_of[chain[0]]].append(e)
+            incoming[core_of[chain[-1]]].append(e)
+
+        # 正向CSR：每个核心节点的超边之后是一条驶向虚拟终点的预留边
+        offsets = array('i', [0])
+        targets = array('i')
+        weights = array('d')
+        edge_slots = array('i', [0]) * len(chains)
+        splice_slots = array('i', [0]) * k
+        for c in range(k):
+            for e in outgoing[c]:
+                edge_slots[e] = len(targets)
+                targets.append(core_of[chains[e][-1]])
+                weights.append(sum(chain_weights[e]))
+            splice_slots[c] = len(targets)
+            targets.append(c)
+            weights.append(0.0)
+            offsets.append(len(targets))
+        targets.extend([virtual_start] * cls.SPLICE_SLOTS)
+        weights.extend([0.0] * cls.SPLICE_SLOTS)
+        offsets.append(len(targets))
+        offsets.append(len(targets))
+
+        # 反向CSR：每个核心节点的入边之后是一条来自虚拟起点的预留边
+        r_offsets = array('i', [0])
+        r_sources = array('i')
+        r_weights = array('d')
+        reverse_slots = array('i', [0]) * len(chains)
+        splice_reverse_slots = array('i', [0]) * k
+        for c in range(k):
+            for e in incoming[c]:
+                reverse_slots[e] = len(r_sources)
+                r_sources.append(core_of[chains[e][0]])
+                r_weights.append(sum(chain_weights[e]))
+            splice_reverse_slots[c] = len(r_sources)
+            r_sources.append(c)
+            r_weights.append(0.0)
+            r_offsets.append(len(r_sources))
+        r_offsets.append(len(r_sources))
+        r_sources.extend([virtual_end] * cls.SPLICE_SLOTS)
+        r_weights.extend([0.0] * cls.SPLICE_SLOTS)
+        r_offsets.append(len(r_sources))
+
+        core = CompiledGraph([graph.node_ids[v] for v in original] + [None, None],
+                             offsets, targets, weights,
+                             array('d', (graph.xs[v] for v in original)) + array('d', [0.0, 0.0]),
+                             array('d', (graph.ys[v] for v in original)) + array('d', [0.0, 0.0]),
+                             (r_offsets, r_sources, r_weights))
+        # 虚拟节点接入的是部分链，沿用原图的换算系数才能保证欧氏启发值仍是下界
+        core.heuristic_scale = graph.heuristic_scale
+
+        positions = {}
+        for e, chain in enumerate(chains):
+            for i in range(1, len(chain)):
+                positions.setdefault(chain[i], []).append((e, i))
+
+        return cls(graph, core, core_of, array('i', original + [-1, -1]), chains, chain_weights,
+                   positions, edge_slots, reverse_slots, splice_slots, splice_reverse_slots)
+
+    @staticmethod
+    def _is_corridor(graph, v):
+        """节点只有一个前驱和一个（不同的）后继，或与同样两个邻居双向相连，且没有平行边"""
+        outs = [graph.targets[e] for e in range(graph.offsets[v], graph.offsets[v + 1])]
+        ins = [graph.r_sources[e] for e in range(graph.r_offsets[v], graph.r_offsets[v + 1])]
+        out_set = set(outs)
+        in_set = set(ins)
+        if len(out_set) != len(outs) or len(in_set) != len(ins) or v in out_set:
+            return False
+        if len(outs) == 1 and len(ins) == 1:
+            return out_set != in_set
+        return len(outs) == 2 and out_set == in_set
+
+    @staticmethod
+    def _collect_chains(graph, kept):
+        """
+        从每个核心节点的每条出边出发沿走廊走到下一个核心节点
+
+        Returns:
+            tuple: (链列表, 权重列表)；需要保留某个走廊节点时返回该节点索引
+        """
+        offsets = graph.offsets
+        targets = graph.targets
+        weights = graph.weights
+        chains = []
+        chain_weights = []
+        pairs = {}
+        visited = set()
+
+        for u in range(graph.node_count):
+            if not kept[u]:
+                continue
+            for e in range(offsets[u], offsets[u + 1]):
+                chain = [u]
+                chain_weight = [weights[e]]
+                previous, v = u, targets[e]
+                while not kept[v]:
+                    chain.append(v)
+                    visited.add(v)
+                    # 走廊节点的后继中不走回头路的那一个
+                    step = None
+                    for f in range(offsets[v], offsets[v + 1]):
+                        if targets[f] != previous or offsets[v + 1] - offsets[v] == 1:
+                            step = f
+                            break
+                    previous, v = v, targets[step]
+                    chain_weight.append(weights[step])
+                chain.append(v)
+
+                if v == u:
+                    if len(chain) > 2:
+                        return chain[1]
+                    # 原图的自环不会出现在最短路线上
+                    continue
+                existing = pairs.get((u, v))
+                if existing is not None:
+                    if len(chain) > 2:
+                        return chain[1]
+                    if len(chains[existing]) > 2:
+                        return chains[existing][1]
+                    # 两核心节点间的平行直达边只保留较短的一条
+                    if chain_weight[0] < chain_weights[existing][0]:
+                        chain_weights[existing] = chain_weight
+                    continue
+                pairs[(u, v)] = len(chains)
+                chains.append(chain)
+                chain_weights.append(chain_weight)
+
+        # 没有被任何链经过的走廊节点构成纯走廊环
+        for v in range(graph.node_count):
+            if not kept[v] and v not in visited:
+                return v
+        return chains, chain_weights
+
+    # =============================================================================
+    # 查询
+    # =============================================================================
+
+    def view(self, occupied, penalty):
+        """
+        计入占用惩罚的核心图：链上驶入被占用节点的原始边乘以惩罚倍数，
+        惩罚已计入超边权重，在视图上搜索时不再传入被占用节点
+
+        Args:
+            occupied: 被占用的原图节点索引集合（不含起点）
+            penalty: 成本倍数
+
+        Returns:
+            CompiledGraph: 与核心图共享结构和搜索缓冲区、只替换权重的图
+        """
+        if not occupied:
+            return self.core
+        key = frozenset(occupied)
+        if self._view is not None and self._view[0] == key and self._view[1] == penalty:
+            return self._view[2]
+
+        core = self.core
+        weights = core.weights[:]
+        r_weights = core.r_weights[:]
+        positions = self.positions
+        chain_weights = self.chain_weights
+        edge_slots = self._edge_slots
+        reverse_slots = self._reverse_slots
+        for v in key:
+            for e, i in positions.get(v, ()):
+                extra = chain_weights[e][i - 1] * (penalty - 1)
+                weights[edge_slots[e]] += extra
+                r_weights[reverse_slots[e]] += extra
+
+        view = copy.copy(core)
+        view.weights = weights
+        view.r_weights = r_weights
+        self._view = (key, penalty, view)
+        return view
+
+    def attach(self, view, start, end, occupied, penalty):
+        """
+        把起点和终点接入视图：核心节点直接使用，走廊节点改用虚拟节点，
+        虚拟节点与链端点之间的预留边权重为计入占用惩罚的部分链成本。
+        搜索结束后必须调用detach撤销
+
+        Args:
+            view: 视图
+            start: 起始节点索引（原图）
+            end: 目标节点索引（原图）
+            occupied: 被占用的原图节点索引集合（不含起点）
+            penalty: 成本倍数
+
+        Returns:
+            tuple: (核心起点, 核心终点, {链终点: 从起点走到它的原图节点序列},
+                    {链起点: 从它走到终点的原图节点序列})
+        """
+        heads = {}
+        tails = {}
+        source = self.core_of[start]
+        target = self.core_of[end]
+
+        if source < 0:
+            source = self.virtual_start
+            self._place(view, source, start)
+            slot = view.offsets[source]
+            for e, i in self.positions[start]:
+                chain = self.chains[e]
+                b = self.core_of[chain[-1]]
+                cost = self._chain_cost(e, i, len(chain) - 1, occupied, penalty)
+                r_slot = self._splice_reverse_slots[b]
+                view.targets[slot] = b
+                view.weights[slot] = cost
+                view.r_sources[r_slot] = source
+                view.r_weights[r_slot] = cost
+                heads[b] = chain[i:]
+                slot += 1
+
+        if target < 0:
+            target = self.virtual_end
+            self._place(view, target, end)
+            r_slot = view.r_offsets[target]
+            for e, i in self.positions[end]:
+                chain = self.chains[e]
+                a = self.core_of[chain[0]]
+                cost = self._chain_cost(e, 0, i, occupied, penalty)
+                slot = self._splice_slots[a]
+                view.targets[slot] = target
+                view.weights[slot] = cost
+                view.r_sources[r_slot] = a
+                view.r_weights[r_slot] = cost
+                tails[a] = chain[:i + 1]
+                r_slot += 1
+
+        return source, target, heads, tails
+
+    def _place(self, view, virtual, v):
+        """让虚拟节点代表原图节点v"""
+        self.original[virtual] = v
+        view.xs[virtual] = self.graph.xs[v]
+        view.ys[virtual] = self.graph.ys[v]
+
+    def detach(self, view, heads, tails):
+        """撤销attach接入的虚拟节点，预留边恢复为权重为0的自环"""
+        source = self.virtual_start
+        for slot in range(view.offsets[source], view.offsets[source + 1]):
+            view.targets[slot] = source
+            view.weights[slot] = 0.0
+        for b in heads:
+            slot = self._splice_reverse_slots[b]
+            view.r_sources[slot] = b
+            view.r_weights[slot] = 0.0
+
+        target = self.virtual_end
+        for slot in range(view.r_offsets[target], view.r_offsets[target + 1]):
+            view.r_sources[slot] = target
+            view.r_weights[slot] = 0.0
+        for a in tails:
+            slot = self._splice_slots[a]
+            view.targets[slot] = a
+            view.weights[slot] = 0.0
+
+    def direct(self, start, end, occupied, penalty):
+        """
+        起点在走廊内部、终点在同一条链上更靠后的位置时，沿链直达的成本和路径；
+        这条路线不经过任何核心节点，虚拟节点之间的搜索找不到它
+
+        Returns:
+            tuple: (成本, 原图节点索引路径)，不存在时返回None
+        """
+        if self.core_of[start] >= 0:
+            return None
+        best = None
+        start_positions = dict(self.positions.get(start, ()))
+        for e, k in self.positions.get(end, ()):
+            i = start_positions.get(e)
+            if i is None or i >= k:
+                continue
+            cost = self._chain_cost(e, i, k, occupied, penalty)
+            if best is None or cost < best[0]:
+                best = (cost, self.chains[e][i:k + 1])
+        return best
+
+    def _chain_cost(self, e, i, k, occupied, penalty):
+        """链e上从下标i走到下标k的成本"""
+        chain = self.chains[e]
+        chain_weight = self.chain_weights[e]
+        cost = 0.0
+        for j in range(i + 1, k + 1):
+            w = chain_weight[j - 1]
+            cost += w * penalty if occupied and chain[j] in occupied else w
+        return cost
+
+    def expand(self, path, heads, tails):
+        """
+        把核心路径展开为原图节点索引路径
+
+        Args:
+            path: 核心节点索引路径
+            heads: attach返回的虚拟起点展开序列
+            tails: attach返回的虚拟终点展开序列
+
+        Returns:
+            list: 原图节点索引路径
+        """
+        if not path:
+            return []
+        result = []
+        if path[0] == self.virtual_start:
+            result.extend(heads[path[1]][:-1])
+            path = path[1:]
+        tail = None
+        if path[-1] == self.virtual_end:
+            tail = tails[path[-2]]
+            path = path[:-1]
+
+        edge_of = self._edge_of
+        chains = self.chains
+        result.append(self.original[path[0]])
+        for a, b in zip(path, path[1:]):
+            result.extend(chains[edge_of[a, b]][1:])
+        if tail is not None:
+            result.extend(tail[1:])
+        return result
@@ -0,0 +1,291 @@
+"""
+全源最短距离表模块
+预先计算所有节点对的最短距离和下一跳，并以内存映射文件的形式持久化
+"""
+
+import heapq
+import os
+
+import numpy as np
+
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import dijkstra as csgraph_dijkstra
+except ImportError:
+    # 未安装scipy时逐源执行纯Python的Dijkstra
+    csr_matrix = None
+    csgraph_dijkstra = None
+
+
+class DistanceOracle:
+    """
+    全源最短距离与下一跳表
+
+    distances[s, t] 为不计占用惩罚时 s 到 t 的最短距离（不可达为inf），
+    next_hops[s, t] 为 s 前往 t 的第一步节点索引（不可达为-1）
+    """
+
+    # 表大小随节点数平方增长，超过该节点数时不构建
+    MAX_NODES = 3000
+
+    DIST_SUFFIX = "dist.npy"
+    HOP_SUFFIX = "hop.npy"
+    IDS_SUFFIX = "ids.npy"
+
+    def __init__(self, graph, distances, next_hops):
+        """
+        Args:
+            graph: 编译图
+            distances: 距离矩阵 (N×N float64)
+            next_hops: 下一跳矩阵 (N×N int32)
+        """
+        self.graph = graph
+        self.distances = distances
+        self.next_hops = next_hops
+
+    @classmethod
+    def load_or_build(cls, graph, db_path, map_hash, stop=None):
+        """
+        加载与地图内容哈希匹配的距离表，不存在时构建并保存
+
+        Args:
+            graph: 编译图
+            db_path: 地图数据库路径，距离表文件保存在其旁边
+            map_hash: 地图数据库内容哈希
+            stop: threading.Event，置位后放弃构建
+
+        Returns:
+            DistanceOracle: 距离表，节点数超过上限或放弃构建时返回None
+        """
+        if graph.node_count > cls.MAX_NODES:
+            return None
+
+        oracle = cls.load_cached(graph, db_path, map_hash)
+        if oracle is not None:
+            return oracle
+
+        dist_path = cls._cache_path(db_path, map_hash, cls.DIST_SUFFIX)
+        hop_path = cls._cache_path(db_path, map_hash, cls.HOP_SUFFIX)
+        ids_path = cls._cache_path(db_path, map_hash, cls.IDS_SUFFIX)
+        if not cls._build_files(graph, dist_path, hop_path, ids_path, stop):
+            return None
+        return cls(graph, np.load(dist_path, mmap_mode='r'), np.load(hop_path, mmap_mode='r'))
+
+    @classmethod
+    def load_cached(cls, graph, db_path, map_hash):
+        """
+        只加载已保存的距离表，不构建
+
+        除形状外还核对保存时的节点ID顺序，节点顺序不同的表按索引查询会得到错误的距离
+
+        Args:
+            graph: 编译图
+            db_path: 地图数据库路径
+            map_hash: 地图数据库内容哈希
+
+        Returns:
+            DistanceOracle: 距离表，文件不存在或与编译图不匹配时返回None
+        """
+        dist_path = cls._cache_path(db_path, map_hash, cls.DIST_SUFFIX)
+        hop_path = cls._cache_path(db_path, map_hash, cls.HOP_SUFFIX)
+        ids_path = cls._cache_path(db_path, map_hash, cls.IDS_SUFFIX)
+        if not all(os.path.exists(path) for path in (dist_path, hop_path, ids_path)):
+            return None
+
+        shape = (graph.node_count, graph.node_count)
+        if np.load(ids_path).tolist() != [str(node_id) for node_id in graph.node_ids]:
+            return None
+        distances = np.load(dist_path, mmap_mode='r')
+        next_hops = np.load(hop_path, mmap_mode='r')
+        if distances.shape != shape or next_hops.shape != shape:
+            return None
+        return cls(graph, distances, next_hops)
+
+    @classmethod
+    def build(cls, graph):
+        """
+        在内存中构建距离表（不持久化）
+
+        Args:
+            graph: 编译图
+
+        Returns:
+            DistanceOracle: 距离表
+        """
+        shape = (graph.node_count, graph.node_count)
+        distances = np.empty(shape, dtype=np.float64)
+        next_hops = np.empty(shape, dtype=np.int32)
+        cls._fill_tables(graph, distances, next_hops)
+        return cls(graph, distances, next_hops)
+
+    @staticmethod
+    def _cache_path(db_path, map_hash, suffix):
+        """获取距离表文件路径"""
+        return f"{db_path}.{map_hash[:16]}.{suffix}"
+
+    @classmethod
+    def _build_files(cls, graph, dist_path, hop_path, ids_path, stop=None):
+        """
+        构建距离表并写入内存映射文件
+
+        先写入临时文件再重命名，避免中断时留下不完整的距离表；
+        节点ID最后写入，加载时三个文件齐全才视为有效
+
+        Returns:
+            bool: 是否构建完成，放弃构建时删除临时文件并返回False
+        """
+        shape = (graph.node_count, graph.node_count)
+        dist_tmp = dist_path + ".tmp"
+        hop_tmp = hop_path + ".tmp"
+        ids_tmp = ids_path + ".tmp"
+
+        distances = np.lib.format.open_memmap(dist_tmp, mode='w+', dtype=np.float64, shape=shape)
+        next_hops = np.lib.format.open_memmap(hop_tmp, mode='w+', dtype=np.int32, shape=shape)
+        finished = cls._fill_tables(graph, distances, next_hops, stop)
+        distances.flush()
+        next_hops.flush()
+        del distances, next_hops
+        if not finished:
+            os.remove(dist_tmp)
+            os.remove(hop_tmp)
+            return False
+
+        with open(ids_tmp, 'wb') as f:
+            np.save(f, np.array([str(node_id) for node_id in graph.node_ids]))
+        os.replace(dist_tmp, dist_path)
+        os.replace(hop_tmp, hop_path)
+        os.replace(ids_tmp, ids_path)
+        return True
+
+    @classmethod
+    def _fill_tables(cls, graph, distances, next_hops, stop=None):
+        """
+        计算全源最短距离和下一跳
+
+        安装了scipy时在反向图上一次性求解：以t为源的反向最短路树中，s的前驱
+        正是s前往t的下一跳，转置后即为按行存放的下一跳表。否则逐源执行Dijkstra
+
+        Args:
+            graph: 编译图
+            distances: 待填充的距离矩阵
+            next_hops: 待填充的下一跳矩阵
+            stop: threading.Event，置位后放弃构建
+
+        Returns:
+            bool: 是否填充完成
+        """
+        if csgraph_dijkstra is not None:
+            cls._fill_tables_csgraph(graph, distances, next_hops)
+            return True
+        return cls._fill_tables_python(graph, distances, next_hops, stop)
+
+    @staticmethod
+    def _fill_tables_csgraph(graph, distances, next_hops):
+        """用scipy.sparse.csgraph在反向图上求解全源最短路"""
+        n = graph.node_count
+        offsets = np.asarray(graph.offsets, dtype=np.int64)
+        sources = np.repeat(np.arange(n), np.diff(offsets))
+        targets = np.asarray(graph.targets, dtype=np.int64)
+        weights = np.asarray(graph.weights, dtype=np.float64)
+
+        # 平行边只保留最短的一条（csr_matrix会把重复项相加）；
+        # 零权重边用极小正数代替，避免被稀疏矩阵当作不存在的边
+        order = np.lexsort((weights, sources, targets))
+        targets, sources, weights = targets[order], sources[order], weights[order]
+        keep = np.ones(len(order), dtype=bool)
+        keep[1:] = (targets[1:] != targets[:-1]) | (sources[1:] != sources[:-1])
+        weights = np.maximum(weights[keep], np.finfo(np.float64).tiny)
+        reverse = csr_matrix((weights, (targets[keep], sources[keep])), shape=(n, n))
+
+        dist, predecessors = csgraph_dijkstra(reverse, directed=True, return_predecessors=True)
+        dist[dist < 1e-300] = 0.0
+        hops = predecessors.T.astype(np.int32)
+        hops[hops < 0] = -1
+        np.fill_diagonal(hops, np.arange(n, dtype=np.int32))
+        distances[:, :] = dist.T
+        next_hops[:, :] = hops
+
+    @staticmethod
+    def _fill_tables_python(graph, distances, next_hops, stop=None):
+        """逐源执行Dijkstra，按行批量写入距离和下一跳"""
+        n = graph.node_count
+        offsets = graph.offsets
+        targets = graph.targets
+        weights = graph.weights
+        inf = float('inf')
+
+        for source in range(n):
+            if stop is not None and stop.is_set():
+                return False
+            dist = [inf] * n
+            first = [-1] * n
+            dist[source] = 0.0
+            first[source] = source
+            heap = [(0.0, source)]
+
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                for e in range(offsets[u], offsets[u + 1]):
+                    v = targets[e]
+                    new_distance = d + weights[e]
+                    if new_distance < dist[v]:
+                        dist[v] = new_distance
+                        # 从起点直接出发的边决定第一步，其余沿用前驱的第一步
+                        first[v] = v if u == source else first[u]
+                        heapq.heappush(heap, (new_distance, v))
+
+            distances[source, :] = dist
+            next_hops[source, :] = first
+        return True
+
+    def distance(self, start, end):
+        """
+        查询最短距离
+
+        Args:
+            start: 起始节点索引
+            end: 目标节点索引
+
+        Returns:
+            float: 最短距离，不可达时为inf
+        """
+        return float(self.distances[start, end])
+
+    def heuristic_to(self, end):
+        """
+        获取以精确距离作为A*启发值的函数
+
+        Args:
+            end: 目标节点索引
+
+        Returns:
+            callable: 节点索引 -> 到目标的最短距离
+        """
+        return self.distances[:, end].__getitem__
+
+    def route(self, start, end):
+        """
+        沿下一跳表提取最短路径，耗时与路径长度成正比
+
+        Args:
+            start: 起始节点索引
+            end: 目标节点索引
+
+        Returns:
+            list: 节点索引路径，不可达时返回空列表
+        """
+        next_hops = self.next_hops
+        if next_hops[start, end] < 0:
+            return []
+
+        path = [start]
+        current = start
+        while current != end:
+            current = int(next_hops[current, end])
+            path.append(current)
+            # 零权重环可能使下一跳互相指向，超过节点数即视为无效
+            if len(path) > self.graph.node_count:
+                return []
+        return path
\ No newline at end of file
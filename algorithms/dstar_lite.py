@@ -0,0 +1,208 @@
+"""
+D* Lite增量规划模块
+从目标反向维护到各节点的代价，边成本变化时只修复受影响的节点
+"""
+
+import heapq
+import math
+
+
+class DStarLite:
+    """
+    单个AGV的D* Lite搜索状态
+
+    g[v] 为已确认的 v 到目标的代价，rhs[v] 为由后继节点推出的一步前瞻值，
+    两者不相等的节点在开放集合中等待修复。AGV前进时只累加km修正键值，不重建开放集合
+    """
+
+    def __init__(self, graph, start, goal, penalty):
+        """
+        Args:
+            graph: 编译图
+            start: 起始节点索引
+            goal: 目标节点索引
+            penalty: 进入被占用节点的成本倍数
+        """
+        self.graph = graph
+        self.goal = goal
+        self.penalty = penalty
+        self.start = start
+        self.last = start
+        self.km = 0.0
+
+        # 最近一次规划的统计信息
+        self.expanded = 0
+        self.pushes = 0
+
+        inf = float('inf')
+        n = graph.node_count
+        self.g = [inf] * n
+        self.rhs = [inf] * n
+        self.rhs[goal] = 0.0
+        self.occupied = frozenset()
+        self.blocked = frozenset()
+
+        self._open = {}
+        self._heap = []
+        self._push(goal)
+
+    # =============================================================================
+    # 成本与键值
+    # =============================================================================
+
+    def _heuristic(self, v):
+        """当前起点到v的距离下界（缩放后的欧氏距离）"""
+        graph = self.graph
+        return graph.heuristic_scale * math.hypot(graph.xs[self.start] - graph.xs[v],
+                                                  graph.ys[self.start] - graph.ys[v])
+
+    def _key(self, v):
+        """计算节点的优先级键"""
+        best = min(self.g[v], self.rhs[v])
+        return (best + self._heuristic(v) + self.km, best)
+
+    def _cost(self, u, v, weight):
+        """边u->v的当前成本"""
+        if (u, v) in self.blocked:
+            return float('inf')
+        if v in self.occupied:
+            return weight * self.penalty
+        return weight
+
+    def _push(self, v):
+        """以当前键值将节点放入开放集合"""
+        key = self._key(v)
+        self._open[v] = key
+        heapq.heappush(self._heap, (key, v))
+        self.pushes += 1
+
+    def _update_vertex(self, u):
+        """重新计算rhs并维护开放集合"""
+        graph = self.graph
+        if u != self.goal:
+            g = self.g
+            best = float('inf')
+            for e in range(graph.offsets[u], graph.offsets[u + 1]):
+                v = graph.targets[e]
+                value = self._cost(u, v, graph.weights[e]) + g[v]
+                if value < best:
+                    best = value
+            self.rhs[u] = best
+
+        if self.g[u] != self.rhs[u]:
+            self._push(u)
+        else:
+            self._open.pop(u, None)
+
+    def _update_predecessors(self, v):
+        """v的入边成本可能变化，修复所有前驱"""
+        graph = self.graph
+        for e in range(graph.r_offsets[v], graph.r_offsets[v + 1]):
+            self._update_vertex(graph.r_sources[e])
+
+    # =============================================================================
+    # 对外接口
+    # =============================================================================
+
+    def update_costs(self, occupied, blocked=None):
+        """
+        更新占用与封锁状态，只修复状态发生变化的节点和边的起点
+
+        Args:
+            occupied: 被其他AGV占用的节点索引集合
+            blocked: 被封锁的边 (u, v) 索引对集合，为None时保持不变
+        """
+        occupied = frozenset(occupied)
+        changed_nodes = self.occupied.symmetric_difference(occupied)
+        self.occupied = occupied
+
+        changed_edges = ()
+        if blocked is not None:
+            blocked = frozenset(blocked)
+            changed_edges = self.blocked.symmetric_difference(blocked)
+            self.blocked = blocked
+
+        for v in changed_nodes:
+            self._update_predecessors(v)
+        for u, _ in changed_edges:
+            self._update_vertex(u)
+
+    def move_to(self, start):
+        """
+        AGV移动到新的起点，累加键值修正量
+
+        Args:
+            start: 当前所在节点索引
+        """
+        if start == self.start:
+            return
+        self.last = self.start
+        self.start = start
+        self.km += self._heuristic(self.last)
+
+    def _compute_shortest_path(self):
+        """处理开放集合直到起点的代价稳定"""
+        heap = self._heap
+        open_keys = self._open
+        g = self.g
+        rhs = self.rhs
+        start = self.start
+
+        while heap:
+            key, u = heap[0]
+            if open_keys.get(u) != key:
+                heapq.heappop(heap)
+                continue
+            if key >= self._key(start) and rhs[start] == g[start]:
+                break
+
+            heapq.heappop(heap)
+            self.expanded += 1
+            new_key = self._key(u)
+            if key < new_key:
+                open_keys[u] = new_key
+                heapq.heappush(heap, (new_key, u))
+                self.pushes += 1
+            elif g[u] > rhs[u]:
+                g[u] = rhs[u]
+                del open_keys[u]
+                self._update_predecessors(u)
+            else:
+                g[u] = float('inf')
+                self._update_vertex(u)
+                self._update_predecessors(u)
+
+    def plan(self):
+        """
+        修复搜索状态并从当前起点提取路径
+
+        Returns:
+            list: 节点索引路径，无路径时返回空列表
+        """
+        self.expanded = 0
+        self.pushes = 0
+        self._compute_shortest_path()
+
+        inf = float('inf')
+        graph = self.graph
+        g = self.g
+        if g[self.start] == inf:
+            return []
+
+        path = [self.start]
+        current = self.start
+        while current != self.goal:
+            best = inf
+            best_next = -1
+            for e in range(graph.offsets[current], graph.offsets[current + 1]):
+                v = graph.targets[e]
+                value = self._cost(current, v, graph.weights[e]) + g[v]
+                if value < best:
+                    best = value
+                    best_next = v
+            # 代价未完全收敛时可能出现环，超过节点数即视为无效
+            if best_next < 0 or len(path) > graph.node_count:
+                return []
+            current = best_next
+            path.append(current)
+        return path
\ No newline at end of file
@@ -0,0 +1,240 @@
+"""
+边负载模块
+跟踪每条边上已承诺的计划通行量和实际通行量，按负载计算拥堵成本并搜索负载感知的路线
+"""
+
+import heapq
+import math
+from array import array
+
+
+class EdgeLoadModel:
+    """
+    边负载模型
+
+    边e的负载为计划通行量planned[e]与实际通行量actual[e]之和：AGV下发路线时路线上
+    每条边的计划通行量加1，驶过或换线时减去；AGV驶过一条边时实际通行量加1，之后按时间常数
+    DECAY_TICKS指数衰减。衰减按需计算，只记录每条边上次更新的帧，因此下发、换线和驶过
+    都只与路线长度成正比。
+    边成本采用BPR函数 w * (1 + ALPHA * (负载 / CAPACITY) ** BETA)，不小于边长，
+    因此按换算系数缩放的欧氏距离仍是可采纳的启发函数
+    """
+
+    # 实际通行量衰减的时间常数（帧）
+    DECAY_TICKS = 600
+
+    # BPR函数参数：负载等于通行能力时边成本翻倍
+    ALPHA = 1.0
+    BETA = 2
+    CAPACITY = 1.0
+
+    def __init__(self, graph):
+        """
+        Args:
+            graph: 编译图
+        """
+        self.graph = graph
+        edge_count = graph.edge_count
+        self.planned = array('d', [0.0]) * edge_count
+        self.actual = array('d', [0.0]) * edge_count
+        self.stamps = array('d', [0.0]) * edge_count
+
+        # 各AGV已承诺的路线 {agv_id: [边索引列表, 下一条未驶过的边的位置]}
+        self.routes = {}
+        self.now = 0
+
+        # 最近一次搜索的统计信息
+        self.expanded = 0
+        self.pushes = 0
+        self.pops = 0
+
+    def edge_index(self, u, v):
+        """获取边u->v的CSR索引，不存在时返回-1"""
+        graph = self.graph
+        for e in range(graph.offsets[u], graph.offsets[u + 1]):
+            if graph.targets[e] == v:
+                return e
+        return -1
+
+    # =============================================================================
+    # 负载更新
+    # =============================================================================
+
+    def commit(self, agv_id, path, now):
+        """
+        承诺AGV的路线，替换其之前的路线
+
+        Args:
+            agv_id: AGV编号
+            path: 从当前节点起的节点索引路径
+            now: 当前帧
+        """
+        self.now = max(self.now, now)
+        self.release(agv_id)
+        edges = []
+        for u, v in zip(path, path[1:]):
+            e = self.edge_index(u, v)
+            if e >= 0:
+                edges.append(e)
+                self.planned[e] += 1.0
+        if edges:
+            self.routes[agv_id] = [edges, 0]
+
+    def release(self, agv_id):
+        """撤销AGV尚未驶过的计划通行量"""
+        route = self.routes.pop(agv_id, None)
+        if route is None:
+            return
+        edges, position = route
+        for e in edges[position:]:
+            self.planned[e] = max(0.0, self.planned[e] - 1.0)
+
+    def traverse(self, agv_id, u, v, now):
+        """
+        记录AGV驶过边u->v
+
+        实际通行量加1；这条边是AGV路线上的下一条边时同时扣除其计划通行量
+
+        Args:
+            agv_id: AGV编号
+            u: 起点索引
+            v: 终点索引
+            now: 当前帧
+        """
+        self.now = max(self.now, now)
+        e = self.edge_index(u, v)
+        if e < 0:
+            return
+        self.actual[e] = self._decayed(e, now) + 1.0
+        self.stamps[e] = now
+
+        route = self.routes.get(agv_id)
+        if route is not None:
+            edges, position = route
+            if position < len(edges) and edges[position] == e:
+                self.planned[e] = max(0.0, self.planned[e] - 1.0)
+                route[1] = position + 1
+                if route[1] == len(edges):
+                    del self.routes[agv_id]
+
+    def advance(self, now):
+        """推进当前帧（负载在读取时按当前帧衰减）"""
+        self.now = max(self.now, now)
+
+    def _decayed(self, e, now):
+        """边e的实际通行量衰减到now时的值"""
+        actual = self.actual[e]
+        if actual == 0.0:
+            return 0.0
+        return actual * math.exp((self.stamps[e] - now) / self.DECAY_TICKS)
+
+    def load(self, e, now=None):
+        """
+        获取边e当前的负载
+
+        Args:
+            e: 边索引
+            now: 当前帧，为None时使用最近一次更新的帧
+
+        Returns:
+            float: 计划通行量与衰减后的实际通行量之和
+        """
+        if now is None:
+            now = self.now
+        return self.planned[e] + self._decayed(e, now)
+
+    # =============================================================================
+    # 搜索
+    # =============================================================================
+
+    def search(self, start, end, occupied=None, penalty=1, agv_id=None, mask=None):
+        """
+        按负载相关的边成本执行A*搜索
+
+        Args:
+            start: 起始节点索引
+            end: 目标节点索引
+            occupied: 被占用节点索引集合（不含起点），驶入这些节点的边再乘以penalty
+            penalty: 占用惩罚倍数
+            agv_id: 发起规划的AGV编号，不计入它自己已承诺的计划通行量
+            mask: 子图视图的节点掩码，为None时不限制
+
+        Returns:
+            tuple: (节点索引路径, 成本)，不可达时返回 ([], inf)
+        """
+        graph = self.graph
+        buffers = graph.buffers
+        generation = buffers.begin()
+        g_score = buffers.dist
+        came_from = buffers.prev
+        stamp = buffers.stamp
+        closed = buffers.closed
+        offsets = graph.offsets
+        targets = graph.targets
+        weights = graph.weights
+        planned = self.planned
+        actual = self.actual
+        xs = graph.xs
+        ys = graph.ys
+        end_x = xs[end]
+        end_y = ys[end]
+        scale = graph.heuristic_scale
+        now = self.now
+        alpha = self.ALPHA
+        beta = self.BETA
+        capacity = self.CAPACITY
+        sqrt = math.sqrt
+
+        # 自己尚未驶过的路线不构成拥堵
+        own = {}
+        route = self.routes.get(agv_id) if agv_id is not None else None
+        if route is not None:
+            for e in route[0][route[1]:]:
+                own[e] = own.get(e, 0.0) + 1.0
+
+        self.expanded = 0
+        self.pushes = 1
+        self.pops = 0
+        g_score[start] = 0.0
+        came_from[start] = -1
+        stamp[start] = generation
+        open_set = [(scale * sqrt((xs[start] - end_x) ** 2 + (ys[start] - end_y) ** 2),
+                     0.0, start)]
+
+        while open_set:
+            _, current_g, current = heapq.heappop(open_set)
+            self.pops += 1
+            if closed[current] == generation:
+                continue
+            closed[current] = generation
+            self.expanded += 1
+
+            if current == end:
+                return graph.reconstruct(came_from, start, end), current_g
+
+            for e in range(offsets[current], offsets[current + 1]):
+                v = targets[e]
+                if closed[v] == generation:
+                    continue
+                if mask is not None and not mask[v]:
+                    continue
+                load = planned[e]
+                if actual[e]:
+                    load += self._decayed(e, now)
+                if own:
+                    load -= own.get(e, 0.0)
+                cost = weights[e]
+                if load > 0.0:
+                    cost *= 1.0 + alpha * (load / capacity) ** beta
+                if occupied and v in occupied:
+                    cost *= penalty
+
+                tentative = current_g + cost
+                if stamp[v] != generation or tentative < g_score[v]:
+                    stamp[v] = generation
+                    came_from[v] = current
+                    g_score[v] = tentative
+                    h = scale * sqrt((xs[v] - end_x) ** 2 + (ys[v] - end_y) ** 2)
+                    heapq.heappush(open_set, (tentative + h, tentative, v))
+                    self.pushes += 1
+        return [], float('inf')
@@ -0,0 +1,274 @@
+"""
+k短路模块
+用Yen算法在有向图上按成本从低到高逐条生成无环的备选路线，每对起终点的偏离搜索状态被缓存，
+继续请求下一条路线时只做增量的偏离搜索
+"""
+
+import heapq
+
+
+class DeviationTree:
+    """
+    一对起终点的k短路搜索状态
+
+    paths为已确定的路线（按成本升序），candidates为尚未确定的偏离路线堆。
+    每条路线记录其偏离下标：它与生成它的路线在该下标之前完全相同，
+    因此只需从偏离下标开始在它上面继续偏离(Lawler优化)
+    """
+
+    __slots__ = ('start', 'end', 'paths', 'costs', 'prefix_costs', 'deviations', 'candidates',
+                 'seen', 'exhausted', '_counter')
+
+    def __init__(self, start, end):
+        """
+        Args:
+            start: 起始节点索引
+            end: 目标节点索引
+        """
+        self.start = start
+        self.end = end
+        self.paths = []
+        self.costs = []
+        self.prefix_costs = []
+        self.deviations = []
+        self.candidates = []
+        self.seen = set()
+        self.exhausted = False
+        self._counter = 0
+
+    def push(self, cost, path, prefix_costs, deviation):
+        """加入一条候选路线，已见过的路线被忽略"""
+        key = tuple(path)
+        if key in self.seen:
+            return
+        self.seen.add(key)
+        self._counter += 1
+        heapq.heappush(self.candidates, (cost, self._counter, path, prefix_costs, deviation))
+
+
+class KShortestPaths:
+    """
+    编译图上的k短路(Yen)
+
+    偏离搜索是从偏离节点到终点的A*，启发函数为到终点的反向最短距离：
+    删除节点和边只会增加距离，因此它仍是可采纳且一致的下界，每个终点只需一次反向Dijkstra，
+    并在所有以该节点为终点的起点之间共享
+    """
+
+    def __init__(self, graph):
+        """
+        Args:
+            graph: 编译图
+        """
+        self.graph = graph
+        self._trees = {}
+        self._to_target = {}
+
+        # 偏离搜索的累计统计信息，由调用方在查询前清零
+        self.expanded = 0
+        self.pushes = 0
+
+    def paths(self, start, end, k):
+        """
+        获取起终点之间成本最低的k条无环路线，不足k条时返回全部
+
+        Args:
+            start: 起始节点索引
+            end: 目标节点索引
+            k: 路线条数
+
+        Returns:
+            list: [(成本, 节点索引路径)]，按成本升序
+        """
+        tree = self.tree(start, end)
+        self.route(tree, k - 1)
+        return list(zip(tree.costs[:k], tree.paths[:k]))
+
+    def tree(self, start, end):
+        """获取起终点的偏离搜索状态，不存在时新建"""
+        tree = self._trees.get((start, end))
+        if tree is None:
+            tree = DeviationTree(start, end)
+            self._trees[(start, end)] = tree
+        return tree
+
+    def cached(self, start, end):
+        """
+        Returns:
+            DeviationTree: 已有的偏离搜索状态，没有时返回None
+        """
+        return self._trees.get((start, end))
+
+    def route(self, tree, i):
+        """
+        获取第i条（从0开始）路线，尚未确定时增量地继续偏离搜索
+
+        Returns:
+            tuple: (成本, 节点索引路径)，路线不足i+1条时返回None
+        """
+        while len(tree.paths) <= i and not tree.exhausted:
+            self._extend(tree)
+        if i >= len(tree.paths):
+            return None
+        return tree.costs[i], tree.paths[i]
+
+    @staticmethod
+    def penalised_cost(tree, i, occupied, penalty):
+        """
+        第i条已确定路线在进入被占用节点的边乘以惩罚倍数后的成本
+
+        Args:
+            tree: 偏离搜索状态
+            i: 路线下标
+            occupied: 被占用节点索引集合
+            penalty: 成本倍数
+
+        Returns:
+            float: 成本
+        """
+        path = tree.paths[i]
+        prefix = tree.prefix_costs[i]
+        cost = prefix[-1]
+        for j in range(1, len(path)):
+            if path[j] in occupied:
+                cost += (penalty - 1) * (prefix[j] - prefix[j - 1])
+        return cost
+
+    # =============================================================================
+    # 偏离搜索
+    # =============================================================================
+
+    def _extend(self, tree):
+        """确定下一条路线，没有更多路线时标记exhausted"""
+        if not tree.paths and not tree.candidates:
+            first = self._shortest(tree.start, tree.end)
+            if first is None:
+                tree.exhausted = True
+                return
+            tree.push(first[0], first[1], first[2], 0)
+        elif tree.paths:
+            self._deviate(tree)
+
+        if not tree.candidates:
+            tree.exhausted = True
+            return
+        cost, _, path, prefix_costs, deviation = heapq.heappop(tree.candidates)
+        tree.paths.append(path)
+        tree.costs.append(cost)
+        tree.prefix_costs.append(prefix_costs)
+        tree.deviations.append(deviation)
+
+    def _deviate(self, tree):
+        """从最近确定的路线的各个偏离节点出发生成候选路线"""
+        index = len(tree.paths) - 1
+        last = tree.paths[index]
+        last_prefix = tree.prefix_costs[index]
+        to_target = self._distances_to(tree.end)
+
+        for i in range(tree.deviations[index], len(last) - 1):
+            root = last[:i + 1]
+            # 已确定的路线中与本路线共用前缀的，其在偏离节点上的下一步都要禁止
+            banned_edges = {path[i + 1] for path in tree.paths
+                            if len(path) > i + 1 and path[:i + 1] == root}
+            banned_nodes = set(last[:i])
+            spur = self._search(last[i], tree.end, banned_nodes, banned_edges, to_target)
+            if spur is None:
+                continue
+            spur_path, spur_prefix = spur
+            base = last_prefix[i]
+            prefix_costs = last_prefix[:i] + [base + c for c in spur_prefix]
+            tree.push(prefix_costs[-1], root[:-1] + spur_path, prefix_costs, i)
+
+    def _shortest(self, start, end):
+        """
+        提取最短路线，启发函数就是精确距离，A*只扩展最短路线附近的节点
+
+        Returns:
+            tuple: (成本, 节点索引路径, 各节点的前缀成本)，不可达时返回None
+        """
+        to_target = self._distances_to(end)
+        if to_target[start] == float('inf'):
+            return None
+        result = self._search(start, end, (), (), to_target)
+        spur_path, spur_prefix = result
+        return spur_prefix[-1], spur_path, spur_prefix
+
+    def _search(self, start, end, banned_nodes, banned_edges, to_target):
+        """
+        A*偏离搜索，禁止经过banned_nodes，且不能从start直接驶向banned_edges中的节点
+
+        Returns:
+            tuple: (节点索引路径, 各节点的前缀成本)，无路径时返回None
+        """
+        graph = self.graph
+        offsets = graph.offsets
+        targets = graph.targets
+        weights = graph.weights
+        inf = float('inf')
+
+        g_score = {start: 0.0}
+        came_from = {start: -1}
+        closed = set()
+        open_set = [(to_target[start], 0.0, start)]
+        pushes = 1
+
+        while open_set:
+            _, current_g, current = heapq.heappop(open_set)
+            if current in closed:
+                continue
+            closed.add(current)
+            self.expanded += 1
+
+            if current == end:
+                path = [end]
+                while came_from[path[-1]] != -1:
+                    path.append(came_from[path[-1]])
+                path.reverse()
+                self.pushes += pushes
+                return path, [g_score[v] for v in path]
+
+            for e in range(offsets[current], offsets[current + 1]):
+                v = targets[e]
+                if v in closed or v in banned_nodes:
+                    continue
+                if current == start and v in banned_edges:
+                    continue
+                h = to_target[v]
+                if h == inf:
+                    continue
+                tentative_g = current_g + weights[e]
+                if tentative_g < g_score.get(v, inf):
+                    g_score[v] = tentative_g
+                    came_from[v] = current
+                    heapq.heappush(open_set, (tentative_g + h, tentative_g, v))
+                    pushes += 1
+
+        self.pushes += pushes
+        return None
+
+    def _distances_to(self, end):
+        """沿入边的Dijkstra，得到各节点到终点的最短距离（按终点缓存）"""
+        dist = self._to_target.get(end)
+        if dist is not None:
+            return dist
+
+        graph = self.graph
+        r_offsets = graph.r_offsets
+        r_sources = graph.r_sources
+        r_weights = graph.r_weights
+        dist = [float('inf')] * graph.node_count
+        dist[end] = 0.0
+        heap = [(0.0, end)]
+        while heap:
+            d, v = heapq.heappop(heap)
+            if d > dist[v]:
+                continue
+            for e in range(r_offsets[v], r_offsets[v + 1]):
+                u = r_sources[e]
+                nd = d + r_weights[e]
+                if nd < dist[u]:
+                    dist[u] = nd
+                    heapq.heappush(heap, (nd, u))
+
+        self._to_target[end] = dist
+        return dist
@@ -0,0 +1,195 @@
+"""
+ALT地标模块
+预先计算若干地标到所有节点的正向与反向最短距离，利用三角不等式给出A*的距离下界
+"""
+
+import heapq
+from array import array
+
+
+class LandmarkIndex:
+    """
+    地标距离索引
+
+    对地标L与节点v、目标t，有
+        d(v, t) >= d(L, t) - d(L, v)
+        d(v, t) >= d(v, L) - d(t, L)
+    取所有地标中最大的下界作为启发值
+    """
+
+    DEFAULT_LANDMARK_COUNT = 16
+
+    # 每次查询只使用对起终点下界最紧的若干地标
+    ACTIVE_LANDMARK_COUNT = 4
+
+    def __init__(self, graph, landmarks, from_landmark, to_landmark):
+        """
+        Args:
+            graph: 编译图
+            landmarks: 地标节点索引列表
+            from_landmark: 每个地标到各节点的距离数组列表 d(L, v)
+            to_landmark: 各节点到每个地标的距离数组列表 d(v, L)
+        """
+        self.graph = graph
+        self.landmarks = landmarks
+        self.from_landmark = from_landmark
+        self.to_landmark = to_landmark
+
+    @classmethod
+    def build(cls, graph, count=None):
+        """
+        以最远点策略选择地标并计算距离
+
+        每次选择与已选地标距离（往返之和的最小值）最大的节点，
+        不可达的节点优先被选中，从而覆盖各个连通部分
+
+        Args:
+            graph: 编译图
+            count: 地标数量
+
+        Returns:
+            LandmarkIndex: 地标索引
+        """
+        n = graph.node_count
+        count = min(count or cls.DEFAULT_LANDMARK_COUNT, n)
+        inf = float('inf')
+
+        landmarks = []
+        from_landmark = []
+        to_landmark = []
+        if n == 0:
+            return cls(graph, landmarks, from_landmark, to_landmark)
+
+        # 以离坐标中心最远的节点作为第一个地标
+        center_x = sum(graph.xs) / n
+        center_y = sum(graph.ys) / n
+        candidate = max(range(n), key=lambda v: (graph.xs[v] - center_x) ** 2 +
+                                                (graph.ys[v] - center_y) ** 2)
+        nearest = [inf] * n
+
+        while len(landmarks) < count:
+            forward = cls._distances(n, candidate, graph.offsets, graph.targets, graph.weights)
+            backward = cls._distances(n, candidate, graph.r_offsets, graph.r_sources,
+                                      graph.r_weights)
+            landmarks.append(candidate)
+            from_landmark.append(forward)
+            to_landmark.append(backward)
+
+            for v in range(n):
+                round_trip = forward[v] + backward[v]
+                if round_trip < nearest[v]:
+                    nearest[v] = round_trip
+
+            chosen = set(landmarks)
+            candidate = max((v for v in range(n) if v not in chosen),
+                            key=nearest.__getitem__, default=None)
+            if candidate is None:
+                break
+
+        return cls(graph, landmarks, from_landmark, to_landmark)
+
+    @staticmethod
+    def _distances(n, source, offsets, targets, weights):
+        """单源Dijkstra，返回到所有节点的距离数组"""
+        inf = float('inf')
+        dist = array('d', [inf]) * n
+        dist[source] = 0.0
+        heap = [(0.0, source)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                new_distance = d + weights[e]
+                if new_distance < dist[v]:
+                    dist[v] = new_distance
+                    heapq.heappush(heap, (new_distance, v))
+        return dist
+
+    @staticmethod
+    def _bound(v, t, forward, backward):
+        """
+        单个地标给出的 d(v, t) 下界
+
+        Returns:
+            float: 下界；inf表示v无法到达t
+        """
+        inf = float('inf')
+        bound = 0.0
+
+        # d(v, t) >= d(L, t) - d(L, v)
+        from_v = forward[v]
+        from_t = forward[t]
+        if from_v != inf:
+            if from_t == inf:
+                return inf
+            if from_t - from_v > bound:
+                bound = from_t - from_v
+
+        # d(v, t) >= d(v, L) - d(t, L)
+        to_v = backward[v]
+        to_t = backward[t]
+        if to_t != inf:
+            if to_v == inf:
+                return inf
+            if to_v - to_t > bound:
+                bound = to_v - to_t
+        return bound
+
+    def lower_bound(self, v, t):
+        """
+        使用全部地标计算 d(v, t) 的下界
+
+        Args:
+            v: 起始节点索引
+            t: 目标节点索引
+
+        Returns:
+            float: 下界；inf表示v无法到达t
+        """
+        best = 0.0
+        for forward, backward in zip(self.from_landmark, self.to_landmark):
+            bound = self._bound(v, t, forward, backward)
+            if bound > best:
+                best = bound
+        return best
+
+    def heuristic_to(self, start, end):
+        """
+        获取一次查询使用的启发函数
+
+        Args:
+            start: 起始节点索引，用于挑选最有效的地标
+            end: 目标节点索引
+
+        Returns:
+            callable: 节点索引 -> 到目标距离的下界
+        """
+        bound = self._bound
+        pairs = list(zip(self.from_landmark, self.to_landmark))
+        pairs.sort(key=lambda pair: bound(start, end, pair[0], pair[1]), reverse=True)
+        inf = float('inf')
+
+        # 预先取出目标节点相关的距离，内层只剩数组访问和减法
+        active = [(forward, forward[end], backward, backward[end])
+                  for forward, backward in pairs[:self.ACTIVE_LANDMARK_COUNT]]
+
+        def heuristic(v):
+            best = 0.0
+            for forward, from_t, backward, to_t in active:
+                from_v = forward[v]
+                if from_v != inf:
+                    if from_t == inf:
+                        return inf
+                    if from_t - from_v > best:
+                        best = from_t - from_v
+                to_v = backward[v]
+                if to_t != inf:
+                    if to_v == inf:
+                        return inf
+                    if to_v - to_t > best:
+                        best = to_v - to_t
+            return best
+
+        return heuristic
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""
+占用索引模块
+按节点索引记录占用和预定节点的AGV，节点的occupied_by/reserved_by变化时同步更新
+"""
+
+import threading
+from array import array
+
+
+class OccupancyIndex:
+    """
+    节点占用与预定索引
+
+    occupants[v]和reservers[v]为占用、预定节点v的AGV编号，没有时为-1。
+    节点的occupied_by和reserved_by是属性，赋值时通知所属的索引，因此AGV抵达、出发、
+    停止和销毁时不需要单独维护索引；规划时按节点索引O(1)查询，不再遍历AGV列表。
+    version在占用变化时递增，缓存以此判断占用集合是否过期。
+    GUI线程移动AGV时后台规划线程可能正在读取，集合的修改和快照都在内部锁中进行
+    """
+
+    # 没有AGV占用或预定时的编号
+    EMPTY = -1
+
+    def __init__(self, graph):
+        """
+        Args:
+            graph: 编译图
+        """
+        self.graph = graph
+        self.occupants = array('i', [self.EMPTY]) * graph.node_count
+        self.reservers = array('i', [self.EMPTY]) * graph.node_count
+        self.version = 0
+
+        self._occupied = set()
+        self._lock = threading.Lock()
+
+        # (版本, 该版本的占用快照, 去掉各起点后的集合 {起点索引: frozenset})，整体替换
+        self._state = (0, frozenset(), {})
+
+    @classmethod
+    def attach(cls, graph, nodes):
+        """
+        为编译图创建索引，按节点当前的占用和预定状态初始化，并登记到各节点
+
+        Args:
+            graph: 编译图
+            nodes: 节点字典
+
+        Returns:
+            OccupancyIndex: 占用索引
+        """
+        index = cls(graph)
+        for node_id, v in graph.index_of.items():
+            node = nodes[node_id]
+            index.set_occupant(v, node.occupied_by)
+            index.set_reserver(v, node.reserved_by)
+            node.graph_index = v
+            node.occupancy_index = index
+        return index
+
+    # =============================================================================
+    # 更新
+    # =============================================================================
+
+    def set_occupant(self, v, agv_id):
+        """
+        设置占用节点v的AGV
+
+        Args:
+            v: 节点索引
+            agv_id: AGV编号，为None时释放
+        """
+        value = self.EMPTY if agv_id is None else agv_id
+        if self.occupants[v] == value:
+            return
+        with self._lock:
+            self.occupants[v] = value
+            if value == self.EMPTY:
+                self._occupied.discard(v)
+            else:
+                self._occupied.add(v)
+            self.version += 1
+
+    def set_reserver(self, v, agv_id):
+        """
+        设置预定节点v的AGV（预定不影响占用版本）
+
+        Args:
+            v: 节点索引
+            agv_id: AGV编号，为None时取消预定
+        """
+        self.reservers[v] = self.EMPTY if agv_id is None else agv_id
+
+    # =============================================================================
+    # 查询
+    # =============================================================================
+
+    def is_occupied(self, v):
+        """节点v是否被AGV占用"""
+        return self.occupants[v] != self.EMPTY
+
+    def is_reserved(self, v):
+        """节点v是否被AGV预定"""
+        return self.reservers[v] != self.EMPTY
+
+    def occupied(self):
+        """
+        当前被占用节点索引的快照，同一版本内复用
+
+        Returns:
+            frozenset: 被占用节点索引集合
+        """
+        return self._current()[1]
+
+    def excluding(self, start):
+        """
+        去掉起点后的被占用节点索引集合，同一版本、同一起点的查询复用结果
+
+        Args:
+            start: 起点索引，为None时不去掉
+
+        Returns:
+            frozenset: 被占用节点索引集合
+        """
+        _, snapshot, cache = self._current()
+        if start is None or start not in snapshot:
+            return snapshot
+        result = cache.get(start)
+        if result is None:
+            result = snapshot - {start}
+            cache[start] = result
+        return result
+
+    def _current(self):
+        """当前版本的快照状态，版本变化后重新生成"""
+        state = self._state
+        if state[0] != self.version:
+            with self._lock:
+                state = (self.version, frozenset(self._occupied), {})
+                self._state = state
+        return state
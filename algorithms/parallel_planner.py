@@ -0,0 +1,254 @@
+"""
+并行批量规划模块
+把编译图的CSR数组一次性发布到共享内存，进程池中的工作进程直接映射这些数组，
+批量查询按块分发，结果按完成顺序流式返回
+"""
+
+import math
+import multiprocessing
+import os
+import queue
+from array import array
+from multiprocessing import shared_memory
+
+from .compiled_graph import CompiledGraph
+
+
+# 工作进程中映射共享内存得到的编译图
+_worker_graph = None
+_worker_memory = None
+
+
+class SharedGraph:
+    """
+    发布到共享内存的编译图
+
+    各CSR数组按8字节对齐依次存放在同一块共享内存中，handle只包含共享内存名称、
+    各数组的布局和节点ID列表，在创建进程池时传给工作进程一次，之后的查询只传节点索引
+    """
+
+    FIELDS = (('offsets', 'i'), ('targets', 'i'), ('weights', 'd'), ('xs', 'd'), ('ys', 'd'),
+              ('r_offsets', 'i'), ('r_sources', 'i'), ('r_weights', 'd'))
+
+    def __init__(self, memory, layout, node_ids, heuristic_scale):
+        """
+        Args:
+            memory: SharedMemory对象
+            layout: [(数组名, 类型码, 字节偏移, 元素个数)]
+            node_ids: 索引到节点ID的列表
+            heuristic_scale: 编译图的启发函数换算系数
+        """
+        self.memory = memory
+        self.layout = layout
+        self.node_ids = node_ids
+        self.heuristic_scale = heuristic_scale
+
+    @classmethod
+    def publish(cls, graph):
+        """
+        把编译图的CSR数组复制到新建的共享内存
+
+        Args:
+            graph: 编译图
+
+        Returns:
+            SharedGraph: 共享内存中的编译图，不再使用时调用close
+        """
+        layout = []
+        size = 0
+        for name, code in cls.FIELDS:
+            size = (size + 7) // 8 * 8
+            length = len(getattr(graph, name))
+            layout.append((name, code, size, length))
+            size += length * array(code).itemsize
+
+        memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for name, code, offset, length in layout:
+            data = array(code, getattr(graph, name)).tobytes()
+            memory.buf[offset:offset + len(data)] = data
+        return cls(memory, layout, list(graph.node_ids), graph.heuristic_scale)
+
+    @property
+    def handle(self):
+        """传给工作进程的共享内存描述"""
+        return self.memory.name, self.layout, self.node_ids, self.heuristic_scale
+
+    @staticmethod
+    def attach(handle):
+        """
+        在工作进程中映射共享内存，构建不复制数组的编译图
+
+        Returns:
+            tuple: (SharedMemory对象, 编译图)，编译图存活期间必须保留SharedMemory对象
+        """
+        name, layout, node_ids, heuristic_scale = handle
+        memory = shared_memory.SharedMemory(name=name)
+        arrays = {}
+        for field, code, offset, length in layout:
+            end = offset + length * array(code).itemsize
+            arrays[field] = memory.buf[offset:end].cast(code)
+
+        graph = CompiledGraph(node_ids, arrays['offsets'], arrays['targets'], arrays['weights'],
+                              arrays['xs'], arrays['ys'],
+                              (arrays['r_offsets'], arrays['r_sources'], arrays['r_weights']))
+        graph.heuristic_scale = heuristic_scale
+        return memory, graph
+
+    def close(self):
+        """释放并删除共享内存"""
+        self.memory.close()
+        self.memory.unlink()
+
+
+def _init_worker(handle):
+    """工作进程初始化：映射共享内存中的编译图"""
+    global _worker_graph, _worker_memory
+    _worker_memory, _worker_graph = SharedGraph.attach(handle)
+
+
+def _plan_chunk(task):
+    """
+    在工作进程中规划一块查询
+
+    Args:
+        task: (搜索函数, [(查询下标, 起点索引, 终点索引)], 被占用节点索引集合)
+
+    Returns:
+        list: [(查询下标, 节点索引路径)]
+    """
+    search, chunk, occupied = task
+    results = []
+    for i, start, end in chunk:
+        # 起点是规划AGV自身所在的节点，不计入占用惩罚
+        own = occupied - {start} if occupied and start in occupied else occupied
+        results.append((i, list(search(_worker_graph, start, end, own))))
+    return results
+
+
+class ParallelBatch:
+    """
+    一批已提交的并行查询
+
+    进程池的回调线程把每块的结果放入队列，调用方（GUI线程）按帧用poll非阻塞地取出，
+    因此结果随完成随取，不会阻塞事件循环
+    """
+
+    def __init__(self, graph, chunks):
+        """
+        Args:
+            graph: 编译图，用于把节点索引路径转换为节点ID
+            chunks: 提交的块数
+        """
+        self.graph = graph
+        self.remaining = chunks
+        self.errors = []
+        self._results = queue.SimpleQueue()
+
+    @property
+    def done(self):
+        """是否所有块都已取出"""
+        return self.remaining == 0
+
+    def poll(self):
+        """
+        取出已完成的结果，不阻塞
+
+        Returns:
+            list: [(查询下标, 路径节点ID列表)]，无路径时为空列表；
+                失败的块记入errors
+        """
+        graph = self.graph
+        finished = []
+        while True:
+            try:
+                item = self._results.get_nowait()
+            except queue.Empty:
+                return finished
+            self.remaining -= 1
+            if isinstance(item, BaseException):
+                self.errors.append(item)
+                continue
+            finished.extend((i, graph.to_ids(path) if len(path) > 1 else [])
+                            for i, path in item)
+
+    def _deliver(self, results):
+        """进程池回调线程：放入一块结果"""
+        self._results.put(results)
+
+
+class ParallelPlanner:
+    """
+    进程池并行规划器
+
+    进程池与一张编译图绑定，地图重新编译后需要关闭并重建。
+    工作进程以spawn方式启动，不继承GUI进程的状态
+    """
+
+    # 每块最多包含的查询数，块越小结果返回得越均匀，块越大进程间通信越少
+    CHUNK_SIZE = 16
+
+    def __init__(self, graph, workers=None):
+        """
+        Args:
+            graph: 编译图
+            workers: 工作进程数，为None时使用CPU核数
+        """
+        self.graph = graph
+        self.workers = workers or os.cpu_count() or 1
+        self._shared = SharedGraph.publish(graph)
+        try:
+            context = multiprocessing.get_context('spawn')
+            self._pool = context.Pool(self.workers, initializer=_init_worker,
+                                      initargs=(self._shared.handle,))
+        except Exception:
+            self._shared.close()
+            raise
+
+    def _tasks(self, search, queries, occupied):
+        """把查询按块打包为工作进程的任务"""
+        size = max(1, min(self.CHUNK_SIZE, math.ceil(len(queries) / (self.workers * 4))))
+        occupied = frozenset(occupied) if occupied else None
+        return [(search, queries[i:i + size], occupied) for i in range(0, len(queries), size)]
+
+    def submit(self, search, queries, occupied=None):
+        """
+        提交一批查询后立即返回，结果在ParallelBatch中随完成随取
+
+        Args:
+            search: 可在模块级导入的搜索函数 (编译图, 起点索引, 终点索引, 被占用节点索引集合) -> 路径
+            queries: [(查询下标, 起点索引, 终点索引)]
+            occupied: 所有被占用节点索引集合，各查询自动排除自己的起点
+
+        Returns:
+            ParallelBatch: 提交的批次
+        """
+        tasks = self._tasks(search, queries, occupied)
+        batch = ParallelBatch(self.graph, len(tasks))
+        for task in tasks:
+            self._pool.apply_async(_plan_chunk, (task,), callback=batch._deliver,
+                                   error_callback=batch._deliver)
+        return batch
+
+    def plan(self, search, queries, occupied=None):
+        """
+        并行执行一批查询
+
+        Args:
+            search: 可在模块级导入的搜索函数 (编译图, 起点索引, 终点索引, 被占用节点索引集合) -> 路径
+            queries: [(查询下标, 起点索引, 终点索引)]
+            occupied: 所有被占用节点索引集合，各查询自动排除自己的起点
+
+        Yields:
+            tuple: (查询下标, 节点索引路径)，按完成顺序
+        """
+        if not queries:
+            return
+        tasks = self._tasks(search, queries, occupied)
+        for results in self._pool.imap_unordered(_plan_chunk, tasks):
+            yield from results
+
+    def close(self):
+        """结束工作进程并释放共享内存"""
+        self._pool.terminate()
+        self._pool.join()
+        self._shared.close()
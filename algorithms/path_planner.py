@@ -5,11 +5,494 @@
 
 import heapq
 import math
+import threading
+import time
+
+from .compiled_graph import CompiledGraph
+from .distance_oracle import DistanceOracle
+from .contraction_hierarchy import ContractionHierarchy
+from .landmarks import LandmarkIndex
+from .route_cache import RouteCache, RouteEntry
+from .batch_planner import BatchPlanner
+from .dstar_lite import DStarLite
+from .k_shortest import KShortestPaths
+from .travel_time import TravelTimeModel
+from .edge_load import EdgeLoadModel
+from .occupancy_index import OccupancyIndex
+from .subgraph_view import SubgraphView
+from .reachability import ReachabilityIndex
+from .planner_telemetry import PlannerTelemetry, PlanRecord
+from .corridor_graph import CorridorGraph
+from .cluster_hierarchy import ClusterHierarchy, HierarchicalRoute
+from .parallel_planner import ParallelPlanner
+from .space_time_planner import SpaceTimePlanner
+from .cbs import AgentTask, ConflictBasedSearch
+from .rolling_horizon import HorizonTask, RollingHorizonPlanner
+from .prioritized_planner import PriorityTask, PrioritizedPlanner
 
 
 class PathPlanner:
     """路径规划器，支持Dijkstra和A*算法，支持有向图和碰撞避免"""
 
+    # 邻居节点被其他AGV占用时的成本倍数
+    OCCUPIED_PENALTY = 5
+
+    # 按时间规划且没有AGV信息时使用的速度，与AGV的默认速度一致
+    DEFAULT_SPEED = 2
+
+    # 走廊折叠掉的节点比例低于该值时不在核心图上搜索（维护占用惩罚视图的开销抵消了收益）
+    MIN_CORRIDOR_REDUCTION = 0.4
+
+    # 站点间预热的备选路线条数
+    DEFAULT_ALTERNATIVES = 3
+
+    # 绕开被占用节点时最多检查的备选路线条数，超过后退回带惩罚的搜索
+    MAX_ALTERNATIVES = 8
+
+    # 分层规划每次细化的簇内路段数
+    REFINE_CLUSTERS = 2
+
+    # 批量查询不少于该数量时分发到进程池，否则在当前进程中逐个规划
+    PARALLEL_MIN_BATCH = 64
+
+    # PathPlanner的类级状态（编译图的搜索缓冲区、各种缓存、统计信息）不是线程安全的，
+    # 在GUI线程以外规划时必须持有该锁，GUI线程在后台规划进行中也要先取得该锁
+    lock = threading.RLock()
+
+    # 当前地图的编译图缓存
+    _graph = None
+
+    # 当前地图的强连通分量可达性索引
+    _reachability = None
+
+    # 当前地图的全源最短距离表
+    _oracle = None
+
+    # 当前地图的收缩层次
+    _hierarchy = None
+
+    # 后台构建距离表和收缩层次的线程及其停止标志
+    _preprocess_thread = None
+    _preprocess_stop = None
+
+    # 当前地图的ALT地标索引
+    _landmarks = None
+
+    # 当前地图折叠走廊后的核心图
+    _corridors = None
+
+    # 当前地图的k短路偏离搜索状态
+    _alternatives = None
+
+    # 当前地图按AGV速度构建的通行时间模型 {速度: TravelTimeModel}
+    _travel_time = {}
+
+    # 当前地图的边负载模型，记录各AGV承诺和实际驶过的边
+    _edge_loads = None
+
+    # 当前地图的节点占用索引，节点的占用状态变化时同步更新
+    _occupancy = None
+
+    # 各AGV的D* Lite增量搜索状态 {agv_id: DStarLite}
+    _incremental = {}
+
+    # 分层规划的簇分组（节点ID列表的列表）及当前地图的簇层次
+    _cluster_groups = []
+    _clusters = None
+
+    # 各AGV尚未细化完的分层路线 {agv_id: HierarchicalRoute}
+    _hierarchical = {}
+
+    # 作业线的节点 {作业线名称: 节点ID列表}、各AGV所属的作业线 {agv_id: 作业线名称}，
+    # 以及各作业线在编译图_work_line_graph上的子图视图 {作业线名称: SubgraphView}
+    _work_lines = {}
+    _agv_work_lines = {}
+    _work_line_views = {}
+    _work_line_graph = None
+
+    # 绑定当前地图的并行规划进程池
+    _parallel = None
+
+    # 上一个滚动时域周期中没有可行时刻表的AGV编号
+    _horizon_stalled = frozenset()
+
+    # 最近一次搜索的统计信息（扩展节点数、入堆/出堆次数）
+    last_search_stats = {}
+
+    # plan_path调用的遥测，默认关闭
+    telemetry = PlannerTelemetry()
+
+    # 路由缓存及其标记：地图版本在重新编译时递增，占用纪元取占用索引的版本
+    route_cache = RouteCache()
+    _map_version = 0
+
+    @classmethod
+    def compile_graph(cls, nodes):
+        """
+        编译节点字典为CSR图并缓存，地图加载后调用一次
+
+        Args:
+            nodes: 节点字典
+
+        Returns:
+            CompiledGraph: 编译后的图
+        """
+        cls.shutdown_parallel()
+        cls.stop_preprocessing()
+        cls._graph = CompiledGraph.from_nodes(nodes)
+        cls._occupancy = OccupancyIndex.attach(cls._graph, nodes)
+        cls._reachability = ReachabilityIndex.build(cls._graph)
+        cls._oracle = None
+        cls._hierarchy = None
+        cls._landmarks = None
+        cls._corridors = None
+        cls._alternatives = None
+        cls._travel_time = {}
+        cls._edge_loads = None
+        cls._incremental = {}
+        cls._clusters = None
+        cls._hierarchical = {}
+        cls._work_line_views = {}
+        cls._work_line_graph = None
+        cls._map_version += 1
+        cls.route_cache.invalidate()
+        return cls._graph
+
+    @classmethod
+    def load_distance_oracle(cls, nodes, db_path, map_hash):
+        """
+        加载（或构建并保存）当前地图的全源最短距离表
+
+        Args:
+            nodes: 节点字典
+            db_path: 地图数据库路径
+            map_hash: 地图数据库内容哈希
+
+        Returns:
+            DistanceOracle: 距离表，地图过大时返回None
+        """
+        graph = cls.get_compiled_graph(nodes)
+        cls._oracle = DistanceOracle.load_or_build(graph, db_path, map_hash)
+        return cls._oracle
+
+    @classmethod
+    def load_contraction_hierarchy(cls, nodes, db_path, map_hash):
+        """
+        加载（或预处理并保存）当前地图的收缩层次
+
+        Args:
+            nodes: 节点字典
+            db_path: 地图数据库路径
+            map_hash: 地图数据库内容哈希
+
+        Returns:
+            ContractionHierarchy: 收缩层次
+        """
+        graph = cls.get_compiled_graph(nodes)
+        cls._hierarchy = ContractionHierarchy.load_or_build(graph, db_path, map_hash)
+        return cls._hierarchy
+
+    @classmethod
+    def start_preprocessing(cls, nodes, db_path, map_hash, on_done=None):
+        """
+        加载已保存的距离表和收缩层次，缺失的部分在后台线程中构建
+
+        构建完成前_get_oracle返回None、收缩层次查询退回Dijkstra，规划照常进行；
+        构建完成且地图没有重新编译时才启用。纯Python构建与GUI线程争用GIL，
+        安装scipy后距离表的构建在原生代码中完成
+
+        Args:
+            nodes: 节点字典
+            db_path: 地图数据库路径
+            map_hash: 地图数据库内容哈希
+            on_done: 后台构建结束后在后台线程中调用的回调 (距离表或None, 收缩层次或None)
+
+        Returns:
+            bool: 是否启动了后台构建（两者都已保存时为False）
+        """
+        graph = cls.get_compiled_graph(nodes)
+        cls.stop_preprocessing()
+        cls._oracle = DistanceOracle.load_cached(graph, db_path, map_hash)
+        cls._hierarchy = ContractionHierarchy.load_cached(graph, db_path, map_hash)
+        need_oracle = cls._oracle is None and graph.node_count <= DistanceOracle.MAX_NODES
+        need_hierarchy = cls._hierarchy is None
+        if not need_oracle and not need_hierarchy:
+            return False
+
+        stop = threading.Event()
+
+        def build():
+            oracle, hierarchy = cls._oracle, cls._hierarchy
+            try:
+                if need_oracle:
+                    oracle = DistanceOracle.load_or_build(graph, db_path, map_hash, stop)
+                    if oracle is not None and cls._graph is graph and not stop.is_set():
+                        cls._oracle = oracle
+                if need_hierarchy and not stop.is_set():
+                    hierarchy = ContractionHierarchy.load_or_build(graph, db_path, map_hash)
+                    if cls._graph is graph and not stop.is_set():
+                        cls._hierarchy = hierarchy
+            finally:
+                if on_done is not None and not stop.is_set():
+                    on_done(oracle, hierarchy)
+
+        cls._preprocess_stop = stop
+        cls._preprocess_thread = threading.Thread(target=build, name="preprocess", daemon=True)
+        cls._preprocess_thread.start()
+        return True
+
+    @classmethod
+    def stop_preprocessing(cls):
+        """通知后台构建线程放弃当前地图的构建（不等待线程结束）"""
+        if cls._preprocess_stop is not None:
+            cls._preprocess_stop.set()
+        cls._preprocess_thread = None
+        cls._preprocess_stop = None
+
+    @classmethod
+    def preprocessing(cls):
+        """后台构建是否仍在进行"""
+        thread = cls._preprocess_thread
+        return thread is not None and thread.is_alive()
+
+    @classmethod
+    def _get_hierarchy(cls, graph):
+        """
+        获取与编译图匹配的收缩层次，未加载时在内存中预处理
+
+        Returns:
+            ContractionHierarchy: 收缩层次，后台构建尚未完成时返回None
+        """
+        if cls._hierarchy is None or cls._hierarchy.graph is not graph:
+            if cls.preprocessing():
+                return None
+            cls._hierarchy = ContractionHierarchy.build(graph)
+        return cls._hierarchy
+
+    @classmethod
+    def _get_landmarks(cls, graph):
+        """获取与编译图匹配的地标索引，首次使用时构建"""
+        if cls._landmarks is None or cls._landmarks.graph is not graph:
+            cls._landmarks = LandmarkIndex.build(graph)
+        return cls._landmarks
+
+    @classmethod
+    def _get_reachability(cls, graph):
+        """获取与编译图匹配的可达性索引"""
+        if cls._reachability is None or cls._reachability.graph is not graph:
+            cls._reachability = ReachabilityIndex.build(graph)
+        return cls._reachability
+
+    @classmethod
+    def is_reachable(cls, nodes, start_id, end_id):
+        """
+        判断从起点是否存在到终点的路径（不考虑占用，占用只增加成本）
+
+        Args:
+            nodes: 节点字典
+            start_id: 起始节点ID
+            end_id: 目标节点ID
+
+        Returns:
+            bool: 节点不存在或不可达时为False
+        """
+        if start_id not in nodes or end_id not in nodes:
+            return False
+        graph = cls.get_compiled_graph(nodes)
+        return cls._get_reachability(graph).reachable(graph.index_of[start_id],
+                                                      graph.index_of[end_id])
+
+    @classmethod
+    def _get_corridors(cls, graph):
+        """获取与编译图匹配的走廊折叠结果，首次使用时构建"""
+        if cls._corridors is None or cls._corridors.graph is not graph:
+            cls._corridors = CorridorGraph.build(graph)
+        return cls._corridors
+
+    @classmethod
+    def _search_contracted(cls, graph, start, end, occupied, search):
+        """
+        在折叠走廊后的核心图上搜索，并把结果展开为原图路径
+
+        起点或终点在走廊内部时以虚拟节点接入核心图，仍然只需一次搜索；
+        两者在同一条链上时还要比较沿链直达的路线
+
+        Args:
+            graph: 编译图
+            start: 起始节点索引
+            end: 目标节点索引
+            occupied: 被占用节点索引集合（不含起点）
+            search: 函数 (核心图, 核心起点, 核心终点, 核心节点->原图节点索引数组) -> 核心路径，
+                核心图上已计入占用惩罚
+
+        Returns:
+            list: 原图节点索引路径，无路径时返回空列表；折叠效果不足时返回None
+        """
+        corridors = cls._get_corridors(graph)
+        if start == end or corridors.reduction < cls.MIN_CORRIDOR_REDUCTION:
+            return None
+
+        penalty = cls.OCCUPIED_PENALTY
+        view = corridors.view(occupied, penalty)
+        source, target, heads, tails = corridors.attach(view, start, end, occupied, penalty)
+        try:
+            path = corridors.expand(search(view, source, target, corridors.original),
+                                    heads, tails)
+        finally:
+            corridors.detach(view, heads, tails)
+
+        direct = corridors.direct(start, end, occupied, penalty)
+        if direct is not None and (not path or
+                                   direct[0] < cls._path_cost(graph, path, occupied)):
+            return direct[1]
+        return path
+
+    @classmethod
+    def _get_alternatives(cls, graph):
+        """获取与编译图匹配的k短路搜索状态，首次使用时创建"""
+        if cls._alternatives is None or cls._alternatives.graph is not graph:
+            cls._alternatives = KShortestPaths(graph)
+        return cls._alternatives
+
+    @classmethod
+    def set_cluster_groups(cls, groups):
+        """
+        设置分层规划的簇分组，簇层次在下次分层规划时重新构建
+
+        Args:
+            groups: 节点ID列表的列表（管控区、区域），节点归入第一个包含它的分组
+        """
+        cls._cluster_groups = [list(group) for group in groups]
+        cls._clusters = None
+        cls._hierarchical = {}
+
+    @classmethod
+    def set_work_lines(cls, nodes, lines, agv_lines):
+        """
+        设置作业线并在当前地图上建立子图视图，之后属于作业线的AGV只在作业线的节点上规划
+
+        Args:
+            nodes: 节点字典
+            lines: {作业线名称: 节点ID列表}
+            agv_lines: {AGV编号: 作业线名称}，未列出或作业线不在lines中的AGV不受限制
+
+        Returns:
+            int: 限制了规划范围的作业线数量
+        """
+        cls._work_lines = {name: list(node_ids) for name, node_ids in lines.items()}
+        cls._agv_work_lines = dict(agv_lines)
+        cls._work_line_graph = None
+        cls.route_cache.invalidate()
+        return len(cls._get_work_line_views(cls.get_compiled_graph(nodes)))
+
+    @classmethod
+    def _get_work_line_views(cls, graph):
+        """获取与编译图匹配的作业线视图，地图重新编译后首次使用时重建；不限制节点的作业线不建立视图"""
+        if cls._work_line_graph is not graph:
+            views = {}
+            for name, node_ids in cls._work_lines.items():
+                view = SubgraphView.build(graph, name, node_ids)
+                if view.restricts():
+                    views[name] = view
+            cls._work_line_views = views
+            cls._work_line_graph = graph
+        return cls._work_line_views
+
+    @classmethod
+    def work_line_view(cls, nodes, agv):
+        """
+        获取AGV所属作业线的子图视图
+
+        Args:
+            nodes: 节点字典
+            agv: AGV，为None时返回None
+
+        Returns:
+            SubgraphView: 视图，AGV不受作业线限制时返回None
+        """
+        if agv is None or agv.id not in cls._agv_work_lines:
+            return None
+        views = cls._get_work_line_views(cls.get_compiled_graph(nodes))
+        return views.get(cls._agv_work_lines[agv.id])
+
+    @classmethod
+    def _get_clusters(cls, graph):
+        """获取与编译图匹配的簇层次，首次使用时构建"""
+        if cls._clusters is None or cls._clusters.graph is not graph:
+            cls._clusters = ClusterHierarchy.build(graph, cls._cluster_groups)
+        return cls._clusters
+
+    @classmethod
+    def _get_travel_time(cls, graph, speed):
+        """获取与编译图匹配的给定速度下的通行时间模型，首次使用时构建"""
+        model = cls._travel_time.get(speed)
+        if model is None or model.graph is not graph:
+            model = TravelTimeModel.build(graph, graph.source, speed)
+            cls._travel_time[speed] = model
+        return model
+
+    @classmethod
+    def _get_edge_loads(cls, graph):
+        """获取与编译图匹配的边负载模型，首次使用时创建"""
+        if cls._edge_loads is None or cls._edge_loads.graph is not graph:
+            cls._edge_loads = EdgeLoadModel(graph)
+        return cls._edge_loads
+
+    @classmethod
+    def _get_oracle(cls, graph):
+        """获取与编译图匹配的距离表"""
+        oracle = cls._oracle
+        if oracle is not None and oracle.graph is graph:
+            return oracle
+        return None
+
+    @classmethod
+    def distance(cls, nodes, start_id, end_id):
+        """
+        查询两节点间不计占用惩罚的最短距离
+
+        有距离表时为O(1)查询，否则执行一次Dijkstra
+
+        Args:
+            nodes: 节点字典
+            start_id: 起始节点ID
+            end_id: 目标节点ID
+
+        Returns:
+            float: 最短距离，不可达时为inf
+        """
+        if start_id not in nodes or end_id not in nodes:
+            return float('inf')
+
+        graph = cls.get_compiled_graph(nodes)
+        start = graph.index_of[start_id]
+        end = graph.index_of[end_id]
+
+        oracle = cls._get_oracle(graph)
+        if oracle is not None:
+            return oracle.distance(start, end)
+
+        if start == end:
+            return 0.0
+        if not cls._dijkstra_search(graph, start, end):
+            return float('inf')
+        return graph.buffers.dist[end]
+
+    @classmethod
+    def get_compiled_graph(cls, nodes):
+        """
+        获取节点字典对应的编译图，缓存失效时重新编译
+
+        Args:
+            nodes: 节点字典
+
+        Returns:
+            CompiledGraph: 编译后的图
+        """
+        if cls._graph is None or not cls._graph.is_compiled_from(nodes):
+            return cls.compile_graph(nodes)
+        return cls._graph
+
     @staticmethod
     def dijkstra(nodes, start_id, end_id, agvs=None):
         """
@@ -27,38 +510,82 @@ class PathPlanner:
         if start_id not in nodes or end_id not in nodes:
             return []
 
-        # 初始化距离和前驱
-        distances = {node_id: float('inf') for node_id in nodes}
-        distances[start_id] = 0
-        previous = {}
-        unvisited = [(0, start_id)]
+        graph = PathPlanner.get_compiled_graph(nodes)
+        start = graph.index_of[start_id]
+        end = graph.index_of[end_id]
+        occupied = PathPlanner._collect_occupied(graph, agvs, start_id)
 
-        while unvisited:
-            current_dist, current_id = heapq.heappop(unvisited)
+        path = PathPlanner._search_contracted(
+            graph, start, end, occupied,
+            lambda core, s, t, original: PathPlanner._dijkstra_search(core, s, t))
+        if path is None:
+            path = PathPlanner._dijkstra_search(graph, start, end, occupied)
+        return graph.to_ids(path) if len(path) > 1 else []
 
-            if current_id == end_id:
-                break
+    @staticmethod
+    def _dijkstra_search(graph, start, end, occupied=None, mask=None):
+        """
+        在编译图上执行Dijkstra搜索
+
+        Args:
+            graph: 编译图
+            start: 起始节点索引
+            end: 目标节点索引
+            occupied: 被占用节点索引集合（不含起点），为None时不计占用惩罚
+            mask: 子图视图的节点掩码，为None时不限制
+
+        Returns:
+            list: 节点索引路径，无路径时返回空列表
+        """
+        buffers = graph.buffers
+        generation = buffers.begin()
+        dist = buffers.dist
+        prev = buffers.prev
+        stamp = buffers.stamp
+        offsets = graph.offsets
+        targets = graph.targets
+        weights = graph.weights
+        penalty = PathPlanner.OCCUPIED_PENALTY
+        expanded = 0
+        pushes = 1
+        pops = 0
 
-            if current_dist > distances[current_id]:
+        dist[start] = 0.0
+        prev[start] = -1
+        stamp[start] = generation
+        unvisited = [(0.0, start)]
+
+        while unvisited:
+            current_dist, u = heapq.heappop(unvisited)
+            pops += 1
+
+            if current_dist > dist[u]:
                 continue
+            expanded += 1
 
-            # 只考虑当前节点能直接到达的节点（有向图）
-            for neighbor_id in nodes[current_id].connections:
-                if neighbor_id in nodes:
-                    # 计算到邻居节点的距离成本
-                    distance = PathPlanner._calculate_cost(
-                        nodes[current_id], nodes[neighbor_id], agvs, start_id
-                    )
+            if u == end:
+                PathPlanner._record_stats('dijkstra', expanded, pushes, pops=pops)
+                return graph.reconstruct(prev, start, end)
 
-                    new_distance = distances[current_id] + distance
+            # 只考虑当前节点能直接到达的节点（有向图）
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                if mask is not None and not mask[v]:
+                    continue
+                cost = weights[e]
+                if occupied and v in occupied:
+                    cost *= penalty
 
-                    if new_distance < distances[neighbor_id]:
-                        distances[neighbor_id] = new_distance
-                        previous[neighbor_id] = current_id
-                        heapq.heappush(unvisited, (new_distance, neighbor_id))
+                new_distance = current_dist + cost
+                if stamp[v] != generation or new_distance < dist[v]:
+                    stamp[v] = generation
+                    dist[v] = new_distance
+                    prev[v] = u
+                    heapq.heappush(unvisited, (new_distance, v))
+                    pushes += 1
 
-        # 重构路径
-        return PathPlanner._reconstruct_path(previous, start_id, end_id)
+        PathPlanner._record_stats('dijkstra', expanded, pushes, pops=pops)
+        return []
 
     @staticmethod
     def a_star(nodes, start_id, end_id, agvs=None):
@@ -77,145 +604,1474 @@ class PathPlanner:
         if start_id not in nodes or end_id not in nodes:
             return []
 
-        def heuristic(node1_id, node2_id):
-            """计算启发式距离（欧几里得距离）"""
-            node1 = nodes[node1_id]
-            node2 = nodes[node2_id]
-            return math.sqrt((node1.x - node2.x) ** 2 + (node1.y - node2.y) ** 2)
+        graph = PathPlanner.get_compiled_graph(nodes)
+        start = graph.index_of[start_id]
+        end = graph.index_of[end_id]
+        occupied = PathPlanner._collect_occupied(graph, agvs, start_id)
 
-        # A*算法的数据结构
-        open_set = [(0, start_id)]
-        came_from = {}
-        g_score = {node_id: float('inf') for node_id in nodes}
-        g_score[start_id] = 0
-        f_score = {node_id: float('inf') for node_id in nodes}
-        f_score[start_id] = heuristic(start_id, end_id)
+        # 有距离表时使用精确距离作为启发值
+        oracle = PathPlanner._get_oracle(graph)
 
-        while open_set:
-            current_id = heapq.heappop(open_set)[1]
-
-            if current_id == end_id:
-                # 找到目标，重构路径
-                path = []
-                while current_id in came_from:
-                    path.append(current_id)
-                    current_id = came_from[current_id]
-                path.append(start_id)
-                path.reverse()
-                return path
+        def search(core, s, t, original):
+            heuristic = None
+            if oracle is not None:
+                to_target = oracle.heuristic_to(original[t])
+                heuristic = lambda c: to_target(original[c])
+            return PathPlanner._a_star_search(core, s, t, None, heuristic)
 
-            # 只考虑当前节点能直接到达的节点（有向图）
-            for neighbor_id in nodes[current_id].connections:
-                if neighbor_id in nodes:
-                    # 计算到邻居节点的实际成本
-                    base_cost = PathPlanner._calculate_cost(
-                        nodes[current_id], nodes[neighbor_id], agvs, start_id
-                    )
+        path = PathPlanner._search_contracted(graph, start, end, occupied, search)
+        if path is None:
+            heuristic = oracle.heuristic_to(end) if oracle is not None else None
+            path = PathPlanner._a_star_search(graph, start, end, occupied, heuristic)
+        return graph.to_ids(path)
+
+    @staticmethod
+    def alt(nodes, start_id, end_id, agvs=None):
+        """
+        ALT寻路算法 - 以地标三角不等式下界作为启发值的A*
+
+        在单向通道较多、欧氏距离严重低估绕行距离的地图上，扩展节点数显著少于A*
 
-                    tentative_g_score = g_score[current_id] + base_cost
+        Args:
+            nodes: 节点字典
+            start_id: 起始节点ID
+            end_id: 目标节点ID
+            agvs: AGV列表，用于碰撞避免
+
+        Returns:
+            list: 路径节点ID列表，如果无路径则返回空列表
+        """
+        if start_id not in nodes or end_id not in nodes:
+            return []
 
-                    if tentative_g_score < g_score[neighbor_id]:
-                        came_from[neighbor_id] = current_id
-                        g_score[neighbor_id] = tentative_g_score
-                        f_score[neighbor_id] = g_score[neighbor_id] + heuristic(neighbor_id, end_id)
+        graph = PathPlanner.get_compiled_graph(nodes)
+        start = graph.index_of[start_id]
+        end = graph.index_of[end_id]
+        occupied = PathPlanner._collect_occupied(graph, agvs, start_id)
 
-                        # 检查是否已在开放集合中
-                        if not PathPlanner._is_in_open_set(open_set, neighbor_id):
-                            heapq.heappush(open_set, (f_score[neighbor_id], neighbor_id))
+        landmarks = PathPlanner._get_landmarks(graph)
 
-        return []  # 无路径
+        def search(core, s, t, original):
+            to_target = landmarks.heuristic_to(original[s], original[t])
+            return PathPlanner._a_star_search(core, s, t, None,
+                                              lambda c: to_target(original[c]), 'alt')
+
+        path = PathPlanner._search_contracted(graph, start, end, occupied, search)
+        if path is None:
+            heuristic = landmarks.heuristic_to(start, end)
+            path = PathPlanner._a_star_search(graph, start, end, occupied, heuristic, 'alt')
+        return graph.to_ids(path)
 
     @staticmethod
-    def _calculate_cost(current_node, neighbor_node, agvs, start_id):
+    def _a_star_search(graph, start, end, occupied=None, heuristic=None, name='a_star',
+                       mask=None):
         """
-        计算从当前节点到邻居节点的成本
+        在编译图上执行A*搜索
+
+        开放集合采用惰性删除：节点代价降低时直接压入新条目，
+        出队时跳过已关闭节点的过期条目，不再线性扫描堆
 
         Args:
-            current_node: 当前节点
-            neighbor_node: 邻居节点
-            agvs: AGV列表
-            start_id: 起始节点ID（用于判断是否为当前AGV的起始位置）
+            graph: 编译图
+            start: 起始节点索引
+            end: 目标节点索引
+            occupied: 被占用节点索引集合（不含起点），为None时不计占用惩罚
+            heuristic: 节点索引 -> 到目标距离下界的函数，为None时使用欧氏距离；
+                返回inf表示该节点无法到达目标
+            name: 统计信息中记录的算法名称
+            mask: 子图视图的节点掩码，为None时不限制
 
         Returns:
-            float: 移动成本
+            list: 节点索引路径，无路径时返回空列表
         """
-        # 基础距离
-        base_distance = current_node.neighbors.get(neighbor_node.id, 100)
+        buffers = graph.buffers
+        generation = buffers.begin()
+        g_score = buffers.dist
+        came_from = buffers.prev
+        stamp = buffers.stamp
+        closed = buffers.closed
+        offsets = graph.offsets
+        targets = graph.targets
+        weights = graph.weights
+        xs = graph.xs
+        ys = graph.ys
+        end_x = xs[end]
+        end_y = ys[end]
+        scale = graph.heuristic_scale
+        penalty = PathPlanner.OCCUPIED_PENALTY
+        sqrt = math.sqrt
+        inf = float('inf')
+        expanded = 0
+        pushes = 1
+        pops = 0
 
-        # 如果没有AGV信息，返回基础距离
-        if agvs is None:
-            return base_distance
+        g_score[start] = 0.0
+        came_from[start] = -1
+        stamp[start] = generation
+        if heuristic is not None:
+            start_h = heuristic(start)
+        else:
+            start_h = scale * sqrt((xs[start] - end_x) ** 2 + (ys[start] - end_y) ** 2)
+        open_set = [(start_h, 0.0, start)]
+
+        while open_set:
+            _, current_g, current = heapq.heappop(open_set)
+            pops += 1
+
+            # 跳过已关闭节点的过期条目
+            if closed[current] == generation:
+                continue
+            closed[current] = generation
+            expanded += 1
+
+            if current == end:
+                PathPlanner._record_stats(name, expanded, pushes, pops=pops)
+                return graph.reconstruct(came_from, start, end)
 
-        # 检查邻居节点是否被其他AGV占用
-        if neighbor_node.occupied_by is not None:
-            # 检查是否是自己目前正在占用的节点
-            is_own_node = False
-            for agv in agvs:
-                if (agv.current_node.id == start_id and
-                        agv.current_node.id == neighbor_node.id):
-                    is_own_node = True
-                    break
+            # 只考虑当前节点能直接到达的节点（有向图）
+            for e in range(offsets[current], offsets[current + 1]):
+                v = targets[e]
+                if closed[v] == generation:
+                    continue
+                if mask is not None and not mask[v]:
+                    continue
+                cost = weights[e]
+                if occupied and v in occupied:
+                    cost *= penalty
 
-            if not is_own_node:
-                # 被其他AGV占用，增加成本但不完全禁止通过
-                return base_distance * 5
+                tentative_g_score = current_g + cost
+                if stamp[v] != generation or tentative_g_score < g_score[v]:
+                    stamp[v] = generation
+                    came_from[v] = current
+                    g_score[v] = tentative_g_score
+                    if heuristic is not None:
+                        h = heuristic(v)
+                        if h == inf:
+                            # 从该节点无法到达目标
+                            continue
+                    else:
+                        h = scale * sqrt((xs[v] - end_x) ** 2 + (ys[v] - end_y) ** 2)
+                    heapq.heappush(open_set, (tentative_g_score + h, tentative_g_score, v))
+                    pushes += 1
 
-        return base_distance
+        PathPlanner._record_stats(name, expanded, pushes, pops=pops)
+        return []  # 无路径
 
     @staticmethod
-    def _reconstruct_path(previous, start_id, end_id):
+    def travel_time(nodes, start_id, end_id, agvs=None, agv=None):
         """
-        从前驱信息重构路径
+        用时最短的路线：边成本为行驶帧数，节点上的原地转向按转向表计时，
+        不允许原地转向的节点上只能直行通过
 
         Args:
-            previous: 前驱节点字典
+            nodes: 节点字典
             start_id: 起始节点ID
             end_id: 目标节点ID
+            agvs: AGV列表，用于碰撞避免
+            agv: 发起规划的AGV，提供速度和当前车头角度；为None时按默认速度且不计起点转向
 
         Returns:
-            list: 路径节点ID列表
+            list: 路径节点ID列表，如果无路径则返回空列表
         """
-        path = []
-        current = end_id
-
-        while current in previous:
-            path.append(current)
-            current = previous[current]
+        if start_id not in nodes or end_id not in nodes:
+            return []
 
-        path.append(start_id)
-        path.reverse()
+        graph = PathPlanner.get_compiled_graph(nodes)
+        speed = agv.speed if agv is not None else PathPlanner.DEFAULT_SPEED
+        heading = agv.angle if agv is not None else None
+        model = PathPlanner._get_travel_time(graph, speed)
 
-        return path if len(path) > 1 else []
+        occupied = PathPlanner._collect_occupied(graph, agvs, start_id)
+        path, _ = model.search(graph.index_of[start_id], graph.index_of[end_id], heading,
+                               occupied, PathPlanner.OCCUPIED_PENALTY)
+        PathPlanner._record_stats('travel_time', model.expanded, model.pushes, pops=model.pops)
+        return graph.to_ids(path) if len(path) > 1 else []
 
     @staticmethod
-    def _is_in_open_set(open_set, node_id):
-        """检查节点是否已在开放集合中"""
-        for _, existing_node_id in open_set:
-            if existing_node_id == node_id:
-                return True
-        return False
-
-    @classmethod
-    def plan_path(cls, algorithm, nodes, start_id, end_id, agvs=None):
+    def congestion(nodes, start_id, end_id, agvs=None, agv=None):
         """
-        统一的路径规划接口
+        负载感知的路线：边成本随已承诺和近期实际通行量按BPR函数增长，
+        被占用节点仍按占用惩罚计入
 
         Args:
-            algorithm: 算法名称 ('dijkstra' 或 'a_star')
             nodes: 节点字典
             start_id: 起始节点ID
             end_id: 目标节点ID
-            agvs: AGV列表
+            agvs: AGV列表，用于碰撞避免
+            agv: 发起规划的AGV，它自己已承诺的路线不计入负载
 
         Returns:
-            list: 路径节点ID列表
+            list: 路径节点ID列表，如果无路径则返回空列表
         """
-        if algorithm.lower() == 'dijkstra':
-            return cls.dijkstra(nodes, start_id, end_id, agvs)
-        elif algorithm.lower() == 'a_star' or algorithm.lower() == 'astar':
-            return cls.a_star(nodes, start_id, end_id, agvs)
-        else:
-            raise ValueError(f"不支持的算法: {algorithm}")
+        if start_id not in nodes or end_id not in nodes:
+            return []
+
+        graph = PathPlanner.get_compiled_graph(nodes)
+        model = PathPlanner._get_edge_loads(graph)
+        occupied = PathPlanner._collect_occupied(graph, agvs, start_id)
+        path, _ = model.search(graph.index_of[start_id], graph.index_of[end_id], occupied,
+                               PathPlanner.OCCUPIED_PENALTY,
+                               agv.id if agv is not None else None)
+        PathPlanner._record_stats('congestion', model.expanded, model.pushes, pops=model.pops)
+        return graph.to_ids(path) if len(path) > 1 else []
+
+    @classmethod
+    def commit_route(cls, nodes, agv_id, path, now):
+        """
+        把AGV新下发的路线计入边负载，替换它之前承诺的路线
+
+        Args:
+            nodes: 节点字典
+            agv_id: AGV编号
+            path: 从当前节点起的路径节点ID列表，为空时只撤销之前的路线
+            now: 当前仿真帧
+        """
+        graph = cls.get_compiled_graph(nodes)
+        index_of = graph.index_of
+        cls._get_edge_loads(graph).commit(
+            agv_id, [index_of[node_id] for node_id in path if node_id in index_of], now)
+
+    @classmethod
+    def advance_edge_loads(cls, now):
+        """推进边负载模型的当前帧，负载感知的搜索按该帧计算实际通行量的衰减"""
+        if cls._edge_loads is not None:
+            cls._edge_loads.advance(now)
+
+    @classmethod
+    def release_route(cls, agv_id):
+        """撤销AGV承诺的路线中尚未驶过的部分"""
+        if cls._edge_loads is not None:
+            cls._edge_loads.release(agv_id)
+
+    @classmethod
+    def record_traversal(cls, nodes, agv_id, from_id, to_id, now):
+        """
+        记录AGV驶过一条边，计入实际通行量
+
+        Args:
+            nodes: 节点字典
+            agv_id: AGV编号
+            from_id: 驶离的节点ID
+            to_id: 抵达的节点ID
+            now: 当前仿真帧
+        """
+        graph = cls.get_compiled_graph(nodes)
+        index_of = graph.index_of
+        if from_id in index_of and to_id in index_of:
+            cls._get_edge_loads(graph).traverse(agv_id, index_of[from_id], index_of[to_id], now)
+
+    @classmethod
+    def route_ticks(cls, nodes, path, agv=None):
+        """
+        估算AGV沿路线行驶所需的帧数（含原地转向，不计等待）
+
+        Args:
+            nodes: 节点字典
+            path: 路径节点ID列表
+            agv: 行驶的AGV，提供速度和出发时的车头角度；为None时按默认速度且不计起点转向
+
+        Returns:
+            float: 帧数，路线不可行时为inf
+        """
+        graph = cls.get_compiled_graph(nodes)
+        if any(node_id not in graph.index_of for node_id in path):
+            return float('inf')
+        speed = agv.speed if agv is not None else cls.DEFAULT_SPEED
+        heading = agv.angle if agv is not None else None
+        return cls._get_travel_time(graph, speed).route_ticks(
+            [graph.index_of[node_id] for node_id in path], heading)
+
+    @staticmethod
+    def bidirectional(nodes, start_id, end_id, agvs=None):
+        """
+        双向Dijkstra算法 - 正向沿出边、反向沿入边同时搜索，在中间相遇
+
+        Args:
+            nodes: 节点字典
+            start_id: 起始节点ID
+            end_id: 目标节点ID
+            agvs: AGV列表，用于碰撞避免
+
+        Returns:
+            list: 路径节点ID列表，如果无路径则返回空列表
+        """
+        if start_id not in nodes or end_id not in nodes:
+            return []
+
+        graph = PathPlanner.get_compiled_graph(nodes)
+        start = graph.index_of[start_id]
+        end = graph.index_of[end_id]
+        occupied = PathPlanner._collect_occupied(graph, agvs, start_id)
+
+        path = PathPlanner._search_contracted(
+            graph, start, end, occupied,
+            lambda core, s, t, original: PathPlanner._bidirectional_search(core, s, t))
+        if path is None:
+            path = PathPlanner._bidirectional_search(graph, start, end, occupied)
+        return graph.to_ids(path) if len(path) > 1 else []
+
+    @staticmethod
+    def _bidirectional_search(graph, start, end, occupied=None, mask=None):
+        """
+        在编译图上执行双向Dijkstra搜索
+
+        边u->v的成本为其权重，v被占用时乘以惩罚倍数；反向搜索从v回溯到u时使用同一成本。
+        当两个方向堆顶距离之和不小于已知最优相遇路径长度时停止，此时该路径即为最短路径
+
+        Args:
+            graph: 编译图
+            start: 起始节点索引
+            end: 目标节点索引
+            occupied: 被占用节点索引集合（不含起点），为None时不计占用惩罚
+            mask: 子图视图的节点掩码（不限制起点），为None时不限制
+
+        Returns:
+            list: 节点索引路径，无路径时返回空列表
+        """
+        if start == end:
+            return [start]
+
+        forward = graph.buffers
+        backward = graph.backward_buffers
+        f_generation = forward.begin()
+        b_generation = backward.begin()
+        f_dist, f_prev, f_stamp, f_closed = forward.dist, forward.prev, forward.stamp, forward.closed
+        b_dist, b_next, b_stamp, b_closed = (backward.dist, backward.prev, backward.stamp,
+                                             backward.closed)
+        offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+        r_offsets, r_sources, r_weights = graph.r_offsets, graph.r_sources, graph.r_weights
+        penalty = PathPlanner.OCCUPIED_PENALTY
+
+        f_dist[start] = 0.0
+        f_prev[start] = -1
+        f_stamp[start] = f_generation
+        b_dist[end] = 0.0
+        b_next[end] = -1
+        b_stamp[end] = b_generation
+        f_heap = [(0.0, start)]
+        b_heap = [(0.0, end)]
+
+        best = float('inf')
+        meeting = -1
+        expanded = 0
+        pushes = 2
+        pops = 0
+
+        while f_heap and b_heap:
+            if f_heap[0][0] + b_heap[0][0] >= best:
+                break
+
+            if f_heap[0][0] <= b_heap[0][0]:
+                d, u = heapq.heappop(f_heap)
+                pops += 1
+                if f_closed[u] == f_generation:
+                    continue
+                f_closed[u] = f_generation
+                expanded += 1
+
+                for e in range(offsets[u], offsets[u + 1]):
+                    v = targets[e]
+                    if mask is not None and not mask[v]:
+                        continue
+                    cost = weights[e]
+                    if occupied and v in occupied:
+                        cost *= penalty
+                    new_distance = d + cost
+                    if f_stamp[v] != f_generation or new_distance < f_dist[v]:
+                        f_stamp[v] = f_generation
+                        f_dist[v] = new_distance
+                        f_prev[v] = u
+                        heapq.heappush(f_heap, (new_distance, v))
+                        pushes += 1
+                    if b_stamp[v] == b_generation and new_distance + b_dist[v] < best:
+                        best = new_distance + b_dist[v]
+                        meeting = v
+            else:
+                d, v = heapq.heappop(b_heap)
+                pops += 1
+                if b_closed[v] == b_generation:
+                    continue
+                b_closed[v] = b_generation
+                expanded += 1
+
+                # 进入v的边成本由v的占用状态决定
+                cost_factor = penalty if occupied and v in occupied else 1
+                for e in range(r_offsets[v], r_offsets[v + 1]):
+                    u = r_sources[e]
+                    if mask is not None and not mask[u] and u != start:
+                        continue
+                    new_distance = d + r_weights[e] * cost_factor
+                    if b_stamp[u] != b_generation or new_distance < b_dist[u]:
+                        b_stamp[u] = b_generation
+                        b_dist[u] = new_distance
+                        b_next[u] = v
+                        heapq.heappush(b_heap, (new_distance, u))
+                        pushes += 1
+                    if f_stamp[u] == f_generation and new_distance + f_dist[u] < best:
+                        best = new_distance + f_dist[u]
+                        meeting = u
+
+        PathPlanner._record_stats('bidirectional', expanded, pushes, pops=pops)
+        if meeting < 0:
+            return []
+
+        path = graph.reconstruct(f_prev, start, meeting)
+        current = meeting
+        while current != end:
+            current = b_next[current]
+            path.append(current)
+        return path
+
+    @staticmethod
+    def contraction_hierarchies(nodes, start_id, end_id, agvs=None):
+        """
+        收缩层次查询 - 双向上行搜索后展开捷径
+
+        收缩层次基于不含占用惩罚的边权重，若查询结果经过被占用节点，
+        则退回Dijkstra以保持与其他算法一致的成本模型
+
+        Args:
+            nodes: 节点字典
+            start_id: 起始节点ID
+            end_id: 目标节点ID
+            agvs: AGV列表，用于碰撞避免
+
+        Returns:
+            list: 路径节点ID列表，如果无路径则返回空列表
+        """
+        if start_id not in nodes or end_id not in nodes:
+            return []
+
+        graph = PathPlanner.get_compiled_graph(nodes)
+        start = graph.index_of[start_id]
+        end = graph.index_of[end_id]
+        occupied = PathPlanner._collect_occupied(graph, agvs, start_id)
+
+        hierarchy = PathPlanner._get_hierarchy(graph)
+        if hierarchy is None:
+            path = PathPlanner._dijkstra_search(graph, start, end, occupied)
+            return graph.to_ids(path) if len(path) > 1 else []
+
+        path, _ = hierarchy.query(start, end)
+        if occupied and any(v in occupied for v in path):
+            path = PathPlanner._dijkstra_search(graph, start, end, occupied)
+        else:
+            PathPlanner._record_stats('contraction_hierarchies', 0, 0, pops=0)
+        return graph.to_ids(path) if len(path) > 1 else []
+
+    @staticmethod
+    def hierarchical(nodes, start_id, end_id, agvs=None):
+        """
+        分层规划 - 在簇入口组成的抽象图上规划后逐段细化为完整路径
+
+        抽象层不计占用惩罚，结果不保证最短；需要随AGV前进逐段细化时使用plan_hierarchical
+
+        Args:
+            nodes: 节点字典
+            start_id: 起始节点ID
+            end_id: 目标节点ID
+            agvs: AGV列表，用于碰撞避免
+
+        Returns:
+            list: 路径节点ID列表，如果无路径则返回空列表
+        """
+        if start_id not in nodes or end_id not in nodes:
+            return []
+
+        graph = PathPlanner.get_compiled_graph(nodes)
+        start = graph.index_of[start_id]
+        end = graph.index_of[end_id]
+        occupied = PathPlanner._collect_occupied(graph, agvs, start_id)
+
+        clusters = PathPlanner._get_clusters(graph)
+        route = HierarchicalRoute(clusters.plan(start, end))
+        expanded, pushes = clusters.expanded, clusters.pushes
+        extension = route.advance(clusters, len(route.waypoints), occupied,
+                                  PathPlanner.OCCUPIED_PENALTY)
+        PathPlanner._record_stats('hierarchical', expanded + clusters.expanded,
+                                  pushes + clusters.pushes)
+        if not extension:
+            return []
+        return graph.to_ids([start] + extension)
+
+    @staticmethod
+    def _collect_occupied(graph, agvs, start_id):
+        """
+        从占用索引获取被其他AGV占用的节点索引
+
+        起点是规划AGV自身所在的节点，不计入占用惩罚。同一占用版本、同一起点的查询
+        返回同一个不可变集合
+
+        Args:
+            graph: 编译图
+            agvs: AGV列表，只用于判断是否考虑占用
+            start_id: 起始节点ID
+
+        Returns:
+            frozenset: 被占用节点索引集合，没有AGV信息时返回None
+        """
+        if agvs is None:
+            return None
+        return PathPlanner._get_occupancy(graph).excluding(graph.index_of.get(start_id))
+
+    @classmethod
+    def _get_occupancy(cls, graph):
+        """获取编译图的占用索引，索引不属于该图时重新登记到图的节点"""
+        if cls._occupancy is None or cls._occupancy.graph is not graph:
+            cls._occupancy = OccupancyIndex.attach(graph, graph.source)
+        return cls._occupancy
+
+    @classmethod
+    def _record_stats(cls, algorithm, expanded, pushes, cached=False, pops=None):
+        """记录最近一次搜索的统计信息，pops为出堆次数（未进行搜索时为0，搜索未统计时为None）"""
+        cls.last_search_stats = {
+            'algorithm': algorithm,
+            'expanded': expanded,
+            'pushes': pushes,
+            'pops': pops,
+            'cached': cached
+        }
+
+    @classmethod
+    def plan_path(cls, algorithm, nodes, start_id, end_id, agvs=None, use_cache=True, agv=None):
+        """
+        统一的路径规划接口
+
+        Args:
+            algorithm: 算法名称 ('dijkstra'、'a_star'、'alt'、'bidirectional'、
+                'contraction_hierarchies'、按用时规划的 'travel_time'、分层规划 'hierarchical'
+                或负载感知的 'congestion')
+            nodes: 节点字典
+            start_id: 起始节点ID
+            end_id: 目标节点ID
+            agvs: AGV列表
+            use_cache: 是否使用路由缓存
+            agv: 发起规划的AGV，按用时规划时提供速度和车头角度；
+                分层规划时只返回细化后的前缀，其余由extend_hierarchical随AGV前进细化
+
+        Returns:
+            list: 路径节点ID列表
+        """
+        if not cls.telemetry.enabled:
+            return cls._plan_path(algorithm, nodes, start_id, end_id, agvs, use_cache, agv)
+
+        cls.last_search_stats = {}
+        began = time.perf_counter()
+        path = cls._plan_path(algorithm, nodes, start_id, end_id, agvs, use_cache, agv)
+        wall_ms = (time.perf_counter() - began) * 1000.0
+        cls._record_telemetry(algorithm.lower(), nodes, path, wall_ms)
+        return path
+
+    @classmethod
+    def _record_telemetry(cls, algorithm, nodes, path, wall_ms):
+        """按最近一次搜索的统计信息记录一次plan_path调用"""
+        stats = cls.last_search_stats
+        cost = math.inf
+        if len(path) > 1:
+            graph = cls.get_compiled_graph(nodes)
+            cost = cls._path_cost(graph, [graph.index_of[node_id] for node_id in path], None)
+        cls.telemetry.record(PlanRecord(
+            algorithm, stats.get('algorithm', algorithm), stats.get('expanded', 0),
+            stats.get('pushes', 0), stats.get('pops'), max(0, len(path) - 1), cost, wall_ms,
+            stats.get('cached', False)))
+
+    @classmethod
+    def _plan_path(cls, algorithm, nodes, start_id, end_id, agvs, use_cache, agv):
+        """plan_path的实现，不记录遥测"""
+        # 起终点不在同一可达范围内时直接返回，不必搜索完起点能到达的全部节点
+        if start_id in nodes and end_id in nodes and not cls.is_reachable(nodes, start_id, end_id):
+            cls._record_stats('reachability', 0, 0, pops=0)
+            return []
+
+        # 用时最短的路线取决于AGV的车头角度，成本也不是距离；分层规划的结果不保证最短，
+        # 且按AGV逐段细化；负载感知的路线随边负载变化，三者都不经过路由缓存
+        if (not use_cache or start_id not in nodes or end_id not in nodes or
+                algorithm.lower() in ('travel_time', 'hierarchical', 'congestion')):
+            return cls._plan_uncached(algorithm, nodes, start_id, end_id, agvs, agv)
+
+        graph = cls.get_compiled_graph(nodes)
+        start = graph.index_of[start_id]
+        end = graph.index_of[end_id]
+        # GUI线程移动AGV时不持有规划锁：先读版本再取快照，版本只可能偏旧（多一次复核），
+        # 不会把旧快照与新版本一起存入缓存而跳过复核
+        epoch = cls._observe_occupancy(agvs)
+        occupied = cls._collect_occupied(graph, agvs, start_id) or set()
+        view = cls.work_line_view(nodes, agv)
+        key = (algorithm.lower(), start_id, end_id, view.name if view is not None else None)
+
+        def lower_bound(via):
+            return cls._lower_bound(graph, start, via) + cls._lower_bound(graph, via, end)
+
+        path = cls.route_cache.lookup(key, cls._map_version, epoch, occupied, lower_bound)
+        if path is not None:
+            cls._record_stats(algorithm.lower(), 0, 0, cached=True)
+            return list(path)
+
+        path = cls._plan_uncached(algorithm, nodes, start_id, end_id, agvs, agv)
+        indices = [graph.index_of[node_id] for node_id in path]
+        cls.route_cache.store(key, RouteEntry(
+            list(path), frozenset(indices[1:]), cls._path_cost(graph, indices, occupied),
+            frozenset(occupied), cls._map_version, epoch))
+        return path
+
+    @classmethod
+    def _plan_uncached(cls, algorithm, nodes, start_id, end_id, agvs, agv=None):
+        """按算法名称执行一次规划，不经过路由缓存"""
+        view = cls.work_line_view(nodes, agv)
+        if view is not None:
+            return cls._plan_in_view(algorithm, nodes, start_id, end_id, agvs, agv, view)
+
+        if algorithm.lower() in ('dijkstra', 'a_star', 'astar'):
+            path = cls._plan_with_oracle(nodes, start_id, end_id, agvs)
+            if path is None:
+                path = cls._plan_with_alternatives(nodes, start_id, end_id, agvs)
+            if path is not None:
+                return path
+
+        if algorithm.lower() == 'dijkstra':
+            return cls.dijkstra(nodes, start_id, end_id, agvs)
+        elif algorithm.lower() == 'a_star' or algorithm.lower() == 'astar':
+            return cls.a_star(nodes, start_id, end_id, agvs)
+        elif algorithm.lower() == 'alt':
+            return cls.alt(nodes, start_id, end_id, agvs)
+        elif algorithm.lower() == 'bidirectional':
+            return cls.bidirectional(nodes, start_id, end_id, agvs)
+        elif algorithm.lower() in ('contraction_hierarchies', 'ch'):
+            return cls.contraction_hierarchies(nodes, start_id, end_id, agvs)
+        elif algorithm.lower() == 'travel_time':
+            return cls.travel_time(nodes, start_id, end_id, agvs, agv)
+        elif algorithm.lower() == 'congestion':
+            return cls.congestion(nodes, start_id, end_id, agvs, agv)
+        elif algorithm.lower() == 'hierarchical':
+            # AGV从起点出发时只细化前几个簇，其余随AGV前进再细化
+            if agv is not None and agv.current_node.id == start_id:
+                return cls.plan_hierarchical(nodes, agv, end_id, agvs)
+            return cls.hierarchical(nodes, start_id, end_id, agvs)
+        else:
+            raise ValueError(f"不支持的算法: {algorithm}")
+
+    @classmethod
+    def _plan_in_view(cls, algorithm, nodes, start_id, end_id, agvs, agv, view):
+        """
+        只在作业线视图内规划，AGV可以从视图外的起点出发
+
+        距离表和收缩层次给出的全图最短路线完全落在视图内且不经过被占用节点时直接使用，
+        否则在编译图上带节点掩码搜索；走廊折叠、k短路和分层规划的预处理结构不感知视图，
+        这些情况下分别改用对应的带掩码搜索
+
+        Returns:
+            list: 路径节点ID列表，终点不在视图内或无路径时返回空列表
+        """
+        name = algorithm.lower()
+        if name not in ('dijkstra', 'a_star', 'astar', 'alt', 'bidirectional',
+                        'contraction_hierarchies', 'ch', 'travel_time', 'congestion',
+                        'hierarchical'):
+            raise ValueError(f"不支持的算法: {algorithm}")
+        if start_id not in nodes or end_id not in nodes:
+            return []
+
+        graph = cls.get_compiled_graph(nodes)
+        start = graph.index_of[start_id]
+        end = graph.index_of[end_id]
+        if end not in view or start == end:
+            return []
+        occupied = cls._collect_occupied(graph, agvs, start_id)
+        mask = view.mask
+        oracle = cls._get_oracle(graph)
+
+        route = None
+        if name in ('dijkstra', 'a_star', 'astar') and oracle is not None:
+            route, source = oracle.route(start, end), 'oracle'
+        elif name in ('contraction_hierarchies', 'ch'):
+            hierarchy = cls._get_hierarchy(graph)
+            if hierarchy is not None:
+                route, source = hierarchy.query(start, end)[0], 'contraction_hierarchies'
+        if (route and view.covers(route, start) and
+                not (occupied and any(v in occupied for v in route))):
+            cls._record_stats(source, 0, 0, pops=0)
+            return graph.to_ids(route)
+
+        if name in ('dijkstra', 'contraction_hierarchies', 'ch'):
+            path = cls._dijkstra_search(graph, start, end, occupied, mask)
+        elif name in ('a_star', 'astar', 'hierarchical'):
+            heuristic = oracle.heuristic_to(end) if oracle is not None else None
+            path = cls._a_star_search(graph, start, end, occupied, heuristic, mask=mask)
+        elif name == 'alt':
+            heuristic = cls._get_landmarks(graph).heuristic_to(start, end)
+            path = cls._a_star_search(graph, start, end, occupied, heuristic, 'alt', mask)
+        elif name == 'bidirectional':
+            path = cls._bidirectional_search(graph, start, end, occupied, mask)
+        elif name == 'travel_time':
+            model = cls._get_travel_time(graph, agv.speed)
+            path, _ = model.search(start, end, agv.angle, occupied, cls.OCCUPIED_PENALTY, mask)
+            cls._record_stats('travel_time', model.expanded, model.pushes, pops=model.pops)
+        else:
+            model = cls._get_edge_loads(graph)
+            path, _ = model.search(start, end, occupied, cls.OCCUPIED_PENALTY, agv.id, mask)
+            cls._record_stats('congestion', model.expanded, model.pushes, pops=model.pops)
+        return graph.to_ids(path) if len(path) > 1 else []
+
+    @classmethod
+    def plan_space_time(cls, nodes, agv, target_id, table, now, agvs=None):
+        """
+        在预约表上规划无冲突的时空路线并写入预约
+
+        Args:
+            nodes: 节点字典
+            agv: 需要规划的AGV
+            target_id: 目标节点ID
+            table: 共享的预约表
+            now: 当前仿真帧
+            agvs: AGV列表
+
+        Returns:
+            tuple: (路径节点ID列表, 各节点的出发帧列表)，无可行时刻表时返回 ([], [])
+        """
+        graph = cls.get_compiled_graph(nodes)
+        index_of = graph.index_of
+        if target_id not in index_of or agv.current_node.id not in index_of:
+            return [], []
+
+        cls._sync_unscheduled_agvs(graph, table, agvs, now, {agv.id})
+        table.release(agv.id)
+        result = SpaceTimePlanner.plan(graph, index_of[agv.current_node.id],
+                                       index_of[target_id], now, table, agv.id,
+                                       agv.speed, agv.angle, agv.collision_buffer)
+        if result is None:
+            cls._record_stats('space_time', 0, 0, pops=0)
+            return [], []
+
+        path, departures, arrivals, expanded = result
+        table.reserve_route(agv.id, path, departures, arrivals, SpaceTimePlanner.SAFETY_TICKS)
+        cls._record_stats('space_time', expanded, expanded)
+        if len(path) < 2:
+            return [], []
+        return graph.to_ids(path), departures
+
+    @classmethod
+    def plan_prioritized(cls, nodes, agv, target_id, table, now, agvs=None):
+        """
+        按优先级在预约表上规划无冲突的时空路线，并修复受影响的低优先级AGV
+
+        新路线只避开优先级不低于该AGV的时刻表（同优先级先到先得）；优先级更低的AGV中，
+        时刻表仍无冲突的保持不变，其余从下一个决策节点起重新规划
+
+        Args:
+            nodes: 节点字典
+            agv: 需要规划的AGV（停在节点上）
+            target_id: 目标节点ID
+            table: 共享的预约表
+            now: 当前仿真帧
+            agvs: AGV列表
+
+        Returns:
+            tuple: (路径节点ID列表, 各节点的出发帧列表, {低优先级AGV编号: (从下一个决策节点起的
+                路径节点ID列表, 出发帧列表)，改为停在决策节点时为None})；
+                无可行时刻表时返回 ([], [], {})
+        """
+        graph = cls.get_compiled_graph(nodes)
+        index_of = graph.index_of
+        if target_id not in index_of or agv.current_node.id not in index_of:
+            return [], [], {}
+
+        cls._sync_unscheduled_agvs(graph, table, agvs, now, {agv.id})
+        table.release(agv.id)
+        task = PriorityTask(agv.id, [index_of[agv.current_node.id], index_of[target_id]], now,
+                            agv.speed, agv.angle, agv.collision_buffer)
+
+        lower = []
+        for other in sorted(agvs or (), key=lambda a: -a.priority):
+            if (other is agv or other.priority >= agv.priority or not other.schedule or
+                    not table.has_reservations(other.id)):
+                continue
+            lower_task = cls._priority_task(graph, other, now)
+            if lower_task is not None:
+                lower.append(lower_task)
+
+        route, updates = PrioritizedPlanner.insert(graph, task, lower, table, now)
+        # 时空搜索没有单独的入堆计数，与space_time一致记为扩展数
+        expanded = PrioritizedPlanner.expanded
+        cls._record_stats('prioritized', expanded, expanded)
+        cls.last_search_stats['searches'] = PrioritizedPlanner.searches
+        cls.last_search_stats['lower'] = len(lower)
+        cls.last_search_stats['replanned'] = len(updates)
+        if route is None:
+            return [], [], {}
+
+        path, departures = route
+        updates = {agv_id: None if update is None else (graph.to_ids(update[0]), update[1])
+                   for agv_id, update in updates.items()}
+        if len(path) < 2:
+            return [], [], updates
+        return graph.to_ids(path), departures, updates
+
+    @classmethod
+    def _priority_task(cls, graph, agv, now):
+        """
+        由AGV当前状态构造优先级规划任务，路线为原路线的剩余部分
+
+        Returns:
+            PriorityTask: 任务，路线包含不在编译图中的节点时返回None
+        """
+        index_of = graph.index_of
+        if agv.moving and agv.target_node:
+            remaining = agv.path[agv.path_index + 1:]
+            start_time = now + cls._remaining_ticks(agv)
+            heading = agv.target_angle
+            origin = index_of.get(agv.current_node.id)
+            if origin is None:
+                return None
+        else:
+            remaining = agv.path[agv.path_index:]
+            start_time = now
+            heading = agv.angle
+            origin = None
+
+        if not remaining or any(node_id not in index_of for node_id in remaining):
+            return None
+        return PriorityTask(agv.id, [index_of[node_id] for node_id in remaining], start_time,
+                            agv.speed, heading, agv.collision_buffer, origin)
+
+    @classmethod
+    def plan_joint(cls, nodes, assignments, table, now, agvs=None, suboptimality=1.0,
+                   max_expansions=ConflictBasedSearch.DEFAULT_MAX_EXPANSIONS,
+                   time_budget=ConflictBasedSearch.DEFAULT_TIME_BUDGET):
+        """
+        用冲突搜索为一组AGV联合规划互不冲突的时刻表并写入预约
+
+        Args:
+            nodes: 节点字典
+            assignments: [(AGV, 目标节点ID)] 列表，顺序即预算耗尽时的规划优先级
+            table: 共享的预约表
+            now: 当前仿真帧
+            agvs: AGV列表
+            suboptimality: 次优界，大于1时使用ECBS
+            max_expansions: 约束树最多扩展的结点数
+            time_budget: 最长求解时间（秒）
+
+        Returns:
+            dict: {AGV编号: (路径节点ID列表, 各节点的出发帧列表)}，只包含规划成功且需要移动的AGV
+        """
+        graph = cls.get_compiled_graph(nodes)
+        index_of = graph.index_of
+        group = {agv.id for agv, _ in assignments}
+        cls._sync_unscheduled_agvs(graph, table, agvs, now, group)
+
+        tasks = []
+        for agv, target_id in assignments:
+            table.release(agv.id)
+            if target_id in index_of and agv.current_node.id in index_of:
+                tasks.append(AgentTask(agv.id, index_of[agv.current_node.id],
+                                       index_of[target_id], agv.speed, agv.angle,
+                                       agv.collision_buffer))
+
+        routes, stats = ConflictBasedSearch.solve(graph, tasks, table, now, suboptimality,
+                                                  max_expansions, time_budget)
+        cls._record_stats('cbs', stats['expanded'], stats['expanded'])
+        cls.last_search_stats['conflicts'] = stats['conflicts']
+        cls.last_search_stats['fallback'] = stats['fallback']
+
+        result = {}
+        for agv, _ in assignments:
+            if agv.id not in routes:
+                # 没有时刻表的AGV仍停在原地
+                if agv.current_node.id in index_of:
+                    table.reserve_node(index_of[agv.current_node.id], now, float('inf'), agv.id)
+                continue
+            path, departures, arrivals = routes[agv.id]
+            table.reserve_route(agv.id, path, departures, arrivals, SpaceTimePlanner.SAFETY_TICKS)
+            if len(path) > 1:
+                result[agv.id] = (graph.to_ids(path), departures)
+        return result
+
+    @staticmethod
+    def _sync_unscheduled_agvs(graph, table, agvs, now, exclude):
+        """
+        同步没有时刻表的AGV在预约表中的状态
+
+        空闲的视为长期停在当前节点，沿普通路径行驶的释放其旧预约，只依靠运行时的占用检查
+
+        Args:
+            graph: 编译图
+            table: 预约表
+            agvs: AGV列表
+            now: 当前仿真帧
+            exclude: 不处理的AGV编号集合
+        """
+        index_of = graph.index_of
+        for other in agvs or ():
+            if other.id in exclude or other.schedule:
+                continue
+            table.release(other.id)
+            if not other.path and other.current_node.id in index_of:
+                table.reserve_node(index_of[other.current_node.id], now, float('inf'), other.id)
+
+    @classmethod
+    def plan_rolling_horizon(cls, nodes, agvs, table, now,
+                             window=RollingHorizonPlanner.DEFAULT_WINDOW,
+                             period=RollingHorizonPlanner.DEFAULT_PERIOD):
+        """
+        滚动时域规划的一个周期：重建预约表，为全部AGV重新规划时间窗内的时刻表
+
+        时间窗之外沿用AGV当前路线的剩余部分，移动中的AGV从正在驶向的节点开始规划
+
+        Args:
+            nodes: 节点字典
+            agvs: AGV列表，同类AGV之间按优先级从高到低、同优先级按此顺序规划
+            table: 共享的预约表，原有预约全部清空
+            now: 当前仿真帧
+            window: 时间窗长度（帧）
+            period: 规划周期（帧）
+
+        Returns:
+            dict: {AGV编号: (从下一个决策节点到任务终点的路径节点ID列表, 各节点的出发帧列表)}，
+                只包含有任务的AGV
+        """
+        graph = cls.get_compiled_graph(nodes)
+        index_of = graph.index_of
+        margin = SpaceTimePlanner.SAFETY_TICKS
+        table.clear()
+
+        # 驶向空闲节点的AGV无法改变抵达时刻，最先规划；驶向被占节点的AGV要等占用者离开，最后规划
+        arriving = []
+        standing = []
+        blocked = []
+        for agv in sorted(agvs, key=lambda a: -a.priority):
+            if agv.current_node.id not in index_of:
+                continue
+            if agv.moving and agv.target_node:
+                if agv.target_node.id not in index_of:
+                    continue
+                current = index_of[agv.current_node.id]
+                target = index_of[agv.target_node.id]
+                arrival = now + cls._remaining_ticks(agv)
+                # 目标节点或其碰撞半径内的节点上停着其他AGV时，要等它离开才能抵达
+                radius = agv.collision_buffer
+                deferred = any(
+                    nodes[graph.node_ids[v]].occupied_by not in (None, agv.id)
+                    for v in (target, *graph.nearby_nodes(radius)[target])
+                )
+                if deferred:
+                    # 抵达时刻未知，正在行驶的边占用到时间窗末尾，已经驶离的出发节点不再占用
+                    table.reserve_edge(current, target, now, now + window, agv.id)
+                    if math.hypot(agv.x - agv.current_node.x, agv.y - agv.current_node.y) < radius:
+                        table.reserve_node(current, now, now + window, agv.id)
+                else:
+                    # 抵达之前一直占用出发节点、正在行驶的边和目标节点
+                    table.reserve_node(current, now, arrival + margin, agv.id)
+                    table.reserve_edge(current, target, now, arrival + margin, agv.id)
+                    table.reserve_node(target, now, arrival, agv.id)
+                remaining = agv.path[agv.path_index + 1:] if agv.path else [agv.target_node.id]
+                heading = agv.target_angle
+                group = blocked if deferred else arriving
+                stalled = False
+            else:
+                arrival = now
+                deferred = False
+                remaining = agv.path[agv.path_index:] if agv.path else [agv.current_node.id]
+                heading = agv.angle
+                group = standing
+                stalled = agv.id in cls._horizon_stalled
+
+            if any(node_id not in index_of for node_id in remaining):
+                continue
+            group.append(HorizonTask(agv.id, [index_of[node_id] for node_id in remaining],
+                                     arrival, agv.speed, heading, agv.collision_buffer,
+                                     deferred, stalled))
+        tasks = arriving + standing + blocked
+
+        routes, stalled, expanded = RollingHorizonPlanner.plan(graph, tasks, table, now,
+                                                               window, period)
+        cls._horizon_stalled = frozenset(stalled)
+        cls._record_stats('rolling_horizon', expanded, expanded)
+        return {agv_id: (graph.to_ids(path), departures)
+                for agv_id, (path, departures) in routes.items()}
+
+    @staticmethod
+    def _remaining_ticks(agv):
+        """估算移动中的AGV抵达正在驶向的节点所需的帧数（剩余的转向和直线距离）"""
+        step = SpaceTimePlanner.TURN_STEP
+        diff = abs(agv.target_angle - agv.angle) % 360
+        if diff > 180:
+            diff = 360 - diff
+        turn = math.ceil((diff - step) / step) if diff > step else 0
+        distance = math.hypot(agv.target_node.x - agv.x, agv.target_node.y - agv.y)
+        return turn + math.ceil(distance / agv.speed)
+
+    @classmethod
+    def repair_path(cls, nodes, agv, agvs, blocked_edges=None):
+        """
+        用D* Lite增量修复AGV到当前任务终点的路线
+
+        每个AGV保留自己的搜索状态，只有占用状态或封锁状态发生变化的节点被重新计算，
+        任务终点改变时才重新初始化
+
+        Args:
+            nodes: 节点字典
+            agv: 需要修复路线的AGV
+            agvs: AGV列表，用于碰撞避免
+            blocked_edges: 封锁的边 (起点ID, 终点ID) 集合，为None时保持上次的封锁状态
+
+        Returns:
+            list: 从AGV当前节点到任务终点的路径节点ID列表，无路径时返回空列表
+        """
+        graph = cls.get_compiled_graph(nodes)
+        index_of = graph.index_of
+        if agv.task_target not in index_of or agv.current_node.id not in index_of:
+            return []
+        start = index_of[agv.current_node.id]
+        goal = index_of[agv.task_target]
+
+        planner = cls._incremental.get(agv.id)
+        if planner is None or planner.graph is not graph or planner.goal != goal:
+            planner = DStarLite(graph, start, goal, cls.OCCUPIED_PENALTY)
+            cls._incremental[agv.id] = planner
+
+        blocked = None
+        if blocked_edges is not None:
+            blocked = {(index_of[u], index_of[v]) for u, v in blocked_edges
+                       if u in index_of and v in index_of}
+        planner.move_to(start)
+        planner.update_costs(cls._collect_occupied(graph, agvs, agv.current_node.id) or (),
+                             blocked)
+
+        path = planner.plan()
+        cls._record_stats('d_star_lite', planner.expanded, planner.pushes)
+        return graph.to_ids(path) if len(path) > 1 else []
+
+    @classmethod
+    def release_incremental(cls, agv_id=None):
+        """
+        释放AGV的增量搜索状态
+
+        Args:
+            agv_id: AGV编号，为None时释放全部
+        """
+        if agv_id is None:
+            cls._incremental = {}
+            cls._hierarchical = {}
+        else:
+            cls._incremental.pop(agv_id, None)
+            cls._hierarchical.pop(agv_id, None)
+
+    @classmethod
+    def plan_hierarchical(cls, nodes, agv, target_id, agvs=None):
+        """
+        为AGV做分层规划，只细化前REFINE_CLUSTERS个簇内路段，
+        其余航点保留到AGV接近已细化路线的末尾时由extend_hierarchical继续细化
+
+        Args:
+            nodes: 节点字典
+            agv: 发起规划的AGV
+            target_id: 目标节点ID
+            agvs: AGV列表，用于碰撞避免
+
+        Returns:
+            list: 已细化部分的路径节点ID列表，无路径时返回空列表
+        """
+        cls._hierarchical.pop(agv.id, None)
+        start_id = agv.current_node.id
+        if start_id not in nodes or target_id not in nodes:
+            return []
+
+        graph = cls.get_compiled_graph(nodes)
+        start = graph.index_of[start_id]
+        clusters = cls._get_clusters(graph)
+        route = HierarchicalRoute(clusters.plan(start, graph.index_of[target_id]))
+        expanded, pushes = clusters.expanded, clusters.pushes
+        extension = route.advance(clusters, cls.REFINE_CLUSTERS,
+                                  cls._collect_occupied(graph, agvs, start_id),
+                                  cls.OCCUPIED_PENALTY)
+        cls._record_stats('hierarchical', expanded + clusters.expanded, pushes + clusters.pushes)
+        if not extension:
+            return []
+        if not route.finished:
+            cls._hierarchical[agv.id] = route
+        return graph.to_ids([start] + extension)
+
+    @classmethod
+    def extend_hierarchical(cls, nodes, agv, agvs=None):
+        """
+        继续细化AGV的分层路线
+
+        AGV的路线已被其他规划替换（末尾不再是已细化部分的末尾）时丢弃分层路线
+
+        Args:
+            nodes: 节点字典
+            agv: AGV
+            agvs: AGV列表，用于碰撞避免
+
+        Returns:
+            list: 接在AGV路线末尾的节点ID列表，没有需要细化的部分时返回空列表
+        """
+        route = cls._hierarchical.get(agv.id)
+        if route is None:
+            return []
+        graph = cls.get_compiled_graph(nodes)
+        tail_id = graph.node_ids[route.tail]
+        if not agv.path or agv.path[-1] != tail_id:
+            del cls._hierarchical[agv.id]
+            return []
+
+        clusters = cls._get_clusters(graph)
+        clusters.expanded = clusters.pushes = 0
+        extension = route.advance(clusters, cls.REFINE_CLUSTERS,
+                                  cls._collect_occupied(graph, agvs, tail_id),
+                                  cls.OCCUPIED_PENALTY)
+        cls._record_stats('hierarchical', clusters.expanded, clusters.pushes)
+        if not extension or route.finished:
+            del cls._hierarchical[agv.id]
+        return graph.to_ids(extension) if extension else []
+
+    @classmethod
+    def plan_batch(cls, nodes, sources, targets, agvs=None):
+        """
+        批量规划多起点到多终点的成本矩阵
+
+        只对起点和终点中较少的一侧各做一次提前终止的搜索，
+        没有被占用节点且已加载距离表时直接查表
+
+        Args:
+            nodes: 节点字典
+            sources: 起点ID列表
+            targets: 终点ID列表
+            agvs: AGV列表，用于碰撞避免
+
+        Returns:
+            BatchResult: 成本矩阵（distances属性）及按需重建的路径
+        """
+        graph = cls.get_compiled_graph(nodes)
+        result, expanded, pushes = BatchPlanner.plan(
+            graph, sources, targets, cls._collect_all_occupied(graph, agvs),
+            cls.OCCUPIED_PENALTY, cls._get_oracle(graph))
+        cls._record_stats('batch', expanded, pushes)
+        return result
+
+    @classmethod
+    def nearest_sources(cls, nodes, sources, targets, agvs=None):
+        """
+        为每个终点找到成本最低的起点（如离每个取货点最近的空闲AGV），只做一次多源搜索
+
+        Args:
+            nodes: 节点字典
+            sources: 起点ID列表
+            targets: 终点ID列表
+            agvs: AGV列表，用于碰撞避免
+
+        Returns:
+            dict: {终点ID: (起点ID, 成本, 路径)}，不可达时为 (None, inf, [])
+        """
+        graph = cls.get_compiled_graph(nodes)
+        result, expanded, pushes = BatchPlanner.nearest(
+            graph, sources, targets, cls._collect_all_occupied(graph, agvs),
+            cls.OCCUPIED_PENALTY)
+        cls._record_stats('batch', expanded, pushes)
+        return result
+
+    @classmethod
+    def nearest_targets(cls, nodes, sources, targets, agvs=None):
+        """
+        为每个起点找到成本最低的终点（如离每辆载货AGV最近的空闲卸货点），
+        沿入边从所有终点只做一次多源搜索
+
+        Args:
+            nodes: 节点字典
+            sources: 起点ID列表
+            targets: 终点ID列表
+            agvs: AGV列表，用于碰撞避免
+
+        Returns:
+            dict: {起点ID: (终点ID, 成本, 路径)}，不可达时为 (None, inf, [])
+        """
+        graph = cls.get_compiled_graph(nodes)
+        result, expanded, pushes = BatchPlanner.nearest(
+            graph, targets, sources, cls._collect_all_occupied(graph, agvs),
+            cls.OCCUPIED_PENALTY, backward=True)
+        cls._record_stats('batch', expanded, pushes)
+        return result
+
+    @classmethod
+    def plan_parallel(cls, nodes, queries, algorithm='dijkstra', agvs=None, workers=None):
+        """
+        并行规划一批起终点，按完成顺序逐个返回结果
+
+        编译图只在进程池创建时发布到共享内存一次，之后每个查询只传递节点索引。
+        各查询使用同一份占用状态（排除各自的起点），与逐个调用plan_path的成本一致；
+        只有Dijkstra、A*和双向Dijkstra分发到进程池，其他算法或查询数不足PARALLEL_MIN_BATCH时
+        在当前进程中逐个规划
+
+        Args:
+            nodes: 节点字典
+            queries: [(起点ID, 终点ID)] 列表
+            algorithm: 算法名称
+            agvs: AGV列表，用于碰撞避免
+            workers: 工作进程数，为None时使用CPU核数
+
+        Yields:
+            tuple: (查询下标, 路径节点ID列表)，无路径时为空列表
+        """
+        graph = cls.get_compiled_graph(nodes)
+        index_of = graph.index_of
+        search = cls._parallel_search(algorithm)
+        valid = [(i, index_of[start_id], index_of[end_id])
+                 for i, (start_id, end_id) in enumerate(queries)
+                 if start_id in index_of and end_id in index_of]
+
+        if search is None or len(valid) < cls.PARALLEL_MIN_BATCH:
+            for i, (start_id, end_id) in enumerate(queries):
+                yield i, cls.plan_path(algorithm, nodes, start_id, end_id, agvs)
+            return
+
+        planned = {i for i, _, _ in valid}
+        for i in range(len(queries)):
+            if i not in planned:
+                yield i, []
+
+        pool = cls._get_parallel(graph, workers)
+        for i, path in pool.plan(search, valid, cls._collect_all_occupied(graph, agvs)):
+            yield i, graph.to_ids(path) if len(path) > 1 else []
+
+    @classmethod
+    def submit_parallel(cls, nodes, queries, algorithm='dijkstra', agvs=None, workers=None):
+        """
+        把一批起终点提交到进程池后立即返回，供GUI线程按帧取出结果
+
+        Args:
+            nodes: 节点字典
+            queries: [(起点ID, 终点ID)] 列表，起终点必须是地图中的节点
+            algorithm: 算法名称
+            agvs: AGV列表，用于碰撞避免
+            workers: 工作进程数，为None时使用CPU核数
+
+        Returns:
+            ParallelBatch: 提交的批次；算法不支持并行或查询数不足PARALLEL_MIN_BATCH时返回None
+        """
+        search = cls._parallel_search(algorithm)
+        if search is None or len(queries) < cls.PARALLEL_MIN_BATCH:
+            return None
+        graph = cls.get_compiled_graph(nodes)
+        index_of = graph.index_of
+        indexed = [(i, index_of[start_id], index_of[end_id])
+                   for i, (start_id, end_id) in enumerate(queries)]
+        return cls._get_parallel(graph, workers).submit(
+            search, indexed, cls._collect_all_occupied(graph, agvs))
+
+    @staticmethod
+    def _parallel_search(algorithm):
+        """可分发到进程池的搜索函数，不支持的算法返回None"""
+        algorithm = algorithm.lower()
+        if algorithm == 'dijkstra':
+            return PathPlanner._dijkstra_search
+        if algorithm in ('a_star', 'astar'):
+            return PathPlanner._a_star_search
+        if algorithm == 'bidirectional':
+            return PathPlanner._bidirectional_search
+        return None
+
+    @classmethod
+    def _get_parallel(cls, graph, workers=None):
+        """获取与编译图匹配的进程池，首次使用或工作进程数变化时创建"""
+        pool = cls._parallel
+        if pool is not None and pool.graph is graph and (workers is None or
+                                                         pool.workers == workers):
+            return pool
+        cls.shutdown_parallel()
+        cls._parallel = ParallelPlanner(graph, workers)
+        return cls._parallel
+
+    @classmethod
+    def shutdown_parallel(cls):
+        """关闭并行规划进程池并释放共享内存"""
+        if cls._parallel is not None:
+            cls._parallel.close()
+            cls._parallel = None
+
+    @staticmethod
+    def _collect_all_occupied(graph, agvs):
+        """
+        收集所有被AGV占用的节点索引（批量规划中各起点共用）
+
+        Returns:
+            set: 被占用节点索引集合，没有AGV信息时返回None
+        """
+        if agvs is None:
+            return None
+        return PathPlanner._collect_occupied(graph, agvs, None)
+
+    @classmethod
+    def _observe_occupancy(cls, agvs):
+        """
+        获取当前的占用纪元（占用索引的版本，占用节点变化时递增）
+
+        Args:
+            agvs: AGV列表
+
+        Returns:
+            int: 当前占用纪元
+        """
+        if agvs is None or cls._graph is None:
+            return 0
+        return cls._get_occupancy(cls._graph).version
+
+    @classmethod
+    def _lower_bound(cls, graph, start, end):
+        """
+        不计占用惩罚的距离下界：有距离表时精确，已构建地标时用地标下界，否则为0
+
+        Args:
+            graph: 编译图
+            start: 起始节点索引
+            end: 目标节点索引
+
+        Returns:
+            float: 距离下界
+        """
+        oracle = cls._get_oracle(graph)
+        if oracle is not None:
+            return oracle.distance(start, end)
+        landmarks = cls._landmarks
+        if landmarks is not None and landmarks.graph is graph:
+            return landmarks.lower_bound(start, end)
+        return 0.0
+
+    @staticmethod
+    def _path_cost(graph, path, occupied):
+        """
+        计算路径在给定占用状态下的成本
+
+        Args:
+            graph: 编译图
+            path: 节点索引路径
+            occupied: 被占用节点索引集合（不含起点），为None时不计占用惩罚
+
+        Returns:
+            float: 路径成本
+        """
+        cost = 0.0
+        penalty = PathPlanner.OCCUPIED_PENALTY
+        for u, v in zip(path, path[1:]):
+            weight = graph.edge_weight(u, v)
+            cost += weight * penalty if occupied and v in occupied else weight
+        return cost
+
+    @classmethod
+    def _plan_with_oracle(cls, nodes, start_id, end_id, agvs):
+        """
+        通过距离表的下一跳直接提取路径，耗时与路径长度成正比
+
+        占用惩罚只会增加其他路线的成本，因此只要最短路线上没有被占用的节点，
+        它在计入惩罚后仍然最优
+
+        Returns:
+            list: 路径节点ID列表；距离表不可用或路线受占用影响时返回None
+        """
+        if start_id not in nodes or end_id not in nodes or start_id == end_id:
+            return None
+
+        graph = cls.get_compiled_graph(nodes)
+        oracle = cls._get_oracle(graph)
+        if oracle is None:
+            return None
+
+        route = oracle.route(graph.index_of[start_id], graph.index_of[end_id])
+        occupied = cls._collect_occupied(graph, agvs, start_id)
+        if occupied and any(v in occupied for v in route):
+            return None
+
+        cls._record_stats('oracle', 0, 0, pops=0)
+        return graph.to_ids(route)
+
+    @classmethod
+    def k_shortest_paths(cls, nodes, start_id, end_id, k=DEFAULT_ALTERNATIVES):
+        """
+        查询两节点间不计占用惩罚的k条最短无环路线
+
+        偏离搜索状态按起终点缓存，再次查询或增大k时只继续未完成的部分
+
+        Args:
+            nodes: 节点字典
+            start_id: 起始节点ID
+            end_id: 目标节点ID
+            k: 路线条数
+
+        Returns:
+            list: [(路径节点ID列表, 成本)]，按成本升序，不足k条时返回全部
+        """
+        if start_id not in nodes or end_id not in nodes or start_id == end_id:
+            return []
+
+        graph = cls.get_compiled_graph(nodes)
+        alternatives = cls._get_alternatives(graph)
+        alternatives.expanded = alternatives.pushes = 0
+        routes = alternatives.paths(graph.index_of[start_id], graph.index_of[end_id], k)
+        cls._record_stats('k_shortest', alternatives.expanded, alternatives.pushes)
+        return [(graph.to_ids(path), cost) for cost, path in routes]
+
+    @classmethod
+    def warm_alternatives(cls, nodes, node_ids, k=DEFAULT_ALTERNATIVES):
+        """
+        预先计算一组节点（如站点）两两之间的k条备选路线
+
+        Args:
+            nodes: 节点字典
+            node_ids: 节点ID列表
+            k: 每对节点的路线条数
+
+        Returns:
+            int: 预热的节点对数
+        """
+        graph = cls.get_compiled_graph(nodes)
+        alternatives = cls._get_alternatives(graph)
+        indices = list(dict.fromkeys(graph.index_of[node_id] for node_id in node_ids
+                                     if node_id in graph.index_of))
+        count = 0
+        for start in indices:
+            for end in indices:
+                if start != end:
+                    alternatives.paths(start, end, k)
+                    count += 1
+        return count
+
+    @classmethod
+    def _plan_with_alternatives(cls, nodes, start_id, end_id, agvs):
+        """
+        从预热的备选路线中选出计入占用惩罚后成本最低的一条
+
+        占用惩罚只会增加成本，所以第i条路线不计惩罚的成本是第i条及以后所有路线的成本下界；
+        一旦已检查路线中的最低惩罚成本不超过该下界，它就是带惩罚搜索的最优解
+
+        Returns:
+            list: 路径节点ID列表；没有预热的备选路线或检查MAX_ALTERNATIVES条后仍无法确定时返回None
+        """
+        if start_id not in nodes or end_id not in nodes or start_id == end_id:
+            return None
+
+        graph = cls.get_compiled_graph(nodes)
+        alternatives = cls._alternatives
+        if alternatives is None or alternatives.graph is not graph:
+            return None
+        tree = alternatives.cached(graph.index_of[start_id], graph.index_of[end_id])
+        if tree is None:
+            return None
+
+        occupied = cls._collect_occupied(graph, agvs, start_id) or set()
+        alternatives.expanded = alternatives.pushes = 0
+        best = None
+        best_cost = float('inf')
+        for i in range(cls.MAX_ALTERNATIVES + 1):
+            route = alternatives.route(tree, i)
+            if route is None or route[0] >= best_cost:
+                break
+            if i == cls.MAX_ALTERNATIVES:
+                return None
+            cost = alternatives.penalised_cost(tree, i, occupied, cls.OCCUPIED_PENALTY)
+            if cost < best_cost:
+                best, best_cost = route[1], cost
+
+        if best is None:
+            return None
+        cls._record_stats('alternatives', alternatives.expanded, alternatives.pushes)
+        return graph.to_ids(best)
 
     @staticmethod
     def validate_path(nodes, path):
@@ -0,0 +1,252 @@
+"""
+规划遥测模块
+记录每次规划的扩展节点数、堆操作次数、路径长度、成本和耗时，按算法汇总为流式直方图
+"""
+
+import csv
+import math
+import os
+import threading
+from collections import deque
+
+
+class StreamingHistogram:
+    """
+    对数分桶的流式直方图
+
+    每个2倍区间分为BUCKETS_PER_OCTAVE个桶，分位数的相对误差不超过一个桶宽（约19%），
+    占用的内存只与数值跨度有关，与样本数无关
+    """
+
+    BUCKETS_PER_OCTAVE = 4
+
+    def __init__(self):
+        self.buckets = {}  # {桶编号: 样本数}，0及负数单独放在桶None中
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def add(self, value):
+        """加入一个样本"""
+        self.count += 1
+        self.total += value
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+        bucket = (math.floor(math.log2(value) * self.BUCKETS_PER_OCTAVE)
+                  if value > 0 else None)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def mean(self):
+        """样本均值，没有样本时为0"""
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q):
+        """
+        估计分位数
+
+        Args:
+            q: 分位点，0到1之间
+
+        Returns:
+            float: 所在桶的上界（不超过最大值），没有样本时为0
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = self.buckets.get(None, 0)
+        if seen >= rank:
+            return min(0.0, self.maximum)
+        for bucket in sorted(b for b in self.buckets if b is not None):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                upper = 2.0 ** ((bucket + 1) / self.BUCKETS_PER_OCTAVE)
+                return min(upper, self.maximum)
+        return self.maximum
+
+
+class PlanRecord:
+    """一次plan_path调用的记录"""
+
+    __slots__ = ('algorithm', 'search', 'expanded', 'pushes', 'pops', 'hops', 'cost',
+                 'wall_ms', 'cached')
+
+    def __init__(self, algorithm, search, expanded, pushes, pops, hops, cost, wall_ms, cached):
+        """
+        Args:
+            algorithm: 请求的算法
+            search: 实际执行的搜索（距离表、备选路线等可能代替请求的算法）
+            expanded: 扩展节点数
+            pushes: 入堆次数
+            pops: 出堆次数，搜索未统计时为None
+            hops: 路径边数，无路径时为0
+            cost: 路径长度（不计占用惩罚），无路径时为inf
+            wall_ms: 耗时（毫秒）
+            cached: 是否命中路由缓存
+        """
+        self.algorithm = algorithm
+        self.search = search
+        self.expanded = expanded
+        self.pushes = pushes
+        self.pops = pops
+        self.hops = hops
+        self.cost = cost
+        self.wall_ms = wall_ms
+        self.cached = cached
+
+
+class AlgorithmTelemetry:
+    """单个算法的汇总统计"""
+
+    def __init__(self):
+        self.calls = 0
+        self.no_path = 0
+        self.cached = 0
+        self.wall_ms = StreamingHistogram()
+        self.expanded = StreamingHistogram()
+        self.pushes = StreamingHistogram()
+        self.pops = StreamingHistogram()
+        self.hops = StreamingHistogram()
+        self.cost = StreamingHistogram()
+
+    def add(self, record):
+        """汇总一条记录"""
+        self.calls += 1
+        self.wall_ms.add(record.wall_ms)
+        if record.cached:
+            # 命中缓存的调用只计耗时，不拉低搜索量的分布
+            self.cached += 1
+        else:
+            # 距离表、可达性等没有搜索的调用三项都记为0，三列使用同一批调用
+            self.expanded.add(record.expanded)
+            self.pushes.add(record.pushes)
+            if record.pops is not None:
+                self.pops.add(record.pops)
+        if record.hops:
+            self.hops.add(record.hops)
+            self.cost.add(record.cost)
+        else:
+            self.no_path += 1
+
+    def histogram(self, attribute):
+        """
+        汇总用的直方图
+
+        Args:
+            attribute: 直方图属性名
+
+        Returns:
+            StreamingHistogram: 直方图；出堆次数只覆盖部分搜索调用（部分搜索未统计）时为None，
+                避免与扩展数、入堆数按不同的调用求均值
+        """
+        histogram = getattr(self, attribute)
+        if attribute == 'pops' and histogram.count != self.expanded.count:
+            return None
+        return histogram
+
+
+class PlannerTelemetry:
+    """
+    规划遥测
+
+    关闭时PathPlanner.plan_path只多一次属性判断；开启后每次调用生成一条PlanRecord，
+    按请求的算法汇总到AlgorithmTelemetry，并保留最近RECENT_LIMIT条原始记录供导出。
+    规划线程记录、GUI线程汇总和导出可能同时进行，都在内部锁中访问
+    """
+
+    RECENT_LIMIT = 5000
+
+    # 汇总表的列：(列名, 直方图属性, 统计量)
+    SUMMARY_COLUMNS = (
+        ('wall_ms_mean', 'wall_ms', 'mean'),
+        ('wall_ms_p50', 'wall_ms', 0.5),
+        ('wall_ms_p95', 'wall_ms', 0.95),
+        ('wall_ms_p99', 'wall_ms', 0.99),
+        ('wall_ms_max', 'wall_ms', 'max'),
+        ('expanded_mean', 'expanded', 'mean'),
+        ('expanded_p95', 'expanded', 0.95),
+        ('pushes_mean', 'pushes', 'mean'),
+        ('pops_mean', 'pops', 'mean'),
+        ('hops_mean', 'hops', 'mean'),
+        ('cost_mean', 'cost', 'mean'),
+    )
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.algorithms = {}
+        self.recent = deque(maxlen=self.RECENT_LIMIT)
+        self._lock = threading.Lock()
+
+    def record(self, record):
+        """记录一次调用"""
+        with self._lock:
+            aggregate = self.algorithms.get(record.algorithm)
+            if aggregate is None:
+                aggregate = self.algorithms[record.algorithm] = AlgorithmTelemetry()
+            aggregate.add(record)
+            self.recent.append(record)
+
+    def reset(self):
+        """清空汇总和记录"""
+        with self._lock:
+            self.algorithms = {}
+            self.recent.clear()
+
+    def summary(self):
+        """
+        按算法汇总
+
+        Returns:
+            list: 每个算法一个字典，含calls、cached、no_path及SUMMARY_COLUMNS各列，按算法名排序
+        """
+        with self._lock:
+            return self._summary()
+
+    def _summary(self):
+        """按算法汇总，调用方持有锁"""
+        rows = []
+        for algorithm, aggregate in sorted(self.algorithms.items()):
+            row = {'algorithm': algorithm, 'calls': aggregate.calls,
+                   'cached': aggregate.cached, 'no_path': aggregate.no_path}
+            for column, attribute, statistic in self.SUMMARY_COLUMNS:
+                histogram = aggregate.histogram(attribute)
+                if histogram is None or not histogram.count:
+                    row[column] = None
+                elif statistic == 'mean':
+                    row[column] = histogram.mean()
+                elif statistic == 'max':
+                    row[column] = histogram.maximum
+                else:
+                    row[column] = histogram.percentile(statistic)
+            rows.append(row)
+        return rows
+
+    def export_csv(self, path):
+        """
+        导出汇总表到path，最近的原始记录导出到同目录下的 <文件名>_calls.csv
+
+        Args:
+            path: 汇总表CSV文件路径
+
+        Returns:
+            tuple: (汇总表路径, 原始记录路径)
+        """
+        with self._lock:
+            rows = self._summary()
+            records = list(self.recent)
+        fields = ['algorithm', 'calls', 'cached', 'no_path'] + [c[0] for c in self.SUMMARY_COLUMNS]
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+
+        root, ext = os.path.splitext(path)
+        calls_path = f"{root}_calls{ext or '.csv'}"
+        with open(calls_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(PlanRecord.__slots__)
+            for record in records:
+                writer.writerow([getattr(record, name) for name in PlanRecord.__slots__])
+        return path, calls_path
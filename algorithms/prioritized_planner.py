@@ -0,0 +1,161 @@
+"""
+优先级规划模块
+按优先级顺序逐个规划时刻表，新任务只让优先级更高的AGV的时刻表作为障碍，
+优先级更低的AGV尽量沿用已有的时刻表
+"""
+
+from .space_time_planner import SpaceTimePlanner
+
+
+class PriorityTask:
+    """优先级规划中单个AGV的任务"""
+
+    __slots__ = ('agv_id', 'route', 'start_time', 'speed', 'heading', 'radius', 'origin')
+
+    def __init__(self, agv_id, route, start_time, speed, heading=0.0, radius=0, origin=None):
+        """
+        Args:
+            agv_id: AGV编号
+            route: 从下一个决策节点到任务终点的原路线（节点索引列表），重新规划时只保留起点和终点
+            start_time: 抵达决策节点的时刻
+            speed: AGV每帧移动的距离
+            heading: 抵达决策节点时的车头角度
+            radius: 碰撞检测半径
+            origin: 移动中的AGV正在驶离的节点索引，停在节点上时为None
+        """
+        self.agv_id = agv_id
+        self.route = route
+        self.start_time = start_time
+        self.speed = speed
+        self.heading = heading
+        self.radius = radius
+        self.origin = origin
+
+
+class PrioritizedPlanner:
+    """
+    增量的优先级规划
+
+    预约表中已有各AGV按优先级顺序规划出的时刻表。某个AGV的任务改变时，只有它自己和
+    优先级更低、时刻表因此出现冲突的AGV需要重新规划：规划新任务时先取下所有更低优先级的
+    时刻表，只保留它们驶离当前位置所必需的预约；之后按优先级逐个检查取下的时刻表，
+    仍然无冲突的原样放回，有冲突的从当前位置重新规划。
+    低优先级AGV找不到时刻表时改为停在决策节点，并从头重新规划一遍，
+    使更高优先级的AGV避开它
+    """
+
+    # 最近一次insert中各次时空搜索扩展的状态数之和（含失败的搜索）
+    expanded = 0
+    searches = 0
+
+    @classmethod
+    def insert(cls, graph, task, lower, table, now):
+        """
+        为任务改变的AGV规划时刻表，并修复受影响的低优先级AGV
+
+        Args:
+            graph: 编译图
+            task: 任务改变的AGV的PriorityTask（停在节点上）
+            lower: 优先级更低、在预约表中持有时刻表的AGV的PriorityTask列表，按优先级从高到低排序
+            table: 预约表，其中已没有task所属AGV的预约
+            now: 当前时刻
+
+        Returns:
+            tuple: (task的(节点索引路径, 出发时刻列表)，无可行时刻表时为None,
+                    {低优先级AGV编号: (从决策节点起的节点索引路径, 出发时刻列表)，
+                     改为停在决策节点时为None})；
+                task无可行时刻表时预约表保持不变，第二项为空
+        """
+        inf = float('inf')
+        margin = SpaceTimePlanner.SAFETY_TICKS
+        snapshot = table.copy()
+        cls.expanded = 0
+        cls.searches = 0
+        parked = set()
+
+        while True:
+            detached = {}
+            for other in lower:
+                detached[other.agv_id] = table.detach(other.agv_id)
+                cls._reserve_position(graph, other, table, now,
+                                      inf if other.agv_id in parked else None)
+
+            route = cls._plan(graph, task, table)
+            if route is None:
+                table.restore(snapshot)
+                return None, {}
+            path, departures, arrivals = route
+            table.reserve_route(task.agv_id, path, departures, arrivals, margin)
+
+            updates = {agv_id: None for agv_id in parked}
+            failed = None
+            for other in lower:
+                if other.agv_id in parked:
+                    continue
+                table.release(other.agv_id)
+                entries = detached[other.agv_id]
+                if table.fits(entries, other.agv_id, graph.nearby_nodes(other.radius)):
+                    table.attach(entries)
+                    continue
+
+                replanned = cls._plan(graph, other, table)
+                if replanned is None:
+                    failed = other.agv_id
+                    break
+                cls._reserve_position(graph, other, table, now, 0)
+                table.reserve_route(other.agv_id, replanned[0], replanned[1], replanned[2],
+                                    margin)
+                updates[other.agv_id] = (replanned[0], replanned[1])
+
+            if failed is None:
+                return (path, departures), updates
+            parked.add(failed)
+            table.restore(snapshot)
+
+    @classmethod
+    def _plan(cls, graph, task, table):
+        """
+        从决策节点规划到路线终点的时刻表，扩展的状态数累计到统计信息
+
+        Returns:
+            tuple: (路径, 出发时刻, 抵达时刻)，不可行时返回None
+        """
+        start = task.route[0]
+        result = SpaceTimePlanner.plan(graph, start, task.route[-1], task.start_time, table,
+                                       task.agv_id, task.speed, task.heading, task.radius)
+        cls.expanded += SpaceTimePlanner.last_expanded
+        cls.searches += 1
+        if result is None:
+            return None
+        path, departures, arrivals, _ = result
+        return path, departures, arrivals
+
+    @staticmethod
+    def _reserve_position(graph, task, table, now, hold):
+        """
+        预约AGV驶离当前位置所必需的部分
+
+        移动中的AGV占用出发节点和正在行驶的边直到抵达决策节点；在决策节点上至少停留到
+        沿原路线驶向下一节点为止，hold为inf时长期停留，为0时只预约正在行驶的边
+
+        Args:
+            graph: 编译图
+            task: PriorityTask
+            table: 预约表
+            now: 当前时刻
+            hold: 决策节点的停留时长，为None时按驶向下一节点所需的时间计算
+        """
+        margin = SpaceTimePlanner.SAFETY_TICKS
+        route = task.route
+        if task.origin is not None:
+            table.reserve_node(task.origin, now, task.start_time + margin, task.agv_id)
+            table.reserve_edge(task.origin, route[0], now, task.start_time + margin,
+                               task.agv_id)
+        if hold is None:
+            hold = 0
+            if len(route) > 1:
+                duration, _ = SpaceTimePlanner.travel_ticks(graph, route[0], route[1],
+                                                            task.speed, task.heading)
+                hold = duration + margin
+        if hold:
+            table.reserve_node(route[0], task.start_time, task.start_time + hold, task.agv_id)
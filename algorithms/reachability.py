@@ -0,0 +1,195 @@
+"""
+可达性索引模块
+用Tarjan算法求强连通分量并收缩为有向无环图，在收缩图上预先计算各分量可到达的分量集合，
+以O(1)判断两个节点之间是否存在路径
+"""
+
+from array import array
+
+
+class ReachabilityIndex:
+    """
+    强连通分量收缩图上的可达性索引
+
+    component[v]为节点v所属的分量编号。Tarjan算法按逆拓扑序完成分量（先完成的分量
+    不能到达后完成的分量），因此按编号从小到大即可由后继分量的可达集合合并出每个分量的
+    可达集合，以位图保存。分量数超过MAX_COMPONENTS时不建立位图，
+    只能判断同一分量内的可达性，其余情况视为可能可达
+    """
+
+    # 建立可达位图的最大分量数（位图共占用 分量数² / 8 字节）
+    MAX_COMPONENTS = 8192
+
+    def __init__(self, graph, component, component_count, successors, reach):
+        """
+        Args:
+            graph: 编译图
+            component: 节点索引 -> 分量编号的数组
+            component_count: 分量数
+            successors: 每个分量在收缩图中的后继分量列表
+            reach: 每个分量可到达的分量位图（bytes，含自身），分量过多时为None
+        """
+        self.graph = graph
+        self.component = component
+        self.component_count = component_count
+        self.successors = successors
+        self.reach = reach
+
+    @classmethod
+    def build(cls, graph):
+        """
+        为编译图建立可达性索引
+
+        Args:
+            graph: 编译图
+
+        Returns:
+            ReachabilityIndex: 可达性索引
+        """
+        component, count = cls._strongly_connected(graph)
+
+        offsets = graph.offsets
+        targets = graph.targets
+        successors = [set() for _ in range(count)]
+        for u in range(graph.node_count):
+            cu = component[u]
+            for e in range(offsets[u], offsets[u + 1]):
+                cv = component[targets[e]]
+                if cv != cu:
+                    successors[cu].add(cv)
+        successors = [sorted(s) for s in successors]
+
+        reach = None
+        if count <= cls.MAX_COMPONENTS:
+            size = (count + 7) // 8
+            bits = []
+            # 后继分量的编号都更小，已经计算完毕
+            for c in range(count):
+                mask = 1 << c
+                for d in successors[c]:
+                    mask |= bits[d]
+                bits.append(mask)
+            reach = [mask.to_bytes(size, 'little') for mask in bits]
+
+        return cls(graph, component, count, successors, reach)
+
+    @staticmethod
+    def _strongly_connected(graph):
+        """
+        迭代版Tarjan算法
+
+        Returns:
+            tuple: (节点索引 -> 分量编号的数组, 分量数)，分量按逆拓扑序编号
+        """
+        n = graph.node_count
+        offsets = graph.offsets
+        targets = graph.targets
+        unvisited = -1
+        index = array('i', [unvisited]) * n
+        lowlink = array('i', [0]) * n
+        component = array('i', [unvisited]) * n
+        on_stack = bytearray(n)
+        stack = []
+        counter = 0
+        count = 0
+
+        for root in range(n):
+            if index[root] != unvisited:
+                continue
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            # 调用栈：(节点, 下一条待检查的出边)
+            work = [(root, offsets[root])]
+
+            while work:
+                u, e = work[-1]
+                end = offsets[u + 1]
+                while e < end:
+                    v = targets[e]
+                    e += 1
+                    if index[v] == unvisited:
+                        work[-1] = (u, e)
+                        index[v] = lowlink[v] = counter
+                        counter += 1
+                        stack.append(v)
+                        on_stack[v] = 1
+                        work.append((v, offsets[v]))
+                        break
+                    if on_stack[v] and index[v] < lowlink[u]:
+                        lowlink[u] = index[v]
+                else:
+                    # u的出边检查完毕
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        if lowlink[u] < lowlink[parent]:
+                            lowlink[parent] = lowlink[u]
+                    if lowlink[u] == index[u]:
+                        while True:
+                            w = stack.pop()
+                            on_stack[w] = 0
+                            component[w] = count
+                            if w == u:
+                                break
+                        count += 1
+
+        return component, count
+
+    def reachable(self, u, v):
+        """
+        节点u是否可能到达节点v
+
+        Args:
+            u: 起点索引
+            v: 终点索引
+
+        Returns:
+            bool: 不可达时为False；分量过多未建立位图时，不同分量之间总是返回True
+        """
+        cu = self.component[u]
+        cv = self.component[v]
+        if cu == cv:
+            return True
+        if cv > cu:
+            # 分量按逆拓扑序编号，只能到达编号更小的分量
+            return False
+        if self.reach is None:
+            return True
+        return bool(self.reach[cu][cv >> 3] >> (cv & 7) & 1)
+
+    def members(self):
+        """
+        各分量包含的节点索引
+
+        Returns:
+            list: 按分量编号排列的节点索引列表
+        """
+        members = [[] for _ in range(self.component_count)]
+        for v, c in enumerate(self.component):
+            members[c].append(v)
+        return members
+
+    def sink_components(self):
+        """收缩图中没有出边的分量编号（进入后无法离开），只有一个分量时为空"""
+        if self.component_count <= 1:
+            return []
+        return [c for c in range(self.component_count) if not self.successors[c]]
+
+    def one_way_edges(self):
+        """
+        跨越分量的边：驶过后无法再回到出发节点的单向边
+
+        Returns:
+            list: [(起点索引, 终点索引)]
+        """
+        graph = self.graph
+        component = self.component
+        edges = []
+        for u in range(graph.node_count):
+            for e in range(graph.offsets[u], graph.offsets[u + 1]):
+                v = graph.targets[e]
+                if component[u] != component[v]:
+                    edges.append((u, v))
+        return edges
@@ -0,0 +1,271 @@
+"""
+时空预约表模块
+按节点和有向边记录各AGV占用的时间区间，供时空规划查询安全时间窗
+"""
+
+import bisect
+
+
+class ReservationTable:
+    """
+    节点与边的时间区间预约表
+
+    每个节点（边）对应一个按开始时间排序的区间列表 [(开始, 结束, AGV编号)]，
+    区间为闭区间，结束时间为inf表示长期停留。每个AGV的区间按路线顺序另行登记，
+    随着仿真推进可以从头部批量释放已经结束的区间
+    """
+
+    def __init__(self):
+        self.node_intervals = {}
+        self.edge_intervals = {}
+        self._owned = {}
+
+    # =============================================================================
+    # 插入与释放
+    # =============================================================================
+
+    def reserve_node(self, node, begin, end, agv_id):
+        """
+        预约节点
+
+        Args:
+            node: 节点索引
+            begin: 开始时刻
+            end: 结束时刻
+            agv_id: AGV编号
+        """
+        self._insert(self.node_intervals, node, (begin, end, agv_id))
+
+    def reserve_edge(self, u, v, begin, end, agv_id):
+        """
+        预约有向边u->v
+
+        Args:
+            u: 起点索引
+            v: 终点索引
+            begin: 开始时刻
+            end: 结束时刻
+            agv_id: AGV编号
+        """
+        self._insert(self.edge_intervals, (u, v), (begin, end, agv_id))
+
+    def reserve_route(self, agv_id, path, departures, arrivals, margin=0, final_end=float('inf')):
+        """
+        按时刻表预约整条路线
+
+        AGV在节点上停留到抵达下一节点为止，终点从抵达时刻起预约到final_end，默认长期预约
+
+        Args:
+            agv_id: AGV编号
+            path: 节点索引路径
+            departures: 从path[i]出发的时刻，长度为len(path)-1
+            arrivals: 抵达path[i]的时刻，长度为len(path)
+            margin: 每个区间末尾追加的安全时间
+            final_end: 终点预约的结束时刻
+        """
+        for i in range(len(path) - 1):
+            self.reserve_node(path[i], arrivals[i], arrivals[i + 1] + margin, agv_id)
+            self.reserve_edge(path[i], path[i + 1], departures[i], arrivals[i + 1] + margin,
+                              agv_id)
+        if path:
+            self.reserve_node(path[-1], arrivals[-1], max(final_end, arrivals[-1]), agv_id)
+
+    def _insert(self, table, key, interval):
+        """插入区间并登记到所属AGV"""
+        bisect.insort(table.setdefault(key, []), interval)
+        self._owned.setdefault(interval[2], []).append((table, key, interval))
+
+    @staticmethod
+    def _remove(table, key, interval):
+        """从区间列表中删除指定区间（可能已被清理）"""
+        intervals = table.get(key)
+        if not intervals:
+            return
+        index = bisect.bisect_left(intervals, interval)
+        if index < len(intervals) and intervals[index] == interval:
+            del intervals[index]
+            if not intervals:
+                del table[key]
+
+    def release(self, agv_id):
+        """
+        释放AGV的全部预约
+
+        Args:
+            agv_id: AGV编号
+        """
+        for table, key, interval in self._owned.pop(agv_id, ()):
+            self._remove(table, key, interval)
+
+    def expire(self, now):
+        """
+        释放所有在当前时刻之前结束的区间
+
+        各AGV的区间按路线顺序登记，结束时刻递增，因此只需从头部弹出
+
+        Args:
+            now: 当前时刻
+        """
+        for agv_id in list(self._owned):
+            owned = self._owned[agv_id]
+            count = 0
+            while count < len(owned) and owned[count][2][1] < now:
+                table, key, interval = owned[count]
+                self._remove(table, key, interval)
+                count += 1
+            if count:
+                del owned[:count]
+                if not owned:
+                    del self._owned[agv_id]
+
+    def copy(self):
+        """
+        复制预约表（区间列表逐个复制，区间本身不可变可共享）
+
+        Returns:
+            ReservationTable: 副本
+        """
+        table = ReservationTable()
+        table.node_intervals = {key: list(value) for key, value in self.node_intervals.items()}
+        table.edge_intervals = {key: list(value) for key, value in self.edge_intervals.items()}
+        table._owned = {}
+        for agv_id, owned in self._owned.items():
+            table._owned[agv_id] = [(table.node_intervals if source is self.node_intervals
+                                     else table.edge_intervals, key, interval)
+                                    for source, key, interval in owned]
+        return table
+
+    def restore(self, snapshot):
+        """
+        用快照（copy的结果）覆盖当前预约，快照本身不受之后修改的影响
+
+        Args:
+            snapshot: ReservationTable快照
+        """
+        table = snapshot.copy()
+        self.node_intervals = table.node_intervals
+        self.edge_intervals = table.edge_intervals
+        self._owned = table._owned
+
+    def detach(self, agv_id):
+        """
+        取出AGV的全部预约，可以用attach原样放回
+
+        Args:
+            agv_id: AGV编号
+
+        Returns:
+            list: [(是否为节点预约, 节点索引或边, 区间)] 列表，按登记顺序
+        """
+        entries = [(table is self.node_intervals, key, interval)
+                   for table, key, interval in self._owned.get(agv_id, ())]
+        self.release(agv_id)
+        return entries
+
+    def attach(self, entries):
+        """
+        放回detach取出的预约
+
+        Args:
+            entries: detach的返回值
+        """
+        for is_node, key, interval in entries:
+            self._insert(self.node_intervals if is_node else self.edge_intervals, key, interval)
+
+    def fits(self, entries, agv_id, nearby):
+        """
+        detach取出的预约能否原样放回而不与其他AGV的预约重叠
+
+        Args:
+            entries: detach的返回值
+            agv_id: 预约所属的AGV编号
+            nearby: 编译图的邻近节点表，邻近节点上的预约同样视为重叠
+
+        Returns:
+            bool: 没有重叠时返回True
+        """
+        for is_node, key, (begin, end, _) in entries:
+            if not is_node:
+                if self.edge_conflict(key[0], key[1], begin, end, agv_id) is not None:
+                    return False
+                continue
+            for v in (key, *nearby[key]):
+                for reserved_begin, reserved_end, owner in self.node_intervals.get(v, ()):
+                    if reserved_begin > end:
+                        break
+                    if owner != agv_id and reserved_end >= begin:
+                        return False
+        return True
+
+    def has_reservations(self, agv_id):
+        """AGV是否持有预约"""
+        return agv_id in self._owned
+
+    def clear(self):
+        """清空预约表"""
+        self.node_intervals = {}
+        self.edge_intervals = {}
+        self._owned = {}
+
+    # =============================================================================
+    # 查询
+    # =============================================================================
+
+    def safe_intervals(self, node, agv_id, now=0, nearby=(), upcoming_only=False):
+        """
+        获取节点对指定AGV的安全时间窗（不与其他AGV预约重叠的区间）
+
+        Args:
+            node: 节点索引
+            agv_id: 查询的AGV编号，其自身的预约被忽略
+            now: 当前时刻，更早的部分不返回
+            nearby: 距离过近、同样需要避让的其他节点索引
+            upcoming_only: 为True时忽略邻近节点上当前已开始的预约
+                （AGV已经停在该节点上，只需避让之后到来的AGV）
+
+        Returns:
+            list: [(开始, 结束)] 整数时刻闭区间列表，按时间排序
+        """
+        inf = float('inf')
+        reserved = self.node_intervals.get(node, ())
+        if nearby:
+            reserved = sorted([*reserved, *(interval for v in nearby
+                                            for interval in self.node_intervals.get(v, ())
+                                            if not upcoming_only or interval[0] > now)])
+
+        safe = []
+        begin = now
+        for reserved_begin, reserved_end, owner in reserved:
+            if owner == agv_id or reserved_end < begin:
+                continue
+            if reserved_begin > begin:
+                safe.append((begin, reserved_begin - 1))
+            if reserved_end == inf:
+                return safe
+            begin = max(begin, reserved_end + 1)
+        safe.append((begin, inf))
+        return safe
+
+    def edge_conflict(self, u, v, begin, end, agv_id):
+        """
+        查询在[begin, end]内通过u->v是否与其他AGV冲突（同向跟驰或反向对穿）
+
+        Args:
+            u: 起点索引
+            v: 终点索引
+            begin: 出发时刻
+            end: 抵达时刻
+            agv_id: 查询的AGV编号
+
+        Returns:
+            float: 冲突区间的最晚结束时刻，无冲突时返回None
+        """
+        latest = None
+        for key in ((u, v), (v, u)):
+            for reserved_begin, reserved_end, owner in self.edge_intervals.get(key, ()):
+                if reserved_begin > end:
+                    break
+                if owner != agv_id and reserved_end >= begin:
+                    if latest is None or reserved_end > latest:
+                        latest = reserved_end
+        return latest
\ No newline at end of file
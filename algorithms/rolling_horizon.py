@@ -0,0 +1,153 @@
+"""
+滚动时域多AGV规划模块
+每隔固定帧数为全部AGV重新规划，只在短时间窗内消解冲突，时间窗之外沿用单AGV路线
+"""
+
+from .space_time_planner import SpaceTimePlanner
+
+
+class HorizonTask:
+    """滚动时域规划中单个AGV的任务"""
+
+    __slots__ = ('agv_id', 'route', 'start_time', 'speed', 'heading', 'radius', 'deferred',
+                 'stalled')
+
+    def __init__(self, agv_id, route, start_time, speed, heading=0.0, radius=0, deferred=False,
+                 stalled=False):
+        """
+        Args:
+            agv_id: AGV编号
+            route: 从下一个决策节点到任务终点的单AGV路线（节点索引列表）
+            start_time: 抵达决策节点的最早时刻
+            speed: AGV每帧移动的距离
+            heading: 抵达决策节点时的车头角度
+            radius: 碰撞检测半径
+            deferred: 决策节点或其碰撞半径内的节点正被其他AGV占用，要等占用者按预约离开后才能抵达
+            stalled: 上一周期在时间窗内没有可行时刻表，很可能仍无法离开决策节点
+        """
+        self.agv_id = agv_id
+        self.route = route
+        self.start_time = start_time
+        self.speed = speed
+        self.heading = heading
+        self.radius = radius
+        self.deferred = deferred
+        self.stalled = stalled
+
+
+class RollingHorizonPlanner:
+    """
+    滚动时域规划(Rolling-Horizon Collision Resolution)
+
+    每个规划周期按顺序为各AGV在[now, now + window]内规划无冲突的时刻表：
+    沿单AGV路线找到预计在时间窗末尾抵达的节点作为本周期的目标，用安全时间窗规划到达该节点，
+    其后的路线不带时刻表。所有预约都在时间窗末尾附近结束，预约表每个周期重建，
+    因此单个AGV的搜索规模只取决于时间窗长度，与车队规模和路线长度无关。
+    规划周期必须短于时间窗，AGV在驶出有时刻表的部分之前就会被重新规划
+    """
+
+    # 帧
+    DEFAULT_WINDOW = 150
+    DEFAULT_PERIOD = 30
+
+    # 每个AGV单次时间窗搜索最多扩展的状态数
+    MAX_EXPANSIONS = 2000
+
+    @classmethod
+    def plan(cls, graph, tasks, table, now, window=DEFAULT_WINDOW, period=DEFAULT_PERIOD):
+        """
+        按顺序为一组AGV规划时间窗内的时刻表并写入预约
+
+        Args:
+            graph: 编译图
+            tasks: 按规划顺序排好的HorizonTask列表，路线只有一个节点的AGV视为停在原地；
+                deferred的AGV应排在占住其决策节点的AGV之后
+            table: 预约表，应只包含本周期的预约
+            now: 当前时刻
+            window: 时间窗长度（帧）
+            period: 规划周期（帧）
+
+        Returns:
+            tuple: ({AGV编号: (节点索引路径, 出发时刻列表)}, 受阻AGV编号集合, 扩展状态总数)；
+                出发时刻只覆盖时间窗内的部分，时间窗内不可行的AGV受阻，在决策节点等到下一周期
+        """
+        window_end = now + window
+        margin = SpaceTimePlanner.SAFETY_TICKS
+
+        # 停在原地的AGV和上一周期受阻的AGV先占住整个时间窗；其余有任务的AGV至少占用决策节点到沿路线驶离为止，
+        # 否则先规划的AGV会把路线排进后规划的AGV还没离开的节点。移动中的AGV由调用方预约正在行驶的边
+        moving = []
+        for task in tasks:
+            route = task.route
+            if len(route) == 1 or task.stalled:
+                table.reserve_node(route[0], task.start_time, window_end, task.agv_id)
+                if len(route) > 1:
+                    moving.append(task)
+                continue
+            moving.append(task)
+            if not task.deferred:
+                duration, _ = SpaceTimePlanner.travel_ticks(graph, route[0], route[1],
+                                                            task.speed, task.heading)
+                table.reserve_node(route[0], task.start_time,
+                                   task.start_time + duration + margin, task.agv_id)
+
+        routes = {}
+        stalled = set()
+        expanded = 0
+        for task in moving:
+            route = task.route
+            start_time = task.start_time
+            if task.stalled:
+                # 受阻的AGV停在节点上，只持有占住整个时间窗的预约，重新规划前释放
+                table.release(task.agv_id)
+            if task.deferred:
+                # 占用者离开后才能继续驶完剩余的距离
+                nearby = graph.nearby_nodes(task.radius)[route[0]]
+                intervals = table.safe_intervals(route[0], task.agv_id, start_time, nearby)
+                if intervals and intervals[0][0] > start_time:
+                    start_time = intervals[0][0] + start_time - now
+
+            result = None
+            if start_time < window_end:
+                horizon = cls.horizon_index(graph, route, start_time, task.speed, task.heading,
+                                            window_end)
+                result = SpaceTimePlanner.plan(graph, route[0], route[horizon], start_time,
+                                               table, task.agv_id, task.speed, task.heading,
+                                               task.radius, cls.MAX_EXPANSIONS)
+            if result is None:
+                # 时间窗内没有可行时刻表时在决策节点等待，下一周期再规划
+                table.reserve_node(route[0], start_time, window_end, task.agv_id)
+                routes[task.agv_id] = (route, [max(now + period, start_time)])
+                stalled.add(task.agv_id)
+                continue
+
+            path, departures, arrivals, count = result
+            expanded += count
+            table.reserve_route(task.agv_id, path, departures, arrivals, margin, window_end)
+            routes[task.agv_id] = (path + route[horizon + 1:], departures)
+        return routes, stalled, expanded
+
+    @staticmethod
+    def horizon_index(graph, route, start_time, speed, heading, window_end):
+        """
+        找出单AGV路线上预计在时间窗末尾或之后抵达的第一个节点
+
+        Args:
+            graph: 编译图
+            route: 节点索引路线
+            start_time: 抵达route[0]的时刻
+            speed: AGV每帧移动的距离
+            heading: 抵达route[0]时的车头角度
+            window_end: 时间窗结束时刻
+
+        Returns:
+            int: 该节点在路线中的下标，整条路线都在时间窗内时为终点下标
+        """
+        arrival = start_time
+        for i in range(len(route) - 1):
+            if arrival >= window_end:
+                return i
+            duration, heading = SpaceTimePlanner.travel_ticks(graph, route[i], route[i + 1],
+                                                              speed, heading)
+            arrival += duration
+        return len(route) - 1
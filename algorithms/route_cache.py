@@ -0,0 +1,133 @@
+"""
+路由缓存模块
+以 (算法, 起点, 终点) 为键的LRU缓存，条目带有地图版本和占用纪元标记
+"""
+
+from collections import OrderedDict
+
+
+class RouteEntry:
+    """路由缓存条目"""
+
+    __slots__ = ('path', 'path_nodes', 'cost', 'occupied', 'map_version', 'epoch')
+
+    def __init__(self, path, path_nodes, cost, occupied, map_version, epoch):
+        """
+        Args:
+            path: 路径节点ID列表
+            path_nodes: 路径上除起点外的节点索引集合
+            cost: 规划时计入占用惩罚的路径成本
+            occupied: 规划时的被占用节点索引集合（不含起点）
+            map_version: 地图版本
+            epoch: 占用纪元
+        """
+        self.path = path
+        self.path_nodes = path_nodes
+        self.cost = cost
+        self.occupied = occupied
+        self.map_version = map_version
+        self.epoch = epoch
+
+
+class RouteCache:
+    """
+    LRU路由缓存
+
+    占用纪元变化时不直接丢弃条目，而是做廉价的重新验证：
+    占用惩罚只会增加成本，因此只要路径上的节点占用状态未变，
+    且被释放的节点都不可能构成更短的路线，缓存路径仍然最优
+    """
+
+    DEFAULT_CAPACITY = 1024
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        """
+        Args:
+            capacity: 最大条目数
+        """
+        self.capacity = capacity
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.invalidations = 0
+
+    def lookup(self, key, map_version, epoch, occupied, lower_bound):
+        """
+        查询缓存路径
+
+        Args:
+            key: (算法, 起点ID, 终点ID)
+            map_version: 当前地图版本
+            epoch: 当前占用纪元
+            occupied: 当前被占用节点索引集合（不含起点）
+            lower_bound: 函数 f -> 经过节点f的路线成本下界
+
+        Returns:
+            list: 缓存路径，未命中时返回None
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry.map_version != map_version:
+            self.misses += 1
+            return None
+
+        if entry.epoch != epoch and entry.path:
+            if not self._revalidate(entry, occupied, lower_bound):
+                del self._entries[key]
+                self.misses += 1
+                return None
+            entry.occupied = frozenset(occupied)
+            entry.epoch = epoch
+            self.revalidations += 1
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.path
+
+    @staticmethod
+    def _revalidate(entry, occupied, lower_bound):
+        """
+        检查占用变化后缓存路径是否仍然最优
+
+        Returns:
+            bool: 是否仍然有效
+        """
+        changed = entry.occupied.symmetric_difference(occupied)
+        if not changed.isdisjoint(entry.path_nodes):
+            return False
+
+        for freed in entry.occupied.difference(occupied):
+            if lower_bound(freed) < entry.cost:
+                return False
+        return True
+
+    def store(self, key, entry):
+        """
+        写入缓存，超出容量时淘汰最久未使用的条目
+
+        Args:
+            key: (算法, 起点ID, 终点ID)
+            entry: RouteEntry
+        """
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """清空缓存（地图重新加载时调用）"""
+        self._entries.clear()
+        self.invalidations += 1
+
+    def get_stats(self):
+        """获取缓存统计信息"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'invalidations': self.invalidations,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
\ No newline at end of file
@@ -0,0 +1,177 @@
+"""
+时空规划模块
+基于安全时间窗的A*（SIPP），在预约表之上规划无冲突的节点时刻表
+"""
+
+import heapq
+import math
+
+
+class SpaceTimePlanner:
+    """
+    安全时间窗路径规划(Safe Interval Path Planning)
+
+    搜索状态为 (节点, 安全时间窗)，代价为最早抵达时刻。AGV可以在当前节点的时间窗内
+    等待后再出发，因此同一节点只需要按时间窗区分状态，不必按时刻展开。
+    时间单位为仿真帧，边的通行时间按AGV的转向和直线速度估算
+    """
+
+    # 每个预约区间末尾追加的安全帧数，吸收转向估算和执行误差
+    SAFETY_TICKS = 8
+
+    # 与AGV每帧的转向角度一致
+    TURN_STEP = 3
+
+    # 单次搜索最多扩展的状态数
+    MAX_EXPANSIONS = 50000
+
+    # 最近一次规划扩展的状态数，规划失败时同样记录
+    last_expanded = 0
+
+    @classmethod
+    def travel_ticks(cls, graph, u, v, speed, heading):
+        """
+        估算从u驶向v所需的帧数（含下达目标的一帧和原地转向）
+
+        Args:
+            graph: 编译图
+            u: 起点索引
+            v: 终点索引
+            speed: AGV每帧移动的距离
+            heading: 出发前的车头角度
+
+        Returns:
+            tuple: (帧数, 抵达后的车头角度)
+        """
+        dx = graph.xs[v] - graph.xs[u]
+        dy = graph.ys[v] - graph.ys[u]
+        angle = math.degrees(math.atan2(dy, dx)) % 360
+
+        diff = abs(angle - heading) % 360
+        if diff > 180:
+            diff = 360 - diff
+        turn = math.ceil((diff - cls.TURN_STEP) / cls.TURN_STEP) if diff > cls.TURN_STEP else 0
+
+        distance = math.hypot(dx, dy)
+        return 1 + turn + math.ceil(distance / speed), angle
+
+    @classmethod
+    def plan(cls, graph, start, goal, now, table, agv_id, speed, heading=0.0, radius=0,
+             max_expansions=None):
+        """
+        规划从当前时刻出发、与预约表中其他AGV无冲突的时刻表
+
+        Args:
+            graph: 编译图
+            start: 起始节点索引
+            goal: 目标节点索引
+            now: 当前时刻
+            table: 预约表
+            agv_id: AGV编号
+            speed: AGV每帧移动的距离
+            heading: 当前车头角度
+            radius: 碰撞检测半径，距离小于该值的节点视为同一冲突区域
+            max_expansions: 最多扩展的状态数，默认为MAX_EXPANSIONS
+
+        Returns:
+            tuple: (节点索引路径, 出发时刻列表, 抵达时刻列表, 扩展状态数)；
+                找不到能在终点长期停留的时刻表时返回None
+        """
+        inf = float('inf')
+        margin = cls.SAFETY_TICKS
+        if max_expansions is None:
+            max_expansions = cls.MAX_EXPANSIONS
+        xs = graph.xs
+        ys = graph.ys
+        goal_x = xs[goal]
+        goal_y = ys[goal]
+
+        nearby = graph.nearby_nodes(radius)
+        intervals = {}
+
+        def safe(v):
+            if v not in intervals:
+                intervals[v] = table.safe_intervals(v, agv_id, now, nearby[v])
+            return intervals[v]
+
+        # AGV已经停在起点上，邻近节点只需避让之后到来的AGV
+        intervals[start] = table.safe_intervals(start, agv_id, now, nearby[start], True)
+
+        cls.last_expanded = 0
+        start_intervals = safe(start)
+        if not start_intervals or start_intervals[0][0] > now:
+            return None
+
+        def heuristic(v):
+            return math.hypot(xs[v] - goal_x, ys[v] - goal_y) / speed
+
+        start_state = (start, 0)
+        best = {start_state: now}
+        parents = {start_state: (None, None)}
+        headings = {start_state: heading}
+        open_set = [(now + heuristic(start), now, start, 0)]
+        expanded = 0
+
+        while open_set:
+            _, arrival, v, i = heapq.heappop(open_set)
+            state = (v, i)
+            if arrival > best[state]:
+                continue
+            expanded += 1
+            cls.last_expanded = expanded
+            if expanded > max_expansions:
+                return None
+
+            window_end = safe(v)[i][1]
+            if v == goal and window_end == inf:
+                return cls._reconstruct(state, parents, best) + (expanded,)
+
+            for e in range(graph.offsets[v], graph.offsets[v + 1]):
+                w = graph.targets[e]
+                duration, new_heading = cls.travel_ticks(graph, v, w, speed, headings[state])
+
+                for j, (w_begin, w_end) in enumerate(safe(w)):
+                    # 在v上必须停留到抵达w之后的安全时间，不能超出v的时间窗
+                    latest_arrival = window_end - margin
+                    earliest = max(arrival + duration, w_begin)
+                    if earliest > latest_arrival:
+                        break
+                    if earliest > w_end:
+                        continue
+
+                    # 边上有冲突时推迟出发，直到冲突区间结束
+                    while True:
+                        conflict = table.edge_conflict(v, w, earliest - duration,
+                                                       earliest + margin, agv_id)
+                        if conflict is None:
+                            break
+                        earliest = conflict + 1 + duration
+                    if earliest > latest_arrival or earliest > w_end:
+                        continue
+
+                    successor = (w, j)
+                    if earliest < best.get(successor, inf):
+                        best[successor] = earliest
+                        parents[successor] = (state, earliest - duration)
+                        headings[successor] = new_heading
+                        heapq.heappush(open_set, (earliest + heuristic(w), earliest, w, j))
+
+        return None
+
+    @staticmethod
+    def _reconstruct(state, parents, best):
+        """回溯得到路径、出发时刻和抵达时刻"""
+        path = []
+        departures = []
+        arrivals = []
+        while state is not None:
+            parent, departure = parents[state]
+            path.append(state[0])
+            arrivals.append(best[state])
+            if parent is not None:
+                departures.append(departure)
+            state = parent
+        path.reverse()
+        departures.reverse()
+        arrivals.reverse()
+        return path, departures, arrivals
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""
+子图视图模块
+以节点掩码表示编译图上的节点子集（如一条作业线），与编译图共享邻接数组和搜索缓冲区
+"""
+
+
+class SubgraphView:
+    """
+    编译图的节点子集视图
+
+    mask[v]为1表示节点v属于视图。搜索时只允许驶入视图内的节点（起点除外），
+    邻接数组、坐标和搜索缓冲区都直接使用编译图的，不复制边。
+    子图上的最短距离不小于全图上的，因此全图的距离表、地标下界仍可作为启发值，
+    全图最短路线完全落在视图内时也是视图内的最短路线
+    """
+
+    def __init__(self, graph, name, mask):
+        """
+        Args:
+            graph: 编译图
+            name: 视图名称（作业线名称）
+            mask: 长度为节点数的bytearray，属于视图的节点为1
+        """
+        self.graph = graph
+        self.name = name
+        self.mask = mask
+        self.node_count = sum(mask)
+
+    @classmethod
+    def build(cls, graph, name, node_ids):
+        """
+        由节点ID列表建立视图，忽略地图中不存在的节点
+
+        Args:
+            graph: 编译图
+            name: 视图名称
+            node_ids: 属于视图的节点ID
+
+        Returns:
+            SubgraphView: 视图
+        """
+        mask = bytearray(graph.node_count)
+        index_of = graph.index_of
+        for node_id in node_ids:
+            v = index_of.get(node_id)
+            if v is not None:
+                mask[v] = 1
+        return cls(graph, name, mask)
+
+    def __contains__(self, v):
+        return bool(self.mask[v])
+
+    def covers(self, path, start=None):
+        """
+        路径上的节点是否都属于视图
+
+        Args:
+            path: 节点索引路径
+            start: 可以在视图外的起点索引
+
+        Returns:
+            bool: 除start外都属于视图时为True
+        """
+        mask = self.mask
+        return all(mask[v] or v == start for v in path)
+
+    def restricts(self):
+        """视图是否排除了编译图中的节点"""
+        return self.node_count < self.graph.node_count
@@ -0,0 +1,250 @@
+"""
+通行时间模型模块
+以帧为单位估算AGV沿路线行驶所需的时间（含原地转向），并在边状态上搜索用时最短的路线
+"""
+
+import heapq
+import math
+from array import array
+
+from .space_time_planner import SpaceTimePlanner
+
+
+class TravelTimeModel:
+    """
+    给定AGV速度下的通行时间模型
+
+    edge_ticks[e] 为沿出边e行驶的帧数（含下达目标的一帧），转向时间只取决于相邻两条边，
+    按 (入边, 出边) 预先算好：驶入节点v的边e与v的第k条出边之间的转向帧数位于
+    turn_ticks[turn_base[e] + k]，不允许原地转向的节点上需要转向的组合为inf。
+    搜索状态是"经由哪条边抵达节点"，因此可以表达掉头和禁止转向的限制
+    """
+
+    # 与AGV每帧的转向角度一致
+    TURN_STEP = SpaceTimePlanner.TURN_STEP
+
+    def __init__(self, graph, speed, edge_ticks, begin_angles, end_angles, turn_base, turn_ticks,
+                 can_rotate):
+        """
+        Args:
+            graph: 编译图
+            speed: AGV每帧移动的距离
+            edge_ticks: 各出边的行驶帧数
+            begin_angles: 各出边在起点处的车头角度
+            end_angles: 各出边在终点处的车头角度
+            turn_base: 各出边在转向表中的起始位置
+            turn_ticks: 转向表
+            can_rotate: 各节点能否原地转向
+        """
+        self.graph = graph
+        self.speed = speed
+        self.edge_ticks = edge_ticks
+        self.begin_angles = begin_angles
+        self.end_angles = end_angles
+        self.turn_base = turn_base
+        self.turn_ticks = turn_ticks
+        self.can_rotate = can_rotate
+
+        # 最近一次搜索的统计信息
+        self.expanded = 0
+        self.pushes = 0
+        self.pops = 0
+
+    @classmethod
+    def build(cls, graph, nodes, speed):
+        """
+        由编译图和节点字典构建通行时间模型
+
+        边上配置了车头角度时使用配置值，否则按两端坐标的方向计算。
+        地图中没有任何节点允许原地转向时视为该属性未配置，所有节点都允许转向
+
+        Args:
+            graph: 编译图
+            nodes: 节点字典（编译图的来源）
+            speed: AGV每帧移动的距离
+
+        Returns:
+            TravelTimeModel: 通行时间模型
+        """
+        node_ids = graph.node_ids
+        offsets = graph.offsets
+        targets = graph.targets
+        xs = graph.xs
+        ys = graph.ys
+        inf = float('inf')
+
+        flags = [getattr(nodes[node_id], 'can_rotate', True) for node_id in node_ids]
+        if not any(flags):
+            flags = [True] * graph.node_count
+        can_rotate = array('b', flags)
+
+        edge_ticks = array('d', [0.0]) * graph.edge_count
+        begin_angles = array('d', [0.0]) * graph.edge_count
+        end_angles = array('d', [0.0]) * graph.edge_count
+        for u in range(graph.node_count):
+            configured = nodes[node_ids[u]].edge_angles
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                dx = xs[v] - xs[u]
+                dy = ys[v] - ys[u]
+                angles = configured.get(node_ids[v])
+                if angles is None:
+                    angle = math.degrees(math.atan2(dy, dx)) % 360
+                    angles = (angle, angle)
+                begin_angles[e] = angles[0] % 360
+                end_angles[e] = angles[1] % 360
+                edge_ticks[e] = 1 + math.ceil(math.hypot(dx, dy) / speed)
+
+        turn_base = array('i', [0]) * graph.edge_count
+        turn_ticks = array('d')
+        for u in range(graph.node_count):
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                turn_base[e] = len(turn_ticks)
+                for f in range(offsets[v], offsets[v + 1]):
+                    ticks = cls.rotation_ticks(end_angles[e], begin_angles[f])
+                    if ticks and not can_rotate[v]:
+                        ticks = inf
+                    turn_ticks.append(ticks)
+
+        return cls(graph, speed, edge_ticks, begin_angles, end_angles, turn_base, turn_ticks,
+                   can_rotate)
+
+    @classmethod
+    def rotation_ticks(cls, heading, angle):
+        """
+        从车头角度heading原地转到angle所需的帧数，与AGV每帧转向TURN_STEP度、
+        差值不超过TURN_STEP时直接对齐的行为一致
+
+        Returns:
+            int: 帧数
+        """
+        diff = abs(angle - heading) % 360
+        if diff > 180:
+            diff = 360 - diff
+        if diff <= cls.TURN_STEP:
+            return 0
+        return math.ceil((diff - cls.TURN_STEP) / cls.TURN_STEP)
+
+    def route_ticks(self, path, heading=None):
+        """
+        计算沿节点索引路径行驶的帧数
+
+        Args:
+            path: 节点索引路径
+            heading: 出发时的车头角度，为None时不计起点的转向
+
+        Returns:
+            float: 帧数，路径包含不存在的边或禁止的转向时为inf
+        """
+        graph = self.graph
+        total = 0.0
+        previous = None
+        for u, v in zip(path, path[1:]):
+            edge = None
+            for e in range(graph.offsets[u], graph.offsets[u + 1]):
+                if graph.targets[e] == v and (edge is None or
+                                              self.edge_ticks[e] < self.edge_ticks[edge]):
+                    edge = e
+            if edge is None:
+                return float('inf')
+            total += self.edge_ticks[edge] + self._departure_ticks(u, previous, heading, edge)
+            previous = edge
+        return total
+
+    def _departure_ticks(self, u, previous, heading, edge):
+        """从节点u沿出边edge出发前的转向帧数，previous为驶入u的边（在起点时为None）"""
+        if previous is not None:
+            return self.turn_ticks[self.turn_base[previous] + edge - self.graph.offsets[u]]
+        if heading is None:
+            return 0
+        ticks = self.rotation_ticks(heading, self.begin_angles[edge])
+        if ticks and not self.can_rotate[u]:
+            return float('inf')
+        return ticks
+
+    def search(self, start, end, heading=None, occupied=None, penalty=1, mask=None):
+        """
+        A*搜索用时最短的路线，启发函数为直线距离/速度
+
+        Args:
+            start: 起始节点索引
+            end: 目标节点索引
+            heading: 当前车头角度，为None时不计起点的转向
+            occupied: 被占用节点索引集合（不含起点），驶入这些节点的边行驶帧数乘以penalty
+            penalty: 占用惩罚倍数
+            mask: 子图视图的节点掩码，为None时不限制
+
+        Returns:
+            tuple: (节点索引路径, 帧数)，无路径时返回 ([], inf)
+        """
+        graph = self.graph
+        offsets = graph.offsets
+        targets = graph.targets
+        xs = graph.xs
+        ys = graph.ys
+        edge_ticks = self.edge_ticks
+        turn_base = self.turn_base
+        turn_ticks = self.turn_ticks
+        end_x = xs[end]
+        end_y = ys[end]
+        speed = self.speed
+        sqrt = math.sqrt
+        inf = float('inf')
+        self.expanded = 0
+        self.pushes = 0
+        self.pops = 0
+
+        if start == end:
+            return [start], 0.0
+
+        # 状态为抵达节点所经由的边，-1表示停在起点
+        best = {}
+        came_from = {}
+        open_set = []
+
+        def relax(e, previous, cost):
+            v = targets[e]
+            if mask is not None and not mask[v]:
+                return
+            if occupied and v in occupied:
+                cost += edge_ticks[e] * (penalty - 1)
+            if cost < best.get(e, inf):
+                best[e] = cost
+                came_from[e] = previous
+                h = sqrt((xs[v] - end_x) ** 2 + (ys[v] - end_y) ** 2) / speed
+                heapq.heappush(open_set, (cost + h, cost, e))
+                self.pushes += 1
+
+        for e in range(offsets[start], offsets[start + 1]):
+            ticks = self._departure_ticks(start, None, heading, e)
+            if ticks < inf:
+                relax(e, -1, ticks + edge_ticks[e])
+
+        closed = set()
+        while open_set:
+            _, cost, e = heapq.heappop(open_set)
+            self.pops += 1
+            if e in closed:
+                continue
+            closed.add(e)
+            self.expanded += 1
+
+            v = targets[e]
+            if v == end:
+                path = [v]
+                while e != -1:
+                    e = came_from[e]
+                    path.append(start if e == -1 else targets[e])
+                path.reverse()
+                return path, cost
+
+            base = turn_base[e] - offsets[v]
+            for f in range(offsets[v], offsets[v + 1]):
+                if f in closed:
+                    continue
+                turn = turn_ticks[base + f]
+                if turn < inf:
+                    relax(f, e, cost + turn + edge_ticks[f])
+
+        return [], inf
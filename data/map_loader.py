@@ -3,9 +3,13 @@
 只支持从SQLite数据库加载地图数据
 """
 
+import hashlib
+import re
 import sqlite3
 from models.node import Node
 from models.path import Path
+from algorithms.compiled_graph import CompiledGraph
+from algorithms.reachability import ReachabilityIndex
 
 
 class MapLoader:
@@ -60,6 +64,151 @@ class MapLoader:
         except Exception as e:
             raise Exception(f"加载数据库地图失败: {str(e)}")
 
+    @staticmethod
+    def load_stations(db_path="AgvBiz.db"):
+        """
+        从业务数据库加载启用的站点所在的节点
+
+        Args:
+            db_path: 业务数据库文件路径
+
+        Returns:
+            list: 站点节点ID列表（按站点序号排序，去重）
+
+        Raises:
+            Exception: 数据库连接或查询失败时抛出异常
+        """
+        try:
+            conn = sqlite3.connect(db_path)
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT point FROM T_Station
+                WHERE enabled = 1
+                ORDER BY stationIndex
+            """)
+            rows = cursor.fetchall()
+            conn.close()
+        except sqlite3.Error as e:
+            raise Exception(f"加载站点失败: {str(e)}")
+
+        return list(dict.fromkeys(row[0].strip() for row in rows if row[0] and row[0].strip()))
+
+    @staticmethod
+    def load_work_lines(db_path="AgvBiz.db"):
+        """
+        从业务数据库加载作业线的节点和各AGV所属的作业线
+
+        作业线的节点为T_WorkLine的points和circlePoints，加上T_Station中属于该作业线的
+        启用站点；points为空的作业线不限制规划范围，不出现在结果中。
+        T_SeerAgv.workLine可以是作业线名称或编号
+
+        Args:
+            db_path: 业务数据库文件路径
+
+        Returns:
+            tuple: ({作业线名称: 节点ID列表}, {AGV编号: 作业线名称})
+
+        Raises:
+            Exception: 数据库连接或查询失败时抛出异常
+        """
+        try:
+            conn = sqlite3.connect(db_path)
+            cursor = conn.cursor()
+            cursor.execute("SELECT lineName, lineId, points, circlePoints FROM T_WorkLine")
+            lines_data = cursor.fetchall()
+            cursor.execute("SELECT workLine, point FROM T_Station WHERE enabled = 1")
+            stations_data = cursor.fetchall()
+            cursor.execute("SELECT agvId, workLine FROM T_SeerAgv")
+            agvs_data = cursor.fetchall()
+            conn.close()
+        except sqlite3.Error as e:
+            raise Exception(f"加载作业线失败: {str(e)}")
+
+        names = {}
+        lines = {}
+        for name, line_id, points, circle_points in lines_data:
+            names[name] = name
+            names[str(line_id)] = name
+            point_ids = MapLoader._split_point_ids(points)
+            if point_ids:
+                lines[name] = point_ids + MapLoader._split_point_ids(circle_points)
+
+        for work_line, point in stations_data:
+            name = names.get(str(work_line).strip())
+            if name in lines and point and point.strip():
+                lines[name].append(point.strip())
+
+        agv_lines = {}
+        for agv_id, work_line in agvs_data:
+            name = names.get(str(work_line).strip())
+            if name is not None:
+                agv_lines[agv_id] = name
+
+        return {name: list(dict.fromkeys(point_ids)) for name, point_ids in lines.items()}, agv_lines
+
+    @staticmethod
+    def _split_point_ids(text):
+        """拆分以逗号、分号或空白分隔的节点ID列表"""
+        if not text:
+            return []
+        return [point_id for point_id in re.split(r'[,;，；\s]+', text) if point_id]
+
+    @staticmethod
+    def load_areas(db_path="Map.db"):
+        """
+        从地图数据库加载T_Area区域，以及坐标落在各区域矩形内的节点
+
+        Args:
+            db_path: 数据库文件路径
+
+        Returns:
+            list: [(区域名称, 节点ID列表)]，按区域id排序，不包含没有节点的区域
+
+        Raises:
+            Exception: 数据库连接或查询失败时抛出异常
+        """
+        try:
+            conn = sqlite3.connect(db_path)
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT areaName, left, right, top, bottom FROM T_Area
+                ORDER BY id
+            """)
+            areas_data = cursor.fetchall()
+            cursor.execute("SELECT pointId, x, y FROM T_GraphPoint")
+            points_data = cursor.fetchall()
+            conn.close()
+        except sqlite3.Error as e:
+            raise Exception(f"加载区域失败: {str(e)}")
+
+        areas = []
+        for name, left, right, top, bottom in areas_data:
+            # 上下边界的大小关系取决于坐标系方向，按范围判断
+            min_x, max_x = sorted((left, right))
+            min_y, max_y = sorted((top, bottom))
+            point_ids = [point_id for point_id, x, y in points_data
+                         if min_x <= x <= max_x and min_y <= y <= max_y]
+            if point_ids:
+                areas.append((name, point_ids))
+        return areas
+
+    @staticmethod
+    def get_map_hash(db_path="Map.db"):
+        """
+        计算地图数据库的内容哈希，用于标识预计算数据对应的地图版本
+
+        Args:
+            db_path: 数据库文件路径
+
+        Returns:
+            str: SHA-256十六进制摘要
+        """
+        digest = hashlib.sha256()
+        with open(db_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
     @staticmethod
     def _process_points_data(points_data):
         """
@@ -94,7 +243,8 @@ class MapLoader:
             # 确定节点类型
             node_type = MapLoader._get_node_type(point_id)
 
-            nodes[point_id] = Node(point_id, scaled_x, scaled_y, node_type)
+            nodes[point_id] = Node(point_id, scaled_x, scaled_y, node_type,
+                                   can_rotate=bool(can_rotate))
 
         return nodes
 
@@ -119,10 +269,15 @@ class MapLoader:
             db_id, begin_angle, begin_id, end_angle, end_id, pass_angles, weight = row
 
             if begin_id in nodes and end_id in nodes:
-                # 添加单向连接
+                # 添加单向连接，同时记录反向邻接供反向搜索使用
                 nodes[begin_id].add_connection(end_id, weight)
+                nodes[end_id].add_predecessor(begin_id, weight)
                 edge_pairs.add((begin_id, end_id))
 
+                angles = MapLoader._parse_edge_angles(begin_angle, end_angle, pass_angles)
+                if angles is not None:
+                    nodes[begin_id].set_edge_angles(end_id, *angles)
+
         # 检测双向连接
         bidirectional_edges = MapLoader._detect_bidirectional_edges(edge_pairs)
 
@@ -152,6 +307,39 @@ class MapLoader:
 
         return paths
 
+    @staticmethod
+    def _parse_edge_angles(begin_angle, end_angle, pass_angles):
+        """
+        解析边上的车头角度（度）
+
+        出发和抵达角度都为0且没有途经角度时视为未配置；
+        只配置了途经角度时取第一个和最后一个作为出发和抵达角度
+
+        Args:
+            begin_angle: 出发角度
+            end_angle: 抵达角度
+            pass_angles: 途经角度，逗号分隔
+
+        Returns:
+            tuple: (出发角度, 抵达角度)，未配置时返回None
+        """
+        passes = []
+        for text in str(pass_angles or '').replace(';', ',').split(','):
+            text = text.strip()
+            if text:
+                try:
+                    passes.append(float(text))
+                except ValueError:
+                    continue
+
+        begin_angle = begin_angle or 0.0
+        end_angle = end_angle or 0.0
+        if begin_angle == 0 and end_angle == 0:
+            if not passes:
+                return None
+            return passes[0], passes[-1]
+        return float(begin_angle), float(end_angle)
+
     @staticmethod
     def _calculate_scale(min_x, max_x, min_y, max_y):
         """
@@ -254,7 +442,11 @@ class MapLoader:
                 'node_count': len(nodes),
                 'path_count': len(paths),
                 'node_types': {},
-                'isolated_nodes': []
+                'isolated_nodes': [],
+                'component_count': 0,
+                'dead_end_components': [],
+                'one_way_traps': [],
+                'unreachable_components': []
             }
         }
 
@@ -276,4 +468,65 @@ class MapLoader:
         if result['stats']['isolated_nodes']:
             result['warnings'].append(f"发现 {len(result['stats']['isolated_nodes'])} 个孤立节点")
 
-        return result
\ No newline at end of file
+        MapLoader._check_reachability(nodes, result)
+        return result
+
+    @staticmethod
+    def _check_reachability(nodes, result):
+        """
+        按强连通分量检查地图的连通性
+
+        以节点最多的强连通分量为主路网：死胡同分量是从它出发能进入、进入后回不到它的分量，
+        单向陷阱是从能回到主路网的节点驶入死胡同的边；主路网无法到达的分量另行报告。
+        孤立节点不计入
+
+        Args:
+            nodes: 节点字典
+            result: 验证结果，写入stats并追加警告
+        """
+        graph = CompiledGraph.from_nodes(nodes)
+        index = ReachabilityIndex.build(graph)
+        node_ids = graph.node_ids
+        stats = result['stats']
+        stats['component_count'] = index.component_count
+        stats['unreachable_components'] = []
+        if index.component_count <= 1:
+            return
+
+        members = index.members()
+        main = max(range(index.component_count), key=lambda c: len(members[c]))
+        hub = members[main][0]
+
+        def isolated(c):
+            v = members[c][0]
+            return (len(members[c]) == 1 and graph.offsets[v] == graph.offsets[v + 1] and
+                    graph.r_offsets[v] == graph.r_offsets[v + 1])
+
+        returns = [index.reachable(members[c][0], hub) for c in range(index.component_count)]
+        for c in range(index.component_count):
+            if c == main or isolated(c):
+                continue
+            component = [node_ids[v] for v in members[c]]
+            if not index.reachable(hub, members[c][0]):
+                stats['unreachable_components'].append(component)
+            elif not returns[c]:
+                stats['dead_end_components'].append(component)
+
+        component = index.component
+        stats['one_way_traps'] = [(node_ids[u], node_ids[v]) for u, v in index.one_way_edges()
+                                  if returns[component[u]] and not returns[component[v]]]
+
+        if stats['dead_end_components']:
+            examples = ', '.join(str(c[0]) for c in stats['dead_end_components'][:5])
+            result['warnings'].append(
+                f"发现 {len(stats['dead_end_components'])} 个进入后无法返回主路网的死胡同分量"
+                f"（如含节点 {examples} 的分量）")
+        if stats['one_way_traps']:
+            examples = ', '.join(f"{u}->{v}" for u, v in stats['one_way_traps'][:5])
+            result['warnings'].append(
+                f"发现 {len(stats['one_way_traps'])} 条驶入死胡同的单向陷阱边（如 {examples}）")
+        if stats['unreachable_components']:
+            examples = ', '.join(str(c[0]) for c in stats['unreachable_components'][:5])
+            result['warnings'].append(
+                f"发现 {len(stats['unreachable_components'])} 个主路网无法到达的分量"
+                f"（如含节点 {examples} 的分量）")
\ No newline at end of file
@@ -37,9 +37,11 @@ class AGV:
         self.path = []
         self.path_index = 0
         self.task_target = None
+        self.schedule = []  # 时空规划给出的各节点出发帧，为空时不限制出发时间
 
         # 状态属性
         self.status = "待机"
+        self.planning = False  # 后台规划的路线尚未送达
         self.waiting = False
         self.collision_buffer = 25
         self.wait_counter = 0
@@ -48,16 +50,49 @@ class AGV:
         # 占用起始节点
         start_node.occupied_by = self.id
 
-    def set_path(self, path):
-        """设置路径"""
+    def set_path(self, path, schedule=None):
+        """设置路径，schedule为各节点的最早出发帧"""
         if len(path) > 1:
             self.path = path
+            self.schedule = list(schedule) if schedule else []
             self.path_index = 0
             self.task_target = path[-1]
             self.status = f"前往节点 {self.task_target}"
             self.waiting = False
             self.wait_counter = 0
 
+    def update_route(self, path, schedule=None):
+        """
+        替换剩余路线，不打断正在行驶的边
+
+        path从下一个决策节点开始（移动中为正在驶向的节点，否则为当前节点），
+        schedule为path各节点的最早出发帧
+        """
+        schedule = list(schedule) if schedule else []
+        if self.moving and self.target_node:
+            path = [self.current_node.id] + list(path)
+            if schedule:
+                schedule = [0] + schedule
+
+        if len(path) < 2:
+            self.path = []
+            self.schedule = []
+            self.path_index = 0
+            self.task_target = None
+            return
+
+        self.path = list(path)
+        self.schedule = schedule
+        self.path_index = 0
+        self.task_target = path[-1]
+
+    def extend_path(self, path):
+        """在路线末尾追加节点，不打断当前行驶"""
+        if not self.path or not path:
+            return
+        self.path = self.path + list(path)
+        self.task_target = self.path[-1]
+
     def set_target(self, node):
         """设置移动目标"""
         if node.id not in self.current_node.connections:
@@ -82,10 +117,10 @@ class AGV:
         self.status = f"移动至节点 {node.id}"
         return True
 
-    def move(self, nodes, other_agvs):
+    def move(self, nodes, other_agvs, tick=None):
         """移动逻辑"""
         if not self.moving or not self.target_node:
-            self._try_next_path_step(nodes)
+            self._try_next_path_step(nodes, tick)
             return
 
         # 检查目标节点占用
@@ -101,12 +136,19 @@ class AGV:
             # 移动到目标
             self._move_to_target(other_agvs)
 
-    def _try_next_path_step(self, nodes):
+    def _try_next_path_step(self, nodes, tick=None):
         """尝试执行路径中的下一步"""
         if not self.path or self.path_index + 1 >= len(self.path):
             return
 
         next_node_id = self.path[self.path_index + 1]
+
+        # 按时刻表出发，未到出发帧时原地等待
+        if (self.schedule and tick is not None and
+                self.path_index < len(self.schedule) and tick < self.schedule[self.path_index]):
+            self.status = f"等待时间窗 {next_node_id}"
+            return
+
         if next_node_id in nodes:
             next_node = nodes[next_node_id]
             if next_node.occupied_by is None or next_node.occupied_by == self.id:
@@ -183,6 +225,7 @@ class AGV:
             if self.path_index >= len(self.path) - 1:
                 self.status = f"已到达 {self.current_node.id}"
                 self.path = []
+                self.schedule = []
                 self.path_index = 0
                 self.task_target = None
             else:
@@ -229,6 +272,7 @@ class AGV:
         self.moving = False
         self.target_node = None
         self.path = []
+        self.schedule = []
         self.path_index = 0
         self.task_target = None
         self.status = "已停止"
@@ -261,6 +305,13 @@ class AGV:
                           self.width, self.height)
         painter.drawText(text_rect, Qt.AlignCenter, f"#{self.id}")
 
+        # 规划中指示
+        if self.planning:
+            painter.setBrush(Qt.NoBrush)
+            painter.setPen(QPen(QColor(30, 120, 255), 2, Qt.DashLine))
+            painter.drawEllipse(QRectF(self.x - self.width * 0.75, self.y - self.height * 0.75,
+                                       self.width * 1.5, self.height * 1.5))
+
         # 等待状态指示
         if self.waiting:
             painter.setBrush(QBrush(Qt.red))
@@ -9,24 +9,59 @@ from PyQt5.QtCore import Qt, QRectF
 class Node:
     """地图节点类 - 优化版本"""
 
-    def __init__(self, id, x, y, node_type='normal'):
+    def __init__(self, id, x, y, node_type='normal', can_rotate=True):
         self.id = id
         self.x = x
         self.y = y
+        self.can_rotate = can_rotate  # AGV能否在本节点原地转向
         self.size = 24  # 节点大小放大一倍：12×12 → 24×24
         self.connections = []  # 连接的其他节点ID
         self.node_type = node_type  # 节点类型
         self.neighbors = {}  # 邻居节点和距离
+        self.predecessors = {}  # 能直接到达本节点的节点和距离（反向邻接）
+        self.edge_angles = {}  # 出边上AGV的车头角度 {节点ID: (出发角度, 抵达角度)}，未配置的边按几何方向
+        self.occupancy_index = None  # 登记本节点的占用索引（编译图时设置）
+        self.graph_index = -1  # 本节点在编译图中的索引
         self.occupied_by = None  # 占用的AGV ID
         self.reserved_by = None  # 预定的AGV ID
         self.reservation_time = 0  # 预定时间
 
+    @property
+    def occupied_by(self):
+        """占用本节点的AGV ID"""
+        return self._occupied_by
+
+    @occupied_by.setter
+    def occupied_by(self, agv_id):
+        self._occupied_by = agv_id
+        if self.occupancy_index is not None:
+            self.occupancy_index.set_occupant(self.graph_index, agv_id)
+
+    @property
+    def reserved_by(self):
+        """预定本节点的AGV ID"""
+        return self._reserved_by
+
+    @reserved_by.setter
+    def reserved_by(self, agv_id):
+        self._reserved_by = agv_id
+        if self.occupancy_index is not None:
+            self.occupancy_index.set_reserver(self.graph_index, agv_id)
+
     def add_connection(self, node_id, distance):
         """添加连接"""
         if node_id not in self.connections:
             self.connections.append(node_id)
         self.neighbors[node_id] = distance
 
+    def add_predecessor(self, node_id, distance):
+        """添加反向连接（从node_id指向本节点的边）"""
+        self.predecessors[node_id] = distance
+
+    def set_edge_angles(self, node_id, begin_angle, end_angle):
+        """设置驶向node_id的出边在起点和终点处的车头角度（度）"""
+        self.edge_angles[node_id] = (begin_angle, end_angle)
+
     def get_node_color(self, is_in_control_zone=False):
         """获取节点颜色"""
         # 如果节点在管控区内，显示橙色
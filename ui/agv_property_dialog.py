@@ -636,6 +636,7 @@ class AGVPropertyDialog(QDialog):
                     self.agv.moving = False
                     self.agv.target_node = None
                     self.agv.path = []
+                    self.agv.schedule = []
                     self.agv.path_index = 0
                     self.agv.status = "位置已更新"
 
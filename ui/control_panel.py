@@ -6,10 +6,12 @@ import random
 import datetime
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QPushButton, QComboBox, QCheckBox, QTextEdit,
-                             QGroupBox, QMessageBox, QScrollArea)
+                             QGroupBox, QMessageBox, QScrollArea, QSpinBox, QFileDialog)
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt, QTimer
 
+from algorithms.path_planner import PathPlanner
+
 
 class ControlPanel(QWidget):
     """AGV仿真控制面板 - 简化版"""
@@ -17,9 +19,12 @@ class ControlPanel(QWidget):
     def __init__(self, simulation_widget, parent=None):
         super().__init__(parent)
         self.simulation_widget = simulation_widget
+        # 从面板单独发送、等待规划结果的AGV编号
+        self._awaiting_routes = set()
         self._setup_ui()
         self._setup_timer()
         self._update_node_lists()
+        self.simulation_widget.planning_finished.connect(self._on_planning_finished)
 
     def _setup_ui(self):
         """设置用户界面"""
@@ -122,7 +127,9 @@ class ControlPanel(QWidget):
         algorithm_layout = QHBoxLayout()
         algorithm_layout.addWidget(QLabel("算法:"))
         self.algorithm_selector = QComboBox()
-        self.algorithm_selector.addItems(["dijkstra", "a_star"])
+        self.algorithm_selector.addItems(["dijkstra", "a_star", "alt", "bidirectional",
+                                           "contraction_hierarchies", "travel_time",
+                                           "hierarchical", "congestion"])
         algorithm_layout.addWidget(self.algorithm_selector)
         task_layout.addLayout(algorithm_layout)
 
@@ -161,6 +168,35 @@ class ControlPanel(QWidget):
         self.collision_check.stateChanged.connect(self._toggle_collision_detection)
         batch_layout.addWidget(self.collision_check)
 
+        # 时空预约规划开关
+        self.space_time_check = QCheckBox("启用时空预约规划")
+        self.space_time_check.setChecked(False)
+        self.space_time_check.stateChanged.connect(self._toggle_space_time_planning)
+        batch_layout.addWidget(self.space_time_check)
+
+        # 滚动时域规划开关及参数
+        self.rolling_horizon_check = QCheckBox("启用滚动时域规划")
+        self.rolling_horizon_check.stateChanged.connect(self._toggle_rolling_horizon)
+        batch_layout.addWidget(self.rolling_horizon_check)
+
+        horizon_layout = QHBoxLayout()
+        horizon_layout.addWidget(QLabel("时间窗:"))
+        self.horizon_window_spinbox = QSpinBox()
+        self.horizon_window_spinbox.setRange(10, 2000)
+        self.horizon_window_spinbox.setValue(self.simulation_widget.horizon_window)
+        self.horizon_window_spinbox.setSuffix(" 帧")
+        horizon_layout.addWidget(self.horizon_window_spinbox)
+        horizon_layout.addWidget(QLabel("周期:"))
+        self.replan_period_spinbox = QSpinBox()
+        self.replan_period_spinbox.setRange(1, self.simulation_widget.horizon_window)
+        self.replan_period_spinbox.setValue(self.simulation_widget.replan_period)
+        self.replan_period_spinbox.setSuffix(" 帧")
+        horizon_layout.addWidget(self.replan_period_spinbox)
+        batch_layout.addLayout(horizon_layout)
+
+        self.horizon_window_spinbox.valueChanged.connect(self._update_horizon_settings)
+        self.replan_period_spinbox.valueChanged.connect(self._update_horizon_settings)
+
         return batch_group
 
     def _create_info_group(self):
@@ -185,6 +221,27 @@ class ControlPanel(QWidget):
             label.setFont(info_font)
             info_layout.addWidget(label)
 
+        # 规划遥测：各算法的调用次数、耗时分位数和扩展节点数
+        self.telemetry_check = QCheckBox("记录规划统计")
+        self.telemetry_check.setChecked(PathPlanner.telemetry.enabled)
+        self.telemetry_check.stateChanged.connect(self._toggle_telemetry)
+        info_layout.addWidget(self.telemetry_check)
+
+        self.telemetry_label = QLabel()
+        self.telemetry_label.setFont(QFont('Consolas', 8))
+        self.telemetry_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        info_layout.addWidget(self.telemetry_label)
+
+        telemetry_layout = QHBoxLayout()
+        export_button = QPushButton("导出统计")
+        export_button.clicked.connect(self._export_telemetry)
+        telemetry_layout.addWidget(export_button)
+        reset_button = QPushButton("清空统计")
+        reset_button.clicked.connect(self._reset_telemetry)
+        telemetry_layout.addWidget(reset_button)
+        info_layout.addLayout(telemetry_layout)
+        self._update_telemetry()
+
         return info_group
 
     def _create_log_group(self):
@@ -265,12 +322,29 @@ class ControlPanel(QWidget):
             return
 
         algorithm = self.algorithm_selector.currentText()
-        success = self.simulation_widget.send_agv_to_target(agv_id, target_node_text, algorithm)
+        # 规划结果可能在发送过程中同步送达，需先登记
+        self._awaiting_routes.add(agv_id)
+        if not self.simulation_widget.send_agv_to_target(agv_id, target_node_text, algorithm):
+            self._awaiting_routes.discard(agv_id)
+            self._log_message(f"无法为AGV #{agv_id} 规划路径")
+
+    def _on_planning_finished(self, request):
+        """记录从面板发送的任务的规划结果"""
+        if request.agv_id not in self._awaiting_routes:
+            return
+        self._awaiting_routes.discard(request.agv_id)
+        if not request.path:
+            self._log_message(f"无法为AGV #{request.agv_id} 规划路径")
+            return
 
-        if success:
-            self._log_message(f"AGV #{agv_id} 开始前往节点 {target_node_text}")
+        stats = request.stats
+        # 开启时空规划时实际使用的算法与选择的算法不同
+        used = stats.get('algorithm', request.algorithm)
+        if stats.get('cached'):
+            detail = f"{used} 命中路由缓存"
         else:
-            self._log_message(f"无法为AGV #{agv_id} 规划路径")
+            detail = f"{used} 扩展 {stats.get('expanded', 0)} 个节点"
+        self._log_message(f"AGV #{request.agv_id} 开始前往节点 {request.target_id}（{detail}）")
 
     def _delete_agv(self):
         """删除选中的AGV"""
@@ -307,19 +381,20 @@ class ControlPanel(QWidget):
             self._update_agv_list()
             self._log_message("已自动添加3个AGV")
 
-        success_count = 0
-        for agv in self.simulation_widget.agvs:
-            if not agv.moving:
-                available_nodes = list(self.simulation_widget.nodes.keys())
-                if available_nodes:
-                    target_id = random.choice(available_nodes)
-                    algorithm = random.choice(['dijkstra', 'a_star'])
+        available_nodes = list(self.simulation_widget.nodes.keys())
+        assignments = []
+        if available_nodes:
+            for agv in self.simulation_widget.agvs:
+                if not agv.moving:
+                    assignments.append((agv.id, random.choice(available_nodes)))
 
-                    if self.simulation_widget.send_agv_to_target(agv.id, target_id, algorithm):
-                        success_count += 1
+        algorithm = random.choice(['dijkstra', 'a_star'])
+        success_count = self.simulation_widget.send_agvs_to_targets(assignments, algorithm)
 
         if success_count > 0:
-            self._log_message(f"已为 {success_count} 个AGV分配随机任务")
+            cache_stats = PathPlanner.route_cache.get_stats()
+            self._log_message(f"已为 {success_count} 个AGV分配随机任务"
+                              f"（路由缓存命中率 {cache_stats['hit_rate']:.0%}）")
         else:
             self._log_message("未能分配任何随机任务")
 
@@ -339,6 +414,50 @@ class ControlPanel(QWidget):
         self.simulation_widget.set_collision_detection(enabled)
         self._log_message(f"碰撞检测已{'开启' if enabled else '关闭'}")
 
+    def _toggle_space_time_planning(self, state):
+        """切换时空预约规划开关"""
+        enabled = (state == Qt.Checked)
+        self.simulation_widget.set_space_time_planning(enabled)
+        self._log_message(f"时空预约规划已{'开启' if enabled else '关闭'}")
+
+    def _toggle_rolling_horizon(self, state):
+        """切换滚动时域规划开关"""
+        enabled = (state == Qt.Checked)
+        self.simulation_widget.set_rolling_horizon(enabled)
+        self._log_message(f"滚动时域规划已{'开启' if enabled else '关闭'}")
+
+    def _toggle_telemetry(self, state):
+        """切换规划遥测开关"""
+        enabled = (state == Qt.Checked)
+        PathPlanner.telemetry.enabled = enabled
+        self._log_message(f"规划统计已{'开启' if enabled else '关闭'}")
+
+    def _export_telemetry(self):
+        """导出规划统计为CSV"""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "导出规划统计", "planner_telemetry.csv", "CSV文件 (*.csv)")
+        if not file_path:
+            return
+        try:
+            summary_path, calls_path = PathPlanner.telemetry.export_csv(file_path)
+        except OSError as e:
+            self._log_message(f"导出规划统计失败: {e}")
+            return
+        self._log_message(f"规划统计已导出到 {summary_path} 和 {calls_path}")
+
+    def _reset_telemetry(self):
+        """清空规划统计"""
+        PathPlanner.telemetry.reset()
+        self._update_telemetry()
+        self._log_message("规划统计已清空")
+
+    def _update_horizon_settings(self):
+        """更新滚动时域规划的时间窗和规划周期"""
+        window = self.horizon_window_spinbox.value()
+        # 规划周期不能超过时间窗
+        self.replan_period_spinbox.setMaximum(window)
+        self.simulation_widget.set_horizon_settings(window, self.replan_period_spinbox.value())
+
     # =============================================================================
     # UI更新方法
     # =============================================================================
@@ -346,6 +465,7 @@ class ControlPanel(QWidget):
     def _update_ui(self):
         """更新UI状态"""
         self._update_agv_list()
+        self._update_telemetry()
 
     def _update_node_lists(self):
         """更新节点选择列表"""
@@ -359,6 +479,22 @@ class ControlPanel(QWidget):
             self.start_node_combo.addItem(node_id_str)
             self.target_node_combo.addItem(node_id_str)
 
+    def _update_telemetry(self):
+        """更新规划统计摘要"""
+        rows = PathPlanner.telemetry.summary()
+        if not rows:
+            self.telemetry_label.setText("暂无规划统计" if PathPlanner.telemetry.enabled
+                                         else "规划统计未开启")
+            return
+
+        lines = ["算法           次数  p50/p95(ms)  扩展"]
+        for row in rows:
+            expanded = row['expanded_mean']
+            expanded = f"{expanded:.0f}" if expanded is not None else "-"
+            lines.append(f"{row['algorithm'][:14]:<14}{row['calls']:>5}  "
+                         f"{row['wall_ms_p50']:.2f}/{row['wall_ms_p95']:.2f}  {expanded}")
+        self.telemetry_label.setText("\n".join(lines))
+
     def _update_agv_list(self):
         """更新AGV选择列表"""
         current_text = self.agv_selector.currentText()
@@ -10,6 +10,7 @@ from PyQt5.QtCore import Qt, QTimer
 
 from ui.simulation_widget import SimulationWidget
 from ui.control_panel import ControlPanel
+from algorithms.path_planner import PathPlanner
 
 
 class MainWindow(QMainWindow):
@@ -264,7 +265,11 @@ AGV控制:
             agv_count = map_info['agv_count']
             node_count = map_info['node_count']
 
-            status_text = f"节点: {node_count} | AGV: {agv_count} | {map_info['source']}"
+            reroute = self.simulation_widget.get_reroute_stats()
+            status_text = (f"节点: {node_count} | AGV: {agv_count} | "
+                           f"重规划: {reroute['rerouted']}/{reroute['queued']} "
+                           f"(排队 {reroute['pending']}, 超支 {reroute['overruns']} 帧) | "
+                           f"{map_info['source']}")
             self.status_bar.showMessage(status_text)
 
         except Exception:
@@ -288,6 +293,8 @@ AGV控制:
                 self.status_timer.stop()
             if hasattr(self.simulation_widget, 'timer'):
                 self.simulation_widget.timer.stop()
+            self.simulation_widget.planning_service.shutdown()
+            PathPlanner.shutdown_parallel()
             event.accept()
         else:
             event.ignore()
@@ -0,0 +1,127 @@
+"""
+后台规划服务模块
+在单个工作线程中执行路径规划，结果通过排队信号送回GUI线程
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
+
+from algorithms.path_planner import PathPlanner
+
+
+class PlanningRequest:
+    """一次后台规划请求"""
+
+    __slots__ = ('agv_id', 'start_id', 'target_id', 'algorithm', 'future', 'path', 'stats',
+                 'error')
+
+    def __init__(self, agv_id, start_id, target_id, algorithm):
+        """
+        Args:
+            agv_id: AGV编号
+            start_id: 提交时AGV所在的节点ID
+            target_id: 目标节点ID
+            algorithm: 规划算法
+        """
+        self.agv_id = agv_id
+        self.start_id = start_id
+        self.target_id = target_id
+        self.algorithm = algorithm
+        self.future = None
+        self.path = []
+        self.stats = {}
+        self.error = None
+
+
+class PlanningService(QObject):
+    """
+    后台规划服务
+
+    规划在工作线程中持有PathPlanner.lock执行，完成后由工作线程发出内部信号，
+    以排队连接投递到GUI线程再发出planned。每个AGV同时只保留最新的一个请求：
+    新请求到来时取消尚未开始的旧请求，已经开始的旧请求完成后丢弃其结果
+    """
+
+    # (PlanningRequest)，在GUI线程中发出；规划失败时path为空列表，出错时error不为None
+    planned = pyqtSignal(object)
+
+    # 工作线程 -> GUI线程的内部信号
+    _completed = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # PathPlanner的类级状态不是线程安全的，多个工作线程也只会在锁上排队
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="planner")
+        self._pending = {}
+        self._completed.connect(self._deliver, Qt.QueuedConnection)
+
+        # 统计：提交的请求数、被更新请求取代的请求数
+        self.submitted = 0
+        self.superseded = 0
+
+    def is_planning(self, agv_id):
+        """AGV是否有尚未送达的规划请求"""
+        return agv_id in self._pending
+
+    def submit(self, agv, target_id, algorithm, plan):
+        """
+        提交一次规划，立即返回
+
+        Args:
+            agv: 需要规划的AGV
+            target_id: 目标节点ID
+            algorithm: 规划算法（只用于记录）
+            plan: 在工作线程中调用的无参函数，返回路径节点ID列表
+
+        Returns:
+            PlanningRequest: 规划请求，结果通过planned信号送达
+        """
+        self.cancel(agv.id)
+        request = PlanningRequest(agv.id, agv.current_node.id, target_id, algorithm)
+        self._pending[agv.id] = request
+        self.submitted += 1
+        request.future = self._executor.submit(self._run, request, plan)
+        request.future.add_done_callback(lambda _: self._completed.emit(request))
+        return request
+
+    def cancel(self, agv_id):
+        """
+        取消AGV尚未送达的请求
+
+        Returns:
+            bool: 是否有被取消的请求
+        """
+        request = self._pending.pop(agv_id, None)
+        if request is None:
+            return False
+        request.future.cancel()
+        self.superseded += 1
+        return True
+
+    def cancel_all(self):
+        """取消所有尚未送达的请求"""
+        for agv_id in list(self._pending):
+            self.cancel(agv_id)
+
+    def shutdown(self):
+        """取消所有请求并结束工作线程（不等待正在执行的规划）"""
+        self.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _run(request, plan):
+        """工作线程：执行规划并记录统计信息"""
+        with PathPlanner.lock:
+            try:
+                request.path = plan() or []
+            except Exception as e:
+                request.error = e
+            request.stats = dict(PathPlanner.last_search_stats)
+
+    def _deliver(self, request):
+        """GUI线程：丢弃已被取代或已取消的请求，送达其余结果"""
+        if self._pending.get(request.agv_id) is not request:
+            return
+        del self._pending[request.agv_id]
+        self.planned.emit(request)
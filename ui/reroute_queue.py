@@ -0,0 +1,120 @@
+"""
+重规划队列模块
+等待过久的AGV排队重规划，每帧只在固定的时间预算内处理，把规划开销分摊到多帧
+"""
+
+import time
+from collections import deque
+
+
+class RerouteQueue:
+    """
+    按时间预算处理的重规划队列
+
+    AGV按入队顺序处理，每帧至少处理一个，累计耗时达到预算后停止，剩余的留到下一帧。
+    单次重规划就超出预算时记为一次超支，不中断正在进行的规划
+    """
+
+    def __init__(self, budget):
+        """
+        Args:
+            budget: 每帧的规划时间预算（秒）
+        """
+        self.budget = budget
+        self._queue = deque()
+        self._queued = set()
+
+        # 统计：入队、换路、路线未变、无路径或出错、出队时已不需要重规划的次数，
+        # 超出预算的帧数和最大超支（秒），队列处理不完而顺延的帧数
+        self.queued = 0
+        self.rerouted = 0
+        self.unchanged = 0
+        self.failed = 0
+        self.skipped = 0
+        self.overruns = 0
+        self.max_overrun = 0.0
+        self.deferred_ticks = 0
+
+    def __len__(self):
+        return len(self._queue)
+
+    def __contains__(self, agv_id):
+        return agv_id in self._queued
+
+    def enqueue(self, agv):
+        """
+        AGV入队，已在队列中时忽略
+
+        Returns:
+            bool: 是否新入队
+        """
+        if agv.id in self._queued:
+            return False
+        self._queue.append(agv)
+        self._queued.add(agv.id)
+        self.queued += 1
+        return True
+
+    def discard(self, agv_id):
+        """移除AGV（删除AGV时调用）"""
+        if agv_id not in self._queued:
+            return
+        self._queued.discard(agv_id)
+        self._queue = deque(agv for agv in self._queue if agv.id != agv_id)
+
+    def clear(self):
+        """清空队列（不清除统计）"""
+        self._queue.clear()
+        self._queued.clear()
+
+    def process(self, eligible, reroute):
+        """
+        在时间预算内处理队列
+
+        Args:
+            eligible: 函数 agv -> bool，出队时AGV是否仍需要重规划
+            reroute: 函数 agv -> bool或None，执行重规划：换路时返回True，路线未变返回False，
+                无路径或出错返回None
+
+        Returns:
+            float: 本帧的规划耗时（秒）
+        """
+        began = time.perf_counter()
+        elapsed = 0.0
+        while self._queue:
+            if elapsed >= self.budget:
+                self.deferred_ticks += 1
+                break
+            agv = self._queue.popleft()
+            self._queued.discard(agv.id)
+            if not eligible(agv):
+                self.skipped += 1
+                continue
+
+            result = reroute(agv)
+            if result is None:
+                self.failed += 1
+            elif result:
+                self.rerouted += 1
+            else:
+                self.unchanged += 1
+            elapsed = time.perf_counter() - began
+
+        if elapsed > self.budget:
+            self.overruns += 1
+            self.max_overrun = max(self.max_overrun, elapsed - self.budget)
+        return elapsed
+
+    def get_stats(self):
+        """获取统计信息"""
+        return {
+            'pending': len(self._queue),
+            'queued': self.queued,
+            'rerouted': self.rerouted,
+            'unchanged': self.unchanged,
+            'failed': self.failed,
+            'skipped': self.skipped,
+            'overruns': self.overruns,
+            'max_overrun_ms': self.max_overrun * 1000.0,
+            'deferred_ticks': self.deferred_ticks
+        }
@@ -6,18 +6,41 @@ import random
 import datetime
 from PyQt5.QtWidgets import QWidget, QFileDialog, QMessageBox
 from PyQt5.QtGui import QPainter, QColor, QPen, QFont, QPixmap
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 
 from models.agv import AGV
 from models.path import Path
 from algorithms.path_planner import PathPlanner
+from algorithms.reservation_table import ReservationTable
+from algorithms.rolling_horizon import RollingHorizonPlanner
 from data.map_loader import MapLoader
 from models.control_zone_manager import ControlZoneManager
+from ui.planning_service import PlanningService, PlanningRequest
+from ui.reroute_queue import RerouteQueue
 
 
 class SimulationWidget(QWidget):
     """AGV仿真显示组件 - 优化版本"""
 
+    # 单个AGV的规划结果已应用（PlanningRequest），包括在GUI线程中同步完成的时空预约规划
+    planning_finished = pyqtSignal(object)
+
+    # AGV在节点上连续等待超过该帧数时排队增量修复路线
+    REPLAN_WAIT_TICKS = 60
+
+    # 每帧处理重规划队列的时间预算，为帧间隔(16ms)的四分之一
+    REROUTE_TIME_BUDGET = 0.004
+
+    # 分层路线剩余的已细化节点不超过该数量时继续细化
+    REFINE_MARGIN = 2
+
+    # 批量派发时联合规划的次优界，大于1时使用ECBS以减少约束树扩展
+    JOINT_SUBOPTIMALITY = 1.5
+
+    # 联合规划在GUI线程中运行，预算为半帧(16ms)和少量约束树扩展，超出后退回优先级规划
+    JOINT_TIME_BUDGET = 0.008
+    JOINT_MAX_EXPANSIONS = 16
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._init_widget()
@@ -51,6 +74,30 @@ class SimulationWidget(QWidget):
         self.active_paths = []
         self.planned_paths = []
 
+        # 已提交到进程池、尚未取完结果的批次 [(ParallelBatch, AGV列表, 起点ID列表)]
+        self.parallel_batches = []
+
+        # 已计入边负载的各AGV路线对象和所在节点，用于发现换线和驶过的边
+        self.load_paths = {}
+        self.load_nodes = {}
+
+        # 后台规划服务，结果在GUI线程中下发
+        self.planning_service = PlanningService(self)
+        self.planning_service.planned.connect(self._apply_planned_route)
+
+        # 等待过久的AGV的重规划队列
+        self.reroute_queue = RerouteQueue(self.REROUTE_TIME_BUDGET)
+
+        # 时空预约
+        self.sim_tick = 0
+        self.reservation_table = ReservationTable()
+        self.space_time_planning = False
+
+        # 滚动时域规划
+        self.rolling_horizon = False
+        self.horizon_window = RollingHorizonPlanner.DEFAULT_WINDOW
+        self.replan_period = RollingHorizonPlanner.DEFAULT_PERIOD
+
         # 视图控制
         self.zoom_scale = 1.0
         self.pan_x = 0
@@ -69,8 +116,8 @@ class SimulationWidget(QWidget):
 
     def _load_initial_data(self):
         """加载初始数据"""
-        self.load_database_map()
         self.control_zone_manager.load_control_zones()
+        self.load_database_map()
 
     # =============================================================================
     # 地图加载
@@ -79,9 +126,14 @@ class SimulationWidget(QWidget):
     def load_database_map(self, db_path="Map.db"):
         """加载数据库地图"""
         try:
+            self.planning_service.cancel_all()
             self.nodes, self.paths = MapLoader.load_from_database(db_path)
-            self.map_source = f"数据库: {db_path}"
-            self._reset_simulation()
+            # 等待正在执行的后台规划结束后再替换地图
+            with PathPlanner.lock:
+                PathPlanner.compile_graph(self.nodes)
+                self.map_source = f"数据库: {db_path}"
+                self._reset_simulation()
+                self._load_preprocessed_data(db_path)
             self.update()
             return True
         except Exception as e:
@@ -89,12 +141,66 @@ class SimulationWidget(QWidget):
             self.map_source = f"数据库加载失败"
             return False
 
+    def _load_preprocessed_data(self, db_path):
+        """加载全源最短距离表和收缩层次，缺失时在后台构建，构建完成前退回在线搜索"""
+        try:
+            map_hash = MapLoader.get_map_hash(db_path)
+        except Exception as e:
+            print(f"计算地图哈希失败: {e}")
+            return
+
+        # 报告孤立节点、死胡同分量和单向陷阱
+        for warning in MapLoader.validate_map_data(self.nodes, self.paths)['warnings']:
+            print(f"地图检查: {warning}")
+
+        def on_done(oracle, hierarchy):
+            print(f"后台预处理完成：距离表{'已' if oracle is not None else '未'}启用，"
+                  f"收缩层次{'已' if hierarchy is not None else '未'}启用")
+
+        try:
+            if PathPlanner.start_preprocessing(self.nodes, db_path, map_hash, on_done):
+                print("正在后台构建距离表和收缩层次")
+        except Exception as e:
+            print(f"加载距离表和收缩层次失败: {e}")
+
+        # 管控区和区域作为分层规划的簇
+        groups = [zone['nodes'] for zone in self.control_zone_manager.control_zones]
+        try:
+            groups += [point_ids for _, point_ids in MapLoader.load_areas(db_path)]
+        except Exception as e:
+            print(f"加载区域失败: {e}")
+        PathPlanner.set_cluster_groups(groups)
+
+        # 属于作业线的AGV只在作业线的节点上规划
+        try:
+            lines, agv_lines = MapLoader.load_work_lines()
+            restricted = PathPlanner.set_work_lines(self.nodes, lines, agv_lines)
+            if restricted:
+                print(f"已建立 {restricted} 条作业线的规划范围")
+        except Exception as e:
+            print(f"加载作业线失败: {e}")
+
+        try:
+            stations = MapLoader.load_stations()
+            pairs = PathPlanner.warm_alternatives(self.nodes, stations)
+            print(f"已预热 {pairs} 对站点的备选路线")
+        except Exception as e:
+            print(f"预热备选路线失败: {e}")
+
     def _reset_simulation(self):
         """重置仿真状态"""
         self.agvs = []
         self.agv_counter = 1
         self.planned_paths = []
         self.active_paths = []
+        self.parallel_batches = []
+        self.planning_service.cancel_all()
+        self.reroute_queue.clear()
+        self.reservation_table.clear()
+        self.load_paths = {}
+        self.load_nodes = {}
+        with PathPlanner.lock:
+            PathPlanner.release_incremental()
 
     # =============================================================================
     # AGV管理
@@ -133,7 +239,15 @@ class SimulationWidget(QWidget):
         """移除AGV"""
         for i, agv in enumerate(self.agvs):
             if agv.id == agv_id:
+                self.planning_service.cancel(agv_id)
+                self.reroute_queue.discard(agv_id)
                 agv.destroy()
+                with PathPlanner.lock:
+                    PathPlanner.release_incremental(agv_id)
+                    PathPlanner.release_route(agv_id)
+                self.load_paths.pop(agv_id, None)
+                self.load_nodes.pop(agv_id, None)
+                self.reservation_table.release(agv_id)
                 self.planned_paths = [p for p in self.planned_paths
                                     if not hasattr(p, 'agv_id') or p.agv_id != agv_id]
                 del self.agvs[i]
@@ -142,28 +256,230 @@ class SimulationWidget(QWidget):
         return False
 
     def send_agv_to_target(self, agv_id, target_node_id, algorithm='dijkstra'):
-        """发送AGV到目标"""
+        """
+        发送AGV到目标
+
+        普通规划和滚动时域模式下的单AGV路线提交到后台规划服务，AGV在结果送达前处于
+        规划中状态，同一AGV的新请求取代尚未送达的旧请求。时空预约规划要修改每帧都会
+        过期的预约表，仍在GUI线程中同步完成
+
+        Returns:
+            bool: 是否已提交规划（时空预约规划为是否规划成功），
+                结果应用后发出planning_finished
+        """
         agv = self._find_agv_by_id(agv_id)
         if not agv or target_node_id not in self.nodes:
             return False
 
+        # 停在节点上的AGV按预约表规划无冲突时刻表；没有可行时刻表时不退回普通规划，
+        # 否则没有预约的路线会与其他AGV的时刻表冲突
+        if self.space_time_planning and not self.rolling_horizon and not agv.moving:
+            self.planning_service.cancel(agv.id)
+            agv.planning = False
+            request = PlanningRequest(agv.id, agv.current_node.id, target_node_id, algorithm)
+            try:
+                with PathPlanner.lock:
+                    path, schedule, updates = PathPlanner.plan_prioritized(
+                        self.nodes, agv, target_node_id, self.reservation_table, self.sim_tick,
+                        self.agvs
+                    )
+                    request.stats = dict(PathPlanner.last_search_stats)
+            except Exception as e:
+                print(f"路径规划失败: {e}")
+                return False
+            self._apply_priority_updates(updates)
+            if not path:
+                return False
+            agv.set_path(path, schedule)
+            self._update_planned_paths(path, agv.id)
+            request.path = path
+            self.planning_finished.emit(request)
+            return True
+
+        nodes = self.nodes
+        agvs = list(self.agvs)
+        start_id = agv.current_node.id
+
+        def plan():
+            return PathPlanner.plan_path(algorithm, nodes, start_id, target_node_id, agvs,
+                                         agv=agv)
+
+        self.planning_service.submit(agv, target_node_id, algorithm, plan)
+        agv.planning = True
+        agv.status = "规划中"
+        return True
+
+    def _apply_planned_route(self, request):
+        """
+        下发后台规划的路线
+
+        规划期间AGV已驶离起点时从当前位置重新提交；滚动时域模式下先沿单AGV路线
+        在原地等到下一个规划周期，由周期规划给出时刻表
+        """
+        agv = self._find_agv_by_id(request.agv_id)
+        if agv is None or request.start_id not in self.nodes:
+            return
+
+        if request.error is not None:
+            print(f"路径规划失败: {request.error}")
+        elif agv.current_node.id != request.start_id:
+            self.send_agv_to_target(agv.id, request.target_id, request.algorithm)
+            return
+        elif request.path:
+            if self.rolling_horizon:
+                agv.set_path(request.path, [self._next_replan_tick()])
+            else:
+                agv.set_path(request.path)
+                self.reservation_table.release(agv.id)
+            self._update_planned_paths(request.path, agv.id)
+
+        agv.planning = False
+        if not request.path and not agv.path:
+            agv.status = "规划失败"
+        self.planning_finished.emit(request)
+
+    def _apply_priority_updates(self, updates):
+        """为优先级规划中让行的低优先级AGV换上新的时刻表，找不到时刻表的在下一个节点停车"""
+        for agv_id, update in updates.items():
+            agv = self._find_agv_by_id(agv_id)
+            if not agv:
+                continue
+            if update is None:
+                stop_node = agv.target_node if agv.moving and agv.target_node else agv.current_node
+                agv.update_route([stop_node.id])
+                agv.status = "让行停车"
+            else:
+                agv.update_route(*update)
+            self._update_planned_paths(agv.path, agv.id)
+
+    def send_agvs_to_targets(self, assignments, algorithm='dijkstra'):
+        """
+        批量发送AGV到目标
+
+        启用时空预约规划时，停在节点上的AGV由冲突搜索联合规划互不冲突的时刻表，
+        其余AGV逐个规划；不少于PathPlanner.PARALLEL_MIN_BATCH个时提交到进程池并行规划
+        （因此并行规划只在关闭时空预约规划或AGV都在行驶时生效）
+
+        Args:
+            assignments: [(AGV编号, 目标节点ID)] 列表，联合规划超出预算时按AGV优先级从高到低、
+                同优先级按此顺序规划
+            algorithm: 逐个规划时使用的算法
+
+        Returns:
+            int: 成功发送的AGV数量（提交到进程池的按提交数量计）
+        """
+        joint = []
+        single = []
+        for agv_id, target_node_id in assignments:
+            agv = self._find_agv_by_id(agv_id)
+            if not agv or target_node_id not in self.nodes:
+                continue
+            if self.space_time_planning and not self.rolling_horizon and not agv.moving:
+                joint.append((agv, target_node_id))
+            else:
+                single.append((agv_id, target_node_id))
+
+        success_count = 0
+        if joint:
+            joint.sort(key=lambda item: -item[0].priority)
+            for agv, _ in joint:
+                self.planning_service.cancel(agv.id)
+                agv.planning = False
+            try:
+                with PathPlanner.lock:
+                    routes = PathPlanner.plan_joint(
+                        self.nodes, joint, self.reservation_table, self.sim_tick, self.agvs,
+                        self.JOINT_SUBOPTIMALITY, self.JOINT_MAX_EXPANSIONS,
+                        self.JOINT_TIME_BUDGET
+                    )
+            except Exception as e:
+                print(f"联合规划失败: {e}")
+                routes = {}
+            for agv, _ in joint:
+                if agv.id in routes:
+                    path, schedule = routes[agv.id]
+                    agv.set_path(path, schedule)
+                    self._update_planned_paths(path, agv.id)
+                    success_count += 1
+
+        # 查询足够多时提交到进程池，结果在之后的帧中下发；
+        # 滚动时域模式下的AGV要等待周期规划，不走并行批量规划；
+        # 进程池中的搜索不限制作业线，受作业线限制的AGV逐个规划
+        if len(single) >= PathPlanner.PARALLEL_MIN_BATCH and not self.rolling_horizon:
+            unrestricted = [(agv_id, target_node_id) for agv_id, target_node_id in single
+                            if PathPlanner.work_line_view(
+                                self.nodes, self._find_agv_by_id(agv_id)) is None]
+            if len(unrestricted) >= PathPlanner.PARALLEL_MIN_BATCH:
+                success_count += self._send_parallel(unrestricted, algorithm)
+                parallel = set(unrestricted)
+                single = [item for item in single if item not in parallel]
+
+        for agv_id, target_node_id in single:
+            if self.send_agv_to_target(agv_id, target_node_id, algorithm):
+                success_count += 1
+        return success_count
+
+    def _send_parallel(self, assignments, algorithm):
+        """
+        把一批AGV的规划提交到进程池，结果在之后的帧中随完成随下发
+
+        Returns:
+            int: 提交的AGV数量，不支持并行时退回逐个规划并返回成功数量
+        """
+        agvs = [self._find_agv_by_id(agv_id) for agv_id, _ in assignments]
+        queries = [(agv.current_node.id, target_node_id)
+                   for agv, (_, target_node_id) in zip(agvs, assignments)]
+        for agv in agvs:
+            self.planning_service.cancel(agv.id)
+            agv.planning = False
         try:
-            path = PathPlanner.plan_path(
-                algorithm, self.nodes, agv.current_node.id, target_node_id, self.agvs
-            )
-            if path:
-                agv.set_path(path)
-                self._update_planned_paths(path, agv.id)
-                return True
+            with PathPlanner.lock:
+                batch = PathPlanner.submit_parallel(self.nodes, queries, algorithm, self.agvs)
         except Exception as e:
-            print(f"路径规划失败: {e}")
-        return False
+            print(f"并行规划失败: {e}")
+            batch = None
+
+        if batch is None:
+            return sum(1 for agv_id, target_node_id in assignments
+                       if self.send_agv_to_target(agv_id, target_node_id, algorithm))
+        self.parallel_batches.append((batch, agvs, [start_id for start_id, _ in queries]))
+        return len(queries)
+
+    def _collect_parallel_results(self):
+        """取出进程池已完成的路线并下发，AGV已离开规划起点或已被移除时丢弃结果"""
+        if not self.parallel_batches:
+            return
+
+        changed = {}
+        for batch, agvs, starts in self.parallel_batches:
+            for i, path in batch.poll():
+                agv = agvs[i]
+                if (path and agv in self.agvs and not agv.moving and
+                        agv.current_node.id == starts[i]):
+                    agv.set_path(path)
+                    self.reservation_table.release(agv.id)
+                    changed[agv.id] = path
+            for error in batch.errors:
+                print(f"并行规划失败: {error}")
+            batch.errors.clear()
+        self.parallel_batches = [item for item in self.parallel_batches if not item[0].done]
+
+        # 一次性替换规划路径显示，避免逐个AGV遍历整个列表
+        if changed:
+            self.planned_paths = [p for p in self.planned_paths
+                                if getattr(p, 'agv_id', None) not in changed]
+            for agv_id, path in changed.items():
+                self._append_planned_paths(path, agv_id)
 
     def stop_all_agvs(self):
         """停止所有AGV"""
+        self.planning_service.cancel_all()
+        self.reroute_queue.clear()
         for agv in self.agvs:
+            agv.planning = False
             agv.stop(self.nodes)
         self.planned_paths = []
+        self.reservation_table.clear()
 
     def _find_agv_by_id(self, agv_id):
         """查找AGV"""
@@ -174,7 +490,10 @@ class SimulationWidget(QWidget):
         if agv_id is not None:
             self.planned_paths = [p for p in self.planned_paths
                                 if not hasattr(p, 'agv_id') or p.agv_id != agv_id]
+        self._append_planned_paths(path, agv_id)
 
+    def _append_planned_paths(self, path, agv_id=None):
+        """追加规划路径"""
         if not path:
             return
 
@@ -190,6 +509,9 @@ class SimulationWidget(QWidget):
 
     def _update_simulation(self):
         """更新仿真"""
+        self.sim_tick += 1
+        self.reservation_table.expire(self.sim_tick)
+
         # 更新节点预定
         for node in self.nodes.values():
             if node.reservation_time > 0:
@@ -197,15 +519,161 @@ class SimulationWidget(QWidget):
             elif node.reservation_time == 0 and node.reserved_by is not None:
                 node.reserved_by = None
 
+        # 滚动时域规划：每个周期为全部AGV重新规划时间窗内的时刻表
+        if self.rolling_horizon and self.sim_tick % self.replan_period == 0:
+            self._replan_rolling_horizon()
+
         # 更新AGV
         for agv in self.agvs:
-            agv.move(self.nodes, self.agvs)
+            agv.move(self.nodes, self.agvs, self.sim_tick)
+        self._sync_edge_loads()
+
+        # 修复长时间受阻的路线（滚动时域模式下由周期规划负责）
+        if not self.rolling_horizon:
+            self._repair_blocked_routes()
+
+        self._refine_hierarchical_routes()
+        self._collect_parallel_results()
 
         # 更新活动路径
         self._update_active_paths()
 
         self.update()
 
+    def _sync_edge_loads(self):
+        """
+        把换线和驶过的边同步到边负载模型，后台规划正在进行时本帧跳过
+
+        只比较每个AGV的路线对象和所在节点，换线时重新承诺剩余路线，
+        因此每次下发的开销与路线长度成正比
+        """
+        if not PathPlanner.lock.acquire(blocking=False):
+            return
+        try:
+            PathPlanner.advance_edge_loads(self.sim_tick)
+            for agv in self.agvs:
+                node_id = agv.current_node.id
+                previous = self.load_nodes.get(agv.id)
+                if previous is not None and previous != node_id:
+                    PathPlanner.record_traversal(self.nodes, agv.id, previous, node_id,
+                                                 self.sim_tick)
+                self.load_nodes[agv.id] = node_id
+
+                if self.load_paths.get(agv.id) is not agv.path:
+                    self.load_paths[agv.id] = agv.path
+                    PathPlanner.commit_route(self.nodes, agv.id, agv.path[agv.path_index:],
+                                             self.sim_tick)
+        finally:
+            PathPlanner.lock.release()
+
+    def _replan_rolling_horizon(self):
+        """滚动时域规划的一个周期，替换各AGV的剩余路线和时刻表"""
+        try:
+            with PathPlanner.lock:
+                routes = PathPlanner.plan_rolling_horizon(
+                    self.nodes, self.agvs, self.reservation_table, self.sim_tick,
+                    self.horizon_window, self.replan_period
+                )
+        except Exception as e:
+            print(f"滚动时域规划失败: {e}")
+            return
+
+        changed = {}
+        for agv in self.agvs:
+            if agv.id not in routes:
+                continue
+            remaining = agv.path[agv.path_index:]
+            path, schedule = routes[agv.id]
+            agv.update_route(path, schedule)
+            if agv.path != remaining:
+                changed[agv.id] = agv.path
+
+        # 一次性替换路线有变化的AGV的规划路径显示，避免逐个AGV遍历整个列表
+        if changed:
+            self.planned_paths = [p for p in self.planned_paths
+                                if getattr(p, 'agv_id', None) not in changed]
+            for agv_id, path in changed.items():
+                self._append_planned_paths(path, agv_id)
+
+    def _next_replan_tick(self):
+        """下一个滚动时域规划周期的帧号"""
+        return (self.sim_tick // self.replan_period + 1) * self.replan_period
+
+    def _repair_blocked_routes(self):
+        """
+        在节点上等待过久的AGV排队，用D* Lite增量修复到任务终点的路线
+
+        每帧只在REROUTE_TIME_BUDGET内处理队列，其余留到之后的帧；
+        后台规划正在进行时本帧只入队不处理，不阻塞GUI线程
+        """
+        for agv in self.agvs:
+            if agv.wait_counter >= self.REPLAN_WAIT_TICKS and self._needs_reroute(agv):
+                # 重新计时，修复后仍然受阻时再次入队
+                agv.wait_counter = 0
+                self.reroute_queue.enqueue(agv)
+
+        if not self.reroute_queue or not PathPlanner.lock.acquire(blocking=False):
+            return
+        try:
+            self.reroute_queue.process(self._needs_reroute, self._reroute_agv)
+        finally:
+            PathPlanner.lock.release()
+
+    @staticmethod
+    def _needs_reroute(agv):
+        """AGV是否停在节点上、沿没有时刻表的路线受阻"""
+        # 按时刻表行驶的AGV由预约保证无冲突，不替换为没有预约的路线
+        return bool(agv.waiting and not agv.moving and agv.path and not agv.schedule and
+                    not agv.planning)
+
+    def _reroute_agv(self, agv):
+        """
+        持有PathPlanner.lock时修复AGV受阻的路线
+
+        Returns:
+            bool: 换路时为True，路线未变为False；无路径或出错时返回None
+        """
+        try:
+            path = PathPlanner.repair_path(self.nodes, agv, self.agvs)
+        except Exception as e:
+            print(f"路线修复失败: {e}")
+            return None
+
+        if not path:
+            return None
+        if path == agv.path[agv.path_index:]:
+            return False
+        agv.set_path(path)
+        self.reservation_table.release(agv.id)
+        self._update_planned_paths(path, agv.id)
+        return True
+
+    def _refine_hierarchical_routes(self):
+        """AGV接近分层路线已细化部分的末尾时继续细化后续的簇，后台规划正在进行时本帧跳过"""
+        if not PathPlanner.lock.acquire(blocking=False):
+            return
+        try:
+            self._refine_hierarchical_routes_locked()
+        finally:
+            PathPlanner.lock.release()
+
+    def _refine_hierarchical_routes_locked(self):
+        """持有PathPlanner.lock时细化分层路线"""
+        for agv in self.agvs:
+            if not agv.path or len(agv.path) - agv.path_index - 1 > self.REFINE_MARGIN:
+                continue
+            try:
+                extension = PathPlanner.extend_hierarchical(self.nodes, agv, self.agvs)
+            except Exception as e:
+                print(f"分层路线细化失败: {e}")
+                PathPlanner.release_incremental(agv.id)
+                continue
+
+            if extension:
+                tail = agv.path[-1]
+                agv.extend_path(extension)
+                self._append_planned_paths([tail] + extension, agv.id)
+
     def _update_active_paths(self):
         """更新活动路径"""
         self.active_paths = []
@@ -513,6 +981,10 @@ class SimulationWidget(QWidget):
             'agv_count': len(self.agvs)
         }
 
+    def get_reroute_stats(self):
+        """获取重规划队列的统计信息"""
+        return self.reroute_queue.get_stats()
+
     def get_agv_list(self):
         """获取AGV列表"""
         return [(agv.id, agv.status, agv.waiting) for agv in self.agvs]
@@ -520,4 +992,28 @@ class SimulationWidget(QWidget):
     def set_collision_detection(self, enabled):
         """设置碰撞检测"""
         for agv in self.agvs:
-            agv.collision_buffer = 25 if enabled else 0
\ No newline at end of file
+            agv.collision_buffer = 25 if enabled else 0
+
+    def set_rolling_horizon(self, enabled):
+        """设置是否使用滚动时域规划"""
+        self.rolling_horizon = enabled
+        self.reservation_table.clear()
+
+    def set_horizon_settings(self, window, period):
+        """
+        设置滚动时域规划的时间窗和规划周期
+
+        Args:
+            window: 时间窗长度（帧）
+            period: 规划周期（帧），不能超过时间窗
+        """
+        if period <= 0 or period > window:
+            raise ValueError(f"规划周期必须在1到时间窗长度之间: {period}")
+        self.horizon_window = window
+        self.replan_period = period
+
+    def set_space_time_planning(self, enabled):
+        """设置是否使用时空预约规划"""
+        self.space_time_planning = enabled
+        if not enabled:
+            self.reservation_table.clear()
\ No newline at end of file
@@ -0,0 +1,244 @@
+"""
+路径规划微基准测试
+对比各算法在数据库地图和合成网格地图上的扩展节点数与耗时
+
+用法:
+    python -m utils.planner_benchmark [--queries N] [--db Map.db]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from models.node import Node
+from algorithms.path_planner import PathPlanner
+from data.map_loader import MapLoader
+
+
+def build_grid_nodes(width, height, spacing=50, one_way_ratio=0.3, seed=0):
+    """
+    构建合成网格地图
+
+    Args:
+        width: 网格列数
+        height: 网格行数
+        spacing: 节点间距
+        one_way_ratio: 单向边比例
+        seed: 随机种子
+
+    Returns:
+        dict: 节点字典
+    """
+    rng = random.Random(seed)
+    nodes = {}
+    for row in range(height):
+        for col in range(width):
+            node_id = f"G{row}_{col}"
+            nodes[node_id] = Node(node_id, col * spacing + 100, row * spacing + 100)
+
+    for row in range(height):
+        for col in range(width):
+            node_id = f"G{row}_{col}"
+            for d_row, d_col in ((0, 1), (1, 0)):
+                n_row, n_col = row + d_row, col + d_col
+                if n_row >= height or n_col >= width:
+                    continue
+                neighbor_id = f"G{n_row}_{n_col}"
+                weight = spacing * rng.uniform(1.0, 1.3)
+                if rng.random() < one_way_ratio:
+                    # 单向边，方向随机
+                    if rng.random() < 0.5:
+                        nodes[node_id].add_connection(neighbor_id, weight)
+                    else:
+                        nodes[neighbor_id].add_connection(node_id, weight)
+                else:
+                    nodes[node_id].add_connection(neighbor_id, weight)
+                    nodes[neighbor_id].add_connection(node_id, weight)
+    return nodes
+
+
+def build_aisle_nodes(aisle_count, aisle_length, spacing=50):
+    """
+    构建单向巷道地图
+
+    相邻巷道方向相反，只在两端通过双向主通道连接，
+    相邻巷道间的实际路径远长于直线距离
+
+    Args:
+        aisle_count: 巷道数量
+        aisle_length: 每条巷道的节点数
+        spacing: 节点间距
+
+    Returns:
+        dict: 节点字典
+    """
+    nodes = {}
+    for aisle in range(aisle_count):
+        for step in range(aisle_length):
+            node_id = f"A{aisle}_{step}"
+            nodes[node_id] = Node(node_id, aisle * spacing + 100, step * spacing + 100)
+
+    for aisle in range(aisle_count):
+        for step in range(aisle_length - 1):
+            lower_id = f"A{aisle}_{step}"
+            upper_id = f"A{aisle}_{step + 1}"
+            if aisle % 2 == 0:
+                nodes[lower_id].add_connection(upper_id, spacing)
+            else:
+                nodes[upper_id].add_connection(lower_id, spacing)
+
+        if aisle + 1 < aisle_count:
+            for step in (0, aisle_length - 1):
+                left_id = f"A{aisle}_{step}"
+                right_id = f"A{aisle + 1}_{step}"
+                nodes[left_id].add_connection(right_id, spacing)
+                nodes[right_id].add_connection(left_id, spacing)
+    return nodes
+
+
+def build_chain_nodes(length=8, spacing=50):
+    """
+    构建一条双向链，除两端外的节点都会被折叠为走廊
+
+    Args:
+        length: 节点数
+        spacing: 节点间距
+
+    Returns:
+        dict: 节点字典
+    """
+    nodes = {str(i): Node(str(i), i * spacing, 0) for i in range(1, length + 1)}
+    for i in range(1, length):
+        left_id, right_id = str(i), str(i + 1)
+        nodes[left_id].add_connection(right_id, spacing)
+        nodes[right_id].add_connection(left_id, spacing)
+    return nodes
+
+
+def check_default_arguments(algorithms):
+    """
+    不传AGV列表（agvs=None）时各算法的回归检查，起终点覆盖走廊内部、走廊端点和同一走廊
+
+    Returns:
+        list: 失败的 (算法, 起点, 终点, 错误信息)
+    """
+    nodes = build_chain_nodes()
+    PathPlanner.compile_graph(nodes)
+    failures = []
+    for algorithm in algorithms:
+        for start_id, end_id in (('2', '5'), ('5', '2'), ('1', '8'), ('3', '8'), ('1', '6')):
+            expected = [str(i) for i in range(int(start_id), int(end_id),
+                                              1 if end_id > start_id else -1)] + [end_id]
+            try:
+                path = PathPlanner.plan_path(algorithm, nodes, start_id, end_id)
+            except Exception as e:
+                failures.append((algorithm, start_id, end_id, repr(e)))
+                continue
+            if path != expected:
+                failures.append((algorithm, start_id, end_id, f"路径 {path}"))
+    return failures
+
+
+def run_benchmark(nodes, algorithms, query_count=200, seed=0):
+    """
+    对给定地图运行基准测试，并核对各算法的路径成本与第一个算法一致
+
+    Args:
+        nodes: 节点字典
+        algorithms: 算法名称列表
+        query_count: 随机查询次数
+        seed: 随机种子
+
+    Returns:
+        dict: {算法: {'time_ms', 'expanded', 'pushes', 'found', 'mismatched'}}
+    """
+    rng = random.Random(seed)
+    node_ids = list(nodes.keys())
+    queries = [(rng.choice(node_ids), rng.choice(node_ids)) for _ in range(query_count)]
+    graph = PathPlanner.compile_graph(nodes)
+
+    results = {}
+    reference = None
+    for algorithm in algorithms:
+        # 预热：地标等预处理数据在首次查询时构建，不计入查询耗时
+        PathPlanner.plan_path(algorithm, nodes, *queries[0], use_cache=False)
+
+        expanded = 0
+        pushes = 0
+        found = 0
+        paths = []
+        begin = time.perf_counter()
+        for start_id, end_id in queries:
+            path = PathPlanner.plan_path(algorithm, nodes, start_id, end_id, use_cache=False)
+            if path:
+                found += 1
+            paths.append(path)
+            stats = PathPlanner.last_search_stats
+            expanded += stats.get('expanded', 0)
+            pushes += stats.get('pushes', 0)
+        elapsed = time.perf_counter() - begin
+
+        costs = [PathPlanner._path_cost(graph, [graph.index_of[node_id] for node_id in path], None)
+                 if path else None for path in paths]
+        if reference is None:
+            reference = costs
+        mismatched = sum(1 for a, b in zip(costs, reference)
+                         if (a is None) != (b is None) or (a is not None and abs(a - b) > 1e-6))
+
+        results[algorithm] = {
+            'time_ms': elapsed * 1000 / query_count,
+            'expanded': expanded / query_count,
+            'pushes': pushes / query_count,
+            'found': found,
+            'mismatched': mismatched
+        }
+    return results
+
+
+def print_results(title, node_count, results):
+    """打印基准测试结果"""
+    print(f"\n{title} ({node_count} 个节点)")
+    print(f"{'算法':<24}{'平均耗时(ms)':>14}{'平均扩展':>12}{'平均入堆':>12}{'有路径':>8}"
+          f"{'成本不一致':>10}")
+    for algorithm, row in results.items():
+        print(f"{algorithm:<26}{row['time_ms']:>14.3f}{row['expanded']:>12.1f}"
+              f"{row['pushes']:>12.1f}{row['found']:>8}{row['mismatched']:>14}")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="路径规划微基准测试")
+    parser.add_argument('--queries', type=int, default=200, help="每张地图的随机查询次数")
+    parser.add_argument('--db', default="Map.db", help="数据库地图路径")
+    args = parser.parse_args()
+
+    algorithms = ['dijkstra', 'a_star', 'alt', 'bidirectional']
+
+    failures = check_default_arguments(algorithms)
+    for failure in failures:
+        print("默认参数检查失败: %s %s->%s %s" % failure)
+
+    mismatched = 0
+    nodes, _ = MapLoader.load_from_database(args.db)
+    results = run_benchmark(nodes, algorithms, args.queries)
+    mismatched += sum(row['mismatched'] for row in results.values())
+    print_results(f"数据库地图 {args.db}", len(nodes), results)
+
+    for size in (30, 60, 100):
+        nodes = build_grid_nodes(size, size)
+        results = run_benchmark(nodes, algorithms, args.queries)
+        mismatched += sum(row['mismatched'] for row in results.values())
+        print_results(f"合成网格 {size}x{size}", len(nodes), results)
+
+    nodes = build_aisle_nodes(40, 60)
+    results = run_benchmark(nodes, algorithms, args.queries)
+    mismatched += sum(row['mismatched'] for row in results.values())
+    print_results("单向巷道 40x60", len(nodes), results)
+
+    if failures or mismatched:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file